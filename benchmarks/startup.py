@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+启动开销测试：分别在新进程中测量 ``import dingtalk`` 及加载全部淘宝接口的耗时与内存
+
+    python benchmarks/startup.py
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+
+import subprocess
+import sys
+
+SCRIPT = '''
+import sys, time, tracemalloc
+if sys.argv[1] == 'memory':
+    tracemalloc.start()
+start = time.perf_counter()
+import dingtalk
+from dingtalk import SecretClient
+client = SecretClient('corp_id', 'corp_secret')
+%s
+elapsed = time.perf_counter() - start
+current, peak = tracemalloc.get_traced_memory()
+print('%%.1f' %% (elapsed * 1000 if sys.argv[1] == 'time' else current / 1024.0 / 1024.0))
+'''
+
+CASES = [
+    ('dingtalk only', ''),
+    ('with taobao', 'client.tbdingding'),
+]
+
+
+def run(code, mode, repeat=5):
+    return min(
+        float(subprocess.check_output([sys.executable, '-c', SCRIPT % code, mode]))
+        for _ in range(repeat)
+    )
+
+
+def main():
+    for name, code in CASES:
+        elapsed, memory = run(code, 'time'), run(code, 'memory', 1)
+        print('%-16s import: %8.1f ms  memory: %6.1f MiB' % (name, elapsed, memory))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+top 接口响应解析耗时：对比不同结果格式及编解码器
+
+handle_response 先解析响应外层再解析 result 字符串，外层的耗时基本是 result 字符串的反转义，
+一次扫描的解析方式同样需要反转义，因此另外列出两部分各自的耗时作为参照
+
+    python benchmarks/top_response.py [记录数]
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+
+import json
+import sys
+import timeit
+
+from dingtalk.core import protocol
+from dingtalk.core.utils import ObjectDict
+
+METHOD = 'dingtalk.oapi.processinstance.list'
+
+
+def make_content(count):
+    records = [
+        {
+            'process_instance_id': 'a4b5c6d7-%08d' % i,
+            'title': '审批单%d' % i,
+            'status': 'COMPLETED',
+            'originator_userid': 'user%d' % i,
+            'form_component_values': [{'name': '字段%d' % j, 'value': 'value\n%d' % j} for j in range(5)],
+        }
+        for i in range(count)
+    ]
+    result = json.dumps({'success': True, 'result': {'list': records, 'next_cursor': count}}, ensure_ascii=False)
+    content = {protocol.top_response_key(METHOD): {'result': result, 'request_id': 'request_id'}}
+    return json.dumps(content, ensure_ascii=False).encode('utf-8')
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    content = make_content(count)
+    response = protocol.DingTalkResponse(200, content)
+    response_key = protocol.top_response_key(METHOD)
+    text = content.decode('utf-8')
+    result = json.loads(text)[response_key]['result']
+
+    cases = [
+        ('handle_response (ObjectDict)', lambda: protocol.handle_response(response, response_key)),
+        ('handle_response (dict)', lambda: protocol.handle_response(response, response_key, response_mode='dict')),
+        ('json.loads outer only', lambda: json.loads(text)),
+        ('json.loads result only (ObjectDict)', lambda: json.loads(result, object_hook=ObjectDict)),
+        ('json.loads result only (dict)', lambda: json.loads(result)),
+    ]
+    try:
+        from dingtalk.core.codec import OrjsonCodec
+        codec = OrjsonCodec()
+        cases.append((
+            'handle_response (orjson, dict)',
+            lambda: protocol.handle_response(response, response_key, codec=codec, response_mode='dict')
+        ))
+        cases.append((
+            'handle_response (orjson, ObjectDict)',
+            lambda: protocol.handle_response(response, response_key, codec=codec, response_mode='object')
+        ))
+    except ImportError:
+        pass
+
+    print('%d records, %.1f KiB' % (count, len(content) / 1024.0))
+    for name, func in cases:
+        elapsed = min(timeit.repeat(func, number=20, repeat=5)) / 20
+        print('%-40s %8.2f ms' % (name, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -6,8 +6,9 @@ import logging
 import time
 
 from dingtalk.client import api
-from dingtalk.client.api.taobao import TaobaoMixin
+from dingtalk.client.api.taobao_mixin import LazyTaobaoMixin
 from dingtalk.client.base import BaseClient
+from dingtalk.core.constants import ResponseMode
 from dingtalk.core.utils import DingTalkSigner, random_string
 from dingtalk.crypto import DingTalkCrypto
 from dingtalk.storage.cache import DingTalkCache
@@ -15,7 +16,7 @@ from dingtalk.storage.cache import DingTalkCache
 logger = logging.getLogger(__name__)
 
 
-class DingTalkClient(BaseClient, TaobaoMixin):
+class DingTalkClient(BaseClient, LazyTaobaoMixin):
 
     attendance = api.Attendance()
     blackboard = api.BlackBoard()
@@ -34,11 +35,17 @@ class DingTalkClient(BaseClient, TaobaoMixin):
     microapp = api.MicroApp()
     report = api.Report()
     role = api.Role()
+    top = api.TopAPI()
     user = api.User()
     workrecord = api.WorkRecord()
 
-    def __init__(self, corp_id, prefix='client', storage=None, timeout=None, auto_retry=True):
-        super(DingTalkClient, self).__init__(storage, timeout, auto_retry)
+    TOKENS = {
+        'access_token': ('access_token', 'get_access_token', 'access_token'),
+        'jsapi_ticket': ('jsapi_ticket', 'get_jsapi_ticket', 'ticket'),
+    }
+
+    def __init__(self, corp_id, prefix='client', storage=None, timeout=None, auto_retry=True, transport=None):
+        super(DingTalkClient, self).__init__(storage, timeout, auto_retry, transport)
         self.corp_id = corp_id
         self.cache = DingTalkCache(self.storage, "%s:%s" % (prefix, self.get_access_token_key()))
 
@@ -47,23 +54,11 @@ class DingTalkClient(BaseClient, TaobaoMixin):
 
     @property
     def access_token(self):
-        token = self.cache.access_token.get()
-        if token is None:
-            ret = self.get_access_token()
-            token = ret['access_token']
-            expires_in = ret.get('expires_in', 7200)
-            self.cache.access_token.set(value=token, ttl=expires_in)
-        return token
+        return self._fetch_token(self.cache.access_token, self.get_access_token, 'access_token')
 
     @property
     def jsapi_ticket(self):
-        ticket = self.cache.jsapi_ticket.get()
-        if ticket is None:
-            ret = self.get_jsapi_ticket()
-            ticket = ret['ticket']
-            expires_in = ret.get('expires_in', 7200)
-            self.cache.jsapi_ticket.set(value=ticket, ttl=expires_in)
-        return ticket
+        return self._fetch_token(self.cache.jsapi_ticket, self.get_jsapi_ticket, 'ticket')
 
     def get_jsapi_params(self, url, noncestr=None, timestamp=None):
         if not noncestr:
@@ -108,7 +103,7 @@ class DingTalkClient(BaseClient, TaobaoMixin):
         raise e
 
     def get_jsapi_ticket(self):
-        return self.get('/get_jsapi_ticket')
+        return self.get('/get_jsapi_ticket', response_mode=ResponseMode.OBJECT)
 
     def get_access_token(self):
         raise NotImplementedError
@@ -116,8 +111,9 @@ class DingTalkClient(BaseClient, TaobaoMixin):
 
 class SecretClient(DingTalkClient):
 
-    def __init__(self, corp_id, corp_secret, token=None, aes_key=None, storage=None, timeout=None, auto_retry=True):
-        super(SecretClient, self).__init__(corp_id, 'secret:'+corp_id, storage, timeout, auto_retry)
+    def __init__(self, corp_id, corp_secret, token=None, aes_key=None, storage=None, timeout=None, auto_retry=True,
+                 transport=None):
+        super(SecretClient, self).__init__(corp_id, 'secret:'+corp_id, storage, timeout, auto_retry, transport)
         self.corp_secret = corp_secret
         self.crypto = DingTalkCrypto(token, aes_key, corp_id)
 
@@ -125,25 +121,30 @@ class SecretClient(DingTalkClient):
         return self._request(
             'GET',
             '/gettoken',
-            params={'corpid': self.corp_id, 'corpsecret': self.corp_secret}
+            params={'corpid': self.corp_id, 'corpsecret': self.corp_secret},
+            response_mode=ResponseMode.OBJECT
         )
 
 
 class AppKeyClient(DingTalkClient):
 
     def __init__(self, corp_id, app_key, app_secret, token=None, aes_key=None, storage=None, timeout=None,
-                 auto_retry=True):
+                 auto_retry=True, transport=None):
         self.app_key = app_key
         self.app_secret = app_secret
-        super(AppKeyClient, self).__init__(corp_id, 'secret:' + corp_id, storage, timeout, auto_retry)
+        super(AppKeyClient, self).__init__(corp_id, 'secret:' + corp_id, storage, timeout, auto_retry, transport)
         self.crypto = DingTalkCrypto(token, aes_key, corp_id)
 
     def get_access_token_key(self):
         return "app_key:%s" % self.app_key
 
+    def _rate_limit_scope(self):
+        return self.app_key, self.corp_id
+
     def get_access_token(self):
         return self._request(
             'GET',
             '/gettoken',
-            params={'appkey': self.app_key, 'appsecret': self.app_secret}
+            params={'appkey': self.app_key, 'appsecret': self.app_secret},
+            response_mode=ResponseMode.OBJECT
         )
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import time
+
+from dingtalk.client import DingTalkClient, SecretClient, AppKeyClient
+from dingtalk.client.aio.base import AsyncClientMixin
+from dingtalk.core.utils import DingTalkSigner, random_string
+
+
+class AsyncDingTalkClient(AsyncClientMixin, DingTalkClient):
+    """
+    asyncio 版 DingTalkClient
+
+    接口与 DingTalkClient 相同，所有接口调用返回 coroutine::
+
+        async with AsyncAppKeyClient('corp_id', 'app_key', 'app_secret') as client:
+            user = await client.user.get('userid')
+    """
+
+    @property
+    def access_token(self):
+        """
+        返回 coroutine，需 ``await client.access_token`` 获取
+        """
+        return self._fetch_token(self.cache.access_token, self.get_access_token, 'access_token')
+
+    @property
+    def jsapi_ticket(self):
+        """
+        返回 coroutine，需 ``await client.jsapi_ticket`` 获取
+        """
+        return self._fetch_token(self.cache.jsapi_ticket, self.get_jsapi_ticket, 'ticket')
+
+    async def get_jsapi_params(self, url, noncestr=None, timestamp=None):
+        if not noncestr:
+            noncestr = random_string()
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        data = [
+            'noncestr={noncestr}'.format(noncestr=noncestr),
+            'jsapi_ticket={ticket}'.format(ticket=await self.jsapi_ticket),
+            'timestamp={timestamp}'.format(timestamp=timestamp),
+            'url={url}'.format(url=url),
+        ]
+        signer = DingTalkSigner(delimiter=b'&')
+        signer.add_data(*data)
+
+        ret = {
+            'corpId': self.corp_id,
+            'timeStamp': timestamp,
+            'nonceStr': noncestr,
+            'signature': signer.signature
+        }
+        return ret
+
+    async def _handle_pre_request(self, method, uri, kwargs):
+        if 'access_token=' in uri or 'access_token' in kwargs.get('params', {}):
+            raise ValueError("uri参数中不允许有access_token: " + uri)
+        uri = '%s%saccess_token=%s' % (uri, '&' if '?' in uri else '?', await self.access_token)
+        return method, uri, kwargs
+
+    async def _handle_pre_top_request(self, params, uri):
+        if 'session=' in uri or 'session' in params:
+            raise ValueError("uri参数中不允许有session: " + uri)
+        params['session'] = await self.access_token
+
+        return await super(AsyncDingTalkClient, self)._handle_pre_top_request(params, uri)
+
+    async def _handle_request_except(self, e, func, *args, **kwargs):
+        if e.errcode in (33001, 40001, 42001, 40014):
+            self.cache.access_token.delete()
+            if self.auto_retry:
+                return await func(*args, **kwargs)
+        raise e
+
+
+class AsyncSecretClient(AsyncDingTalkClient, SecretClient):
+    pass
+
+
+class AsyncAppKeyClient(AsyncDingTalkClient, AppKeyClient):
+    pass
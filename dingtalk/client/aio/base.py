@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import asyncio
+import logging
+import time
+
+from dingtalk.client.aio.batch import AsyncTopBatch
+from dingtalk.client.aio.refresher import AsyncTokenRefresher
+from dingtalk.client.aio.transport import AiohttpTransport
+from dingtalk.core import protocol
+from dingtalk.core.exceptions import DingTalkClientException
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSingleFlight(object):
+    """
+    asyncio 版 SingleFlight，同一事件循环内同一 key 的并发调用共享同一个 Task
+    """
+
+    def __init__(self):
+        self._tasks = {}
+
+    async def do(self, key, func, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        task_key = (id(loop), key)
+        task = self._tasks.get(task_key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._tasks[task_key] = task
+            task.add_done_callback(lambda t: self._tasks.pop(task_key, None))
+        return await asyncio.shield(task)
+
+
+_token_flight = AsyncSingleFlight()
+
+
+class AsyncClientMixin(object):
+    """
+    asyncio 客户端混入类
+
+    与同步客户端组合使用，所有接口方法返回 coroutine，需要 ``await`` 获取结果
+
+    storage、rate_limiter 及令牌刷新锁仍为同步调用，仅适合使用 MemoryStorage 等不阻塞的存储，
+    使用 RedisStorage 时每次读写都会阻塞事件循环
+    """
+
+    def __init__(self, *args, **kwargs):
+        session = kwargs.pop('session', None)
+        super(AsyncClientMixin, self).__init__(*args, **kwargs)
+        if self._transport is None:
+            self._transport = AiohttpTransport(session)
+
+    @property
+    def transport(self):
+        return self._transport
+
+    @transport.setter
+    def transport(self, transport):
+        self._transport = transport
+
+    async def close(self):
+        """
+        关闭 transport 释放连接
+        """
+        await self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _wait_rate_limit(self, endpoint):
+        if self.rate_limiter is not None:
+            app, corp = self._rate_limit_scope()
+            while True:
+                delay = self.rate_limiter.acquire(app, corp, endpoint)
+                if not delay:
+                    return
+                await asyncio.sleep(delay)
+
+    async def _request(self, method, url_or_endpoint, **kwargs):
+        request = self._prepare_request(method, url_or_endpoint, **kwargs)
+        endpoints = [protocol.request_endpoint(request)]
+        self._enter_circuits(endpoints)
+        started = None
+        try:
+            await self._wait_rate_limit(endpoints[0])
+            started = time.time()
+            result = self._handle_result(
+                await self.transport.send(request), method, request.url, request.result_processor,
+                request.top_response_key, params=request.params, data=request.data,
+                response_mode=request.response_mode, top_simplify=request.top_simplify
+            )
+        except BaseException as e:
+            self._record_result(started, endpoints, e)
+            raise
+        self._record_result(started, endpoints)
+        return result
+
+    async def _handle_pre_request(self, method, uri, kwargs):
+        return method, uri, kwargs
+
+    async def _handle_pre_top_request(self, params, uri):
+        return params, protocol.join_url(protocol.TOP_API_BASE_URL, uri)
+
+    async def _handle_request_except(self, e, func, *args, **kwargs):
+        raise e
+
+    async def _call_with_retry(self, attempt, retry, method, endpoints):
+        policy = self._get_retry_policy(retry)
+        if policy is None:
+            return await attempt()
+        state = policy.begin()
+        while True:
+            try:
+                return await attempt()
+            except Exception as e:
+                delay = state.next_delay(e, method, endpoints, getattr(self.transport, 'network_errors', ()))
+                if delay is None:
+                    raise
+                logger.warning('%s %s failed (attempt %d), retry in %.2fs: %r',
+                               method, ','.join(endpoints), state.attempts - 1, delay, e)
+            await asyncio.sleep(delay)
+
+    async def _request_attempt(self, method, uri, **kwargs):
+        method, uri_with_access_token, kwargs = await self._handle_pre_request(method, uri, kwargs)
+        return await self._request(method, uri_with_access_token, **kwargs)
+
+    async def request(self, method, uri, **kwargs):
+        retry = kwargs.pop('retry', None)
+
+        async def attempt():
+            try:
+                return await self._request_attempt(method, uri, **kwargs)
+            except DingTalkClientException as e:
+                return await self._handle_request_except(e, self._request_attempt, method, uri, **kwargs)
+
+        return await self._call_with_retry(attempt, retry, method, [uri])
+
+    async def _top_request_attempt(self, method, params=None, format_='json', v='2.0',
+                                   simplify=None, partner_id=None, url=None, **kwargs):
+        simplify = protocol.top_simplify(simplify, self.top_simplify)
+        template = protocol.top_template(method, format_, v, simplify, partner_id)
+        reqparams = protocol.top_params(method, params, codec=self.codec, template=template)
+        base_url = url or '/router/rest'
+
+        reqparams, base_url = await self._handle_pre_top_request(reqparams, base_url)
+
+        return await self._request(
+            'POST', base_url, params=reqparams, top_response_key=template.response_key,
+            top_simplify=format_ == 'json' and simplify == 'true', **kwargs
+        )
+
+    async def top_request(self, method, params=None, format_='json', v='2.0',
+                          simplify=None, partner_id=None, url=None, **kwargs):
+        """
+        top 接口请求
+
+        :param method: API接口名称。
+        :param params: 请求参数 （dict 格式）
+        :param format_: 响应格式（默认json，如果使用xml，需要自己对返回结果解析）
+        :param v: API协议版本，可选值：2.0。
+        :param simplify: 是否采用精简JSON返回格式，默认为客户端的 top_simplify
+        :param partner_id: 合作伙伴身份标识。
+        :param url: 请求url，默认为 https://eco.taobao.com/router/rest
+        :param retry: 本次请求的重试策略（RetryPolicy），为 False 时不重试，默认为客户端的 retry_policy
+        """
+        retry = kwargs.pop('retry', None)
+        args = (method, params, format_, v, simplify, partner_id, url)
+
+        async def attempt():
+            try:
+                return await self._top_request_attempt(*args, **kwargs)
+            except DingTalkClientException as e:
+                return await self._handle_request_except(e, self._top_request_attempt, *args, **kwargs)
+
+        return await self._call_with_retry(attempt, retry, 'POST', [method])
+
+    def top_batch(self, format_='json', v='2.0', simplify=None, partner_id=None, url=None, max_size=20):
+        """
+        top 批量请求，参见 AsyncTopBatch
+        """
+        return AsyncTopBatch(self, format_, v, simplify, partner_id, url, max_size)
+
+    async def _top_batch_attempt(self, calls, format_='json', v='2.0', simplify=None, partner_id=None, url=None):
+        simplify = protocol.top_simplify(simplify, self.top_simplify)
+        reqparams = protocol.top_batch_params(format_, v, simplify, partner_id)
+        reqparams, base_url = await self._handle_pre_top_request(reqparams, url or '/router/batch')
+        request = self._prepare_top_batch_request(calls, format_, v, simplify, reqparams, base_url)
+        endpoints = [call.method for call in calls]
+        self._enter_circuits(endpoints)
+        started = None
+        try:
+            for endpoint in endpoints:
+                await self._wait_rate_limit(endpoint)
+            started = time.time()
+            results = self._handle_top_batch_result(await self.transport.send(request), request, calls)
+        except BaseException as e:
+            self._record_result(started, endpoints, e)
+            raise
+        self._record_result(started, endpoints, results=results)
+        return results
+
+    async def _top_batch_request(self, calls, format_='json', v='2.0', simplify=None, partner_id=None, url=None):
+        args = (calls, format_, v, simplify, partner_id, url)
+
+        async def attempt():
+            try:
+                return await self._top_batch_attempt(*args)
+            except DingTalkClientException as e:
+                return await self._handle_request_except(e, self._top_batch_attempt, *args)
+
+        return await self._call_with_retry(attempt, None, 'POST', [call.method for call in calls])
+
+    async def _fetch_token(self, cache_item, fetch, value_key):
+        """
+        缓存失效时同一事件循环内只有一个 coroutine 调用 fetch 刷新，其余等待复用结果
+        """
+        token = cache_item.get()
+        if token is None:
+            flight_key = (id(cache_item.cache.storage), cache_item.key_name(None))
+            token = await _token_flight.do(flight_key, self._refresh_token, cache_item, fetch, value_key)
+        return token
+
+    async def _refresh_token(self, cache_item, fetch, value_key):
+        lock = cache_item.lock(ttl=self.TOKEN_LOCK_TTL)
+        deadline = time.time() + self.TOKEN_LOCK_TIMEOUT
+        while True:
+            token = cache_item.get()
+            if token is not None:
+                return token
+            if lock.acquire(blocking=False):
+                try:
+                    token = cache_item.get()
+                    if token is not None:
+                        return token
+                    return self._store_token(cache_item, await fetch(), value_key)
+                finally:
+                    lock.release()
+            if time.time() >= deadline:
+                logger.warning('wait for token refresh lock timeout: %s', lock.key)
+                return self._store_token(cache_item, await fetch(), value_key)
+            await asyncio.sleep(self.TOKEN_LOCK_INTERVAL)
+
+    async def renew_token(self, name, fraction=0.8):
+        cache_item, fetch, value_key, lease_key = self._renew_lease_key(name)
+        if not self.storage.add(lease_key, 1, self.TOKEN_LOCK_TTL):
+            return None
+        try:
+            ret = await fetch()
+        except Exception:
+            self.storage.delete(lease_key)
+            raise
+        self._store_token(cache_item, ret, value_key)
+        interval = max(1, int(ret.get('expires_in', 7200) * fraction))
+        self.storage.set(lease_key, 1, interval)
+        return interval
+
+    def start_token_refresher(self, names=None, fraction=0.8):
+        """
+        在当前事件循环中启动续期任务，在 expires_in 的 fraction 比例时主动续期令牌
+
+        :return: AsyncTokenRefresher，可 ``await refresher.stop()`` 停止
+        """
+        refresher = AsyncTokenRefresher(fraction)
+        refresher.add(self, names)
+        refresher.start()
+        return refresher
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+from dingtalk.client.batch import TopBatch
+
+
+class AsyncTopBatch(TopBatch):
+    """
+    asyncio 版 TopBatch，需 ``await batch.execute()`` 获取结果
+    """
+
+    async def execute(self):
+        results = []
+        for calls in self._pop_chunks():
+            results.extend(await self._send(calls))
+        return results
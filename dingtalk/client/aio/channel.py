@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import time
+
+from dingtalk.client.aio.base import AsyncClientMixin
+from dingtalk.client.channel import ChannelClient, SecretChannelClient
+from dingtalk.core.utils import DingTalkSigner, random_string
+
+
+class AsyncChannelClient(AsyncClientMixin, ChannelClient):
+
+    @property
+    def channel_token(self):
+        """
+        返回 coroutine，需 ``await client.channel_token`` 获取
+        """
+        return self._fetch_token(self.cache.channel_token, self.get_channel_token, 'access_token')
+
+    @property
+    def channel_jsapi_ticket(self):
+        """
+        返回 coroutine，需 ``await client.channel_jsapi_ticket`` 获取
+        """
+        return self._fetch_token(self.cache.jsapi_ticket, self.get_channel_jsapi_ticket, 'ticket')
+
+    async def get_jsapi_params(self, url, noncestr=None, timestamp=None):
+        if not noncestr:
+            noncestr = random_string()
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        data = [
+            'noncestr={noncestr}'.format(noncestr=noncestr),
+            'jsapi_ticket={ticket}'.format(ticket=await self.channel_jsapi_ticket),
+            'timestamp={timestamp}'.format(timestamp=timestamp),
+            'url={url}'.format(url=url),
+        ]
+        signer = DingTalkSigner(delimiter=b'&')
+        signer.add_data(*data)
+
+        ret = {
+            'corpId': self.corp_id,
+            'timeStamp': timestamp,
+            'nonceStr': noncestr,
+            'signature': signer.signature
+        }
+        return ret
+
+    async def _handle_pre_request(self, method, uri, kwargs):
+        if 'access_token=' in uri or 'access_token' in kwargs.get('params', {}):
+            raise ValueError("access_token: " + uri)
+        uri = '%s%saccess_token=%s' % (uri, '&' if '?' in uri else '?', await self.channel_token)
+        return method, uri, kwargs
+
+    async def _handle_request_except(self, e, func, *args, **kwargs):
+        if e.errcode in (33001, 40001, 42001, 40014):
+            self.cache.channel_token.delete()
+            if self.auto_retry:
+                return await func(*args, **kwargs)
+        raise e
+
+
+class AsyncSecretChannelClient(AsyncChannelClient, SecretChannelClient):
+    pass
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import asyncio
+
+
+async def gather(controller, func, iterable, return_exceptions=False):
+    """
+    asyncio 版 AIMDController.map，同时执行的 coroutine 数量不超过 controller 当前的 limit::
+
+        users = await gather(controller, client.user.get, userids)
+
+    :param controller: AIMDController
+    :param func: 接收单个参数、返回 coroutine 的函数
+    :param iterable: 参数列表
+    :param return_exceptions: 为 True 时失败的任务在结果中返回异常，否则抛出第一个异常
+    :return: 与参数顺序一致的结果列表
+    """
+    items = list(iterable)
+    results = [None] * len(items)
+    pending = list(reversed(list(enumerate(items))))
+    running = {}
+    failed = []
+    while pending or running:
+        while pending and len(running) < controller.limit:
+            index, item = pending.pop()
+            running[asyncio.ensure_future(func(item))] = index
+        done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            index = running.pop(task)
+            if task.exception() is not None:
+                results[index] = task.exception()
+                failed.append(index)
+            else:
+                results[index] = task.result()
+        if failed and not return_exceptions:
+            for task in running:
+                task.cancel()
+            raise results[min(failed)]
+    return results
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import logging
+
+from dingtalk.client.aio import AsyncDingTalkClient
+from dingtalk.client.aio.base import AsyncClientMixin
+from dingtalk.client.aio.channel import AsyncChannelClient
+from dingtalk.client.isv import ISVClient, ISVDingTalkClient, ISVChannelClient
+from dingtalk.core.constants import ResponseMode, SuitePushType
+from dingtalk.core.utils import to_text, json_loads
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncISVDingTalkClient(AsyncDingTalkClient, ISVDingTalkClient):
+
+    async def close(self):
+        pass
+
+
+class AsyncISVChannelClient(AsyncChannelClient, ISVChannelClient):
+
+    async def close(self):
+        pass
+
+
+class AsyncISVClient(AsyncClientMixin, ISVClient):
+    """
+    asyncio 版 ISVClient，企业客户端共享本客户端的 transport
+    """
+
+    @property
+    def suite_access_token(self):
+        """
+        返回 coroutine，需 ``await client.suite_access_token`` 获取
+        """
+        return self._fetch_token(self.cache.suite_access_token, self.get_suite_access_token, 'suite_access_token')
+
+    async def _handle_pre_request(self, method, uri, kwargs):
+        if 'suite_access_token=' in uri or 'suite_access_token' in kwargs.get('params', {}):
+            raise ValueError("suite_access_token: " + uri)
+        uri = '%s%ssuite_access_token=%s' % (uri, '&' if '?' in uri else '?', await self.suite_access_token)
+        return method, uri, kwargs
+
+    async def _handle_request_except(self, e, func, *args, **kwargs):
+        if e.errcode in (33001, 40001, 42001, 40014):
+            self.cache.suite_access_token.delete()
+            if self.auto_retry:
+                return await func(*args, **kwargs)
+        raise e
+
+    def _create_dingtalk_client(self, corp_id):
+        return AsyncISVDingTalkClient(corp_id, self)
+
+    def _create_channel_client(self, corp_id):
+        return AsyncISVChannelClient(corp_id, self)
+
+    async def proc_message(self, message):
+        if not isinstance(message, dict):
+            return
+        event_type = message.get('EventType', None)
+        if event_type == SuitePushType.TMP_AUTH_CODE.value:
+            auth_code = message.get('AuthCode')
+            permanent_code_data = await self.get_permanent_code(auth_code)
+            message['__permanent_code_data'] = permanent_code_data
+            return
+        return super(AsyncISVClient, self).proc_message(message)
+
+    async def parse_message(self, msg, signature, timestamp, nonce):
+        message = self.crypto.decrypt_message(msg, signature, timestamp, nonce)
+        try:
+            message = json_loads(to_text(message))
+            await self.proc_message(message)
+        except Exception as e:
+            logger.error("proc_message error %s %s", message, e)
+        return message
+
+    async def get_permanent_code(self, tmp_auth_code):
+        """
+        获取企业授权的永久授权码
+
+        :param tmp_auth_code: 回调接口（tmp_auth_code）获取的临时授权码
+        :return:
+        """
+        permanent_code_data = await self.post(
+            '/service/get_permanent_code',
+            {'tmp_auth_code': tmp_auth_code},
+            response_mode=ResponseMode.OBJECT
+        )
+        self._handle_permanent_code(permanent_code_data)
+        return permanent_code_data
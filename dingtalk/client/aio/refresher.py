@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import asyncio
+import time
+
+from dingtalk.client.refresher import BaseTokenRefresher
+
+
+class AsyncTokenRefresher(BaseTokenRefresher):
+    """
+    asyncio 版 TokenRefresher，在事件循环中以 Task 方式运行
+    """
+
+    def __init__(self, fraction=0.8, check_interval=60, retry_interval=30):
+        super(AsyncTokenRefresher, self).__init__(fraction, check_interval, retry_interval)
+        self._task = None
+        self._wakeup = None
+
+    def add(self, client, names=None):
+        super(AsyncTokenRefresher, self).add(client, names)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run_pending(self):
+        """
+        执行到期的续期任务
+        """
+        for client, name in self._pop_due(time.time()):
+            try:
+                delay = self._next_delay(await client.renew_token(name, self.fraction))
+            except Exception:
+                self._log_error(client, name)
+                delay = self.retry_interval
+            self._push(time.time() + delay, client, name)
+
+    async def _run(self):
+        while True:
+            next_run = self.next_run
+            timeout = None if next_run is None else next_run - time.time()
+            if timeout is None or timeout > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            await self.run_pending()
+
+    def start(self):
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import asyncio
+import logging
+
+import aiohttp
+import six
+
+from dingtalk.client.transport import MockTransport, RequestsTransport, _to_response
+from dingtalk.core.protocol import DingTalkResponse
+
+logger = logging.getLogger(__name__)
+
+
+class AiohttpTransport(object):
+    """
+    基于 aiohttp.ClientSession 的 asyncio transport
+
+    未提供 session 时在首次请求时按连接池配置创建，需调用 ``close`` 释放
+    """
+
+    DEFAULT_PREWARM_URLS = RequestsTransport.DEFAULT_PREWARM_URLS
+
+    network_errors = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+    def __init__(self, session=None, limit=100, limit_per_host=0, keep_alive=True, keepalive_timeout=15):
+        """
+        :param session: 自定义 aiohttp.ClientSession，提供时忽略连接池配置
+        :param limit: 连接池最大连接数，0 为不限制
+        :param limit_per_host: 每个 host 最大连接数，0 为不限制
+        :param keep_alive: 是否复用连接
+        :param keepalive_timeout: 空闲连接保持时间（秒）
+        """
+        self._session = session
+        self._own_session = session is None
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keep_alive = keep_alive
+        self.keepalive_timeout = keepalive_timeout
+
+    def _create_session(self):
+        if self.keep_alive:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit, limit_per_host=self.limit_per_host, keepalive_timeout=self.keepalive_timeout
+            )
+        else:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit, limit_per_host=self.limit_per_host, force_close=True
+            )
+        return aiohttp.ClientSession(connector=connector)
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+            self._own_session = True
+        return self._session
+
+    async def prewarm(self, urls=None, connections=1, timeout=5):
+        """
+        预先建立连接（TCP 及 TLS 握手），失败时忽略
+
+        :param urls: 需要预热的地址，默认为 oapi.dingtalk.com 及 eco.taobao.com
+        :param connections: 每个地址建立的连接数
+        :param timeout: 超时时间（秒）
+        """
+        urls = urls or self.DEFAULT_PREWARM_URLS
+
+        async def _head(url):
+            try:
+                async with self.session.head(url, timeout=aiohttp.ClientTimeout(total=timeout)) as res:
+                    await res.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning('prewarm %s failed: %s', url, e)
+
+        await asyncio.gather(*[_head(url) for url in urls for _ in range(max(1, connections))])
+
+    @staticmethod
+    def _prepare_params(params):
+        ret = {}
+        for key, value in params.items():
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                value = six.text_type(value)
+            ret[key] = value
+        return ret
+
+    @staticmethod
+    def _prepare_files(files, data):
+        form = aiohttp.FormData()
+        if isinstance(data, dict):
+            for key, value in data.items():
+                form.add_field(key, six.text_type(value))
+        for name, value in files.items():
+            if isinstance(value, (tuple, list)):
+                filename, fileobj = value[0], value[1]
+                form.add_field(name, fileobj, filename=filename)
+            else:
+                form.add_field(name, value)
+        return form
+
+    async def send(self, request):
+        kwargs = dict(request.extra)
+        data = request.data
+        if request.files:
+            data = self._prepare_files(request.files, data)
+        if request.timeout is not None:
+            kwargs['timeout'] = aiohttp.ClientTimeout(total=request.timeout)
+        async with self.session.request(
+            method=request.method,
+            url=request.url,
+            params=self._prepare_params(request.params),
+            data=data,
+            headers=request.headers or None,
+            **kwargs
+        ) as res:
+            content = await res.read()
+        return DingTalkResponse(res.status, content, res.headers, request=res.request_info, raw=res)
+
+    async def close(self):
+        if self._own_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class AsyncMockTransport(MockTransport):
+    """
+    asyncio 版 MockTransport，handler 可为普通函数或 coroutine 函数
+    """
+
+    async def send(self, request):
+        if self.record:
+            self.requests.append(request)
+        ret = self.handler(request)
+        if hasattr(ret, '__await__'):
+            ret = await ret
+        return _to_response(request, ret)
+
+    async def close(self):
+        pass
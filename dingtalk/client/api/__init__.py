@@ -18,5 +18,6 @@ from dingtalk.client.api.message import Message  # NOQA
 from dingtalk.client.api.microapp import MicroApp  # NOQA
 from dingtalk.client.api.report import Report  # NOQA
 from dingtalk.client.api.role import Role  # NOQA
+from dingtalk.client.api.top import TopAPI  # NOQA
 from dingtalk.client.api.user import User  # NOQA
 from dingtalk.client.api.workrecord import WorkRecord  # NOQA
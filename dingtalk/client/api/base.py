@@ -1,13 +1,35 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 
+import importlib
+
+from dingtalk.core.utils import descriptor_name
+
 
 class DingTalkBaseAPI(object):
+    """
+    API 基类
+
+    作为客户端类属性声明时为描述符，客户端实例首次访问时才创建绑定该实例的 API 对象
+    """
 
     API_BASE_URL = None
 
     def __init__(self, client=None):
         self._client = client
+        self._name = None
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def __get__(self, instance, owner):
+        if instance is None or self._client is not None:
+            return self
+        if self._name is None:
+            self._name = descriptor_name(self, owner)
+        api = type(self)(instance)
+        instance.__dict__[self._name] = api
+        return api
 
     def _get(self, url, params=None, **kwargs):
         if self.API_BASE_URL:
@@ -20,7 +42,7 @@ class DingTalkBaseAPI(object):
         return self._client.post(url, data, params, **kwargs)
 
     def _top_request(self, method, params=None, format_='json', v='2.0',
-                     simplify='false', partner_id=None, url=None, **kwargs):
+                     simplify=None, partner_id=None, url=None, **kwargs):
         if self.API_BASE_URL:
             kwargs['api_base_url'] = self.API_BASE_URL
         return self._client.top_request(method, params, format_, v, simplify, partner_id, url, **kwargs)
@@ -28,3 +50,33 @@ class DingTalkBaseAPI(object):
     @property
     def corp_id(self):
         return self._client.corp_id
+
+
+class LazyAPI(object):
+    """
+    延迟加载的 API 描述符，首次访问时才导入所在模块并绑定到客户端
+
+    :param class_name: API 类名
+    :param module: API 类所在模块
+    """
+
+    def __init__(self, class_name, module='dingtalk.client.api.taobao'):
+        self.class_name = class_name
+        self.module = module
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    @property
+    def api_class(self):
+        return getattr(importlib.import_module(self.module), self.class_name)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        if self.name is None:
+            self.name = descriptor_name(self, owner)
+        api = self.api_class(instance)
+        instance.__dict__[self.name] = api
+        return api
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+from dingtalk.client.api.base import LazyAPI
+
+
+class LazyTaobaoMixin(object):
+    """
+    淘宝接口集合，与 dingtalk.client.api.taobao.TaobaoMixin 相同
+    各接口在首次访问时才导入 dingtalk.client.api.taobao 模块
+    """
+
+    tbdingding = LazyAPI('TbDingDing')
+    tbyonghu = LazyAPI('TbYongHu')
+    tbleimu = LazyAPI('TbLeiMu')
+    tbshangpin = LazyAPI('TbShangPin')
+    tbjiaoyi = LazyAPI('TbJiaoYi')
+    tbpingjia = LazyAPI('TbPingJia')
+    tbwuliu = LazyAPI('TbWuLiu')
+    tbdianpu = LazyAPI('TbDianPu')
+    tbfenxiao = LazyAPI('TbFenXiao')
+    tbwangwang = LazyAPI('TbWangWang')
+    tbtaobaoke = LazyAPI('TbTaoBaoKe')
+    tbgongju = LazyAPI('TbGongJu')
+    tbwuliubao = LazyAPI('TbWuLiuBao')
+    tbzhitongche = LazyAPI('TbZhiTongChe')
+    tbjipiao = LazyAPI('TbJiPiao')
+    tbonsxiaoxifuwu = LazyAPI('TbONSXiaoXiFuWu')
+    tbyingxiao = LazyAPI('TbYingXiao')
+    tbshuju = LazyAPI('TbShuJu')
+    tbjiudian = LazyAPI('TbJiuDian')
+    tbjuhuasuan = LazyAPI('TbJuHuaSuan')
+    tbdianpuhuiyuanguanli = LazyAPI('TbDianPuHuiYuanGuanLi')
+    tbtaodiandianwaimai = LazyAPI('TbTaoDianDianWaiMai')
+    tbduomeitipingtai = LazyAPI('TbDuoMeiTiPingTai')
+    tbzizhanghaoguanli = LazyAPI('TbZiZhangHaoGuanLi')
+    tbfuwupingtai = LazyAPI('TbFuWuPingTai')
+    tbtuikuan = LazyAPI('TbTuiKuan')
+    tbzhijianpinkong = LazyAPI('TbZhiJianPinKong')
+    tbguanliantuijian = LazyAPI('TbGuanLianTuiJian')
+    tbtianmaofuwushangpin = LazyAPI('TbTianMaoFuWuShangPin')
+    tbtianmaojingpinku = LazyAPI('TbTianMaoJingPinKu')
+    tbjushita = LazyAPI('TbJuShiTa')
+    tbdianziwuliu = LazyAPI('TbDianZiWuLiu')
+    tbcaipiao = LazyAPI('TbCaiPiao')
+    tbzhangwu = LazyAPI('TbZhangWu')
+    tbpaimai = LazyAPI('TbPaiMai')
+    tbqianniujiekou = LazyAPI('TbQianNiuJieKou')
+    tbxiaoxifuwu = LazyAPI('TbXiaoXiFuWu')
+    tbbendishenghuo = LazyAPI('TbBenDiShengHuo')
+    tbaliyunocs = LazyAPI('TbALiYunOcs')
+    tbyunos = LazyAPI('TbYunOS')
+    tbaliyun = LazyAPI('TbALiYun')
+    tbhuochepiao = LazyAPI('TbHuoChePiao')
+    tbtae = LazyAPI('TbTAE')
+    tbtanx = LazyAPI('TbTanx')
+    tbshoutaokaifang = LazyAPI('TbShouTaoKaiFang')
+    tbjae = LazyAPI('TbJAE')
+    tbbaodian = LazyAPI('TbBaoDian')
+    tbjaezujian = LazyAPI('TbJAEZuJian')
+    tbtianmaohuiyuanjifen = LazyAPI('TbTianMaoHuiYuanJiFen')
+    tbqichepiao = LazyAPI('TbQiChePiao')
+    tbmashangtao = LazyAPI('TbMaShangTao')
+    tbyouxijilipingtai = LazyAPI('TbYouXiJiLiPingTai')
+    tbtaobaochoujiangpingtai = LazyAPI('TbTaoBaoChouJiangPingTai')
+    tbtianmaoguoji = LazyAPI('TbTianMaoGuoJi')
+    tbsifapaimai = LazyAPI('TbSiFaPaiMai')
+    tbxiami = LazyAPI('TbXiaMi')
+    tbtianmaohudongjiekou = LazyAPI('TbTianMaoHuDongJieKou')
+    tbdmp = LazyAPI('TbDMP')
+    tbshenghuofuwu = LazyAPI('TbShengHuoFuWu')
+    tbshoujitaobao = LazyAPI('TbShouJiTaoBao')
+    tbwulian = LazyAPI('TbWuLian')
+    tbhanglv = LazyAPI('TbHangLv')
+    tbjiudiandaogou = LazyAPI('TbJiuDianDaoGou')
+    tbbaoxian = LazyAPI('TbBaoXian')
+    tbyiyaoguan = LazyAPI('TbYiYaoGuan')
+    tbtianmaomeizhuang = LazyAPI('TbTianMaoMeiZhuang')
+    tbdianzimiandan = LazyAPI('TbDianZiMianDan')
+    tbdianyingpiao = LazyAPI('TbDianYingPiao')
+    tbalitongxin = LazyAPI('TbALiTongXin')
+    tbtvyouxi = LazyAPI('TbTVYouXi')
+    tbopenim = LazyAPI('TbOpenim')
+    tbanquanpingce = LazyAPI('TbAnQuanPingCe')
+    tbdsp = LazyAPI('TbDSP')
+    tbalichelianwang = LazyAPI('TbALiCheLianWang')
+    tbzuanzhan = LazyAPI('TbZuanZhan')
+    tbxuniyuanxian = LazyAPI('TbXuNiYuanXian')
+    tbzhishiku = LazyAPI('TbZhiShiKu')
+    tbfanqizhafengkong = LazyAPI('TbFanQiZhaFengKong')
+    tbguojizhanwaimaozhitongche = LazyAPI('TbGuoJiZhanWaiMaoZhiTongChe')
+    tbtianmaofuwushuju = LazyAPI('TbTianMaoFuWuShuJu')
+    tbzhinengshebei = LazyAPI('TbZhiNengSheBei')
+    tbbaichuan = LazyAPI('TbBaiChuan')
+    tbwenbensuanfa = LazyAPI('TbWenBenSuanFa')
+    tbbaichuantuisong = LazyAPI('TbBaiChuanTuiSong')
+    tbguojizhanshangpin = LazyAPI('TbGuoJiZhanShangPin')
+    tbtaobaoyouxi = LazyAPI('TbTaoBaoYouXi')
+    tbjuanquan = LazyAPI('TbJuAnQuan')
+    tbmiaojie = LazyAPI('TbMiaoJie')
+    tbcainiaopeisong = LazyAPI('TbCaiNiaoPeiSong')
+    tbcainiaocangpei = LazyAPI('TbCaiNiaoCangPei')
+    tbwangshangfatingduiwai = LazyAPI('TbWangShangFaTingDuiWai')
+    tbwudaokou = LazyAPI('TbWuDaoKou')
+    tbalidayu = LazyAPI('TbALiDaYu')
+    tbtaobaoneirong = LazyAPI('TbTaoBaoNeiRong')
+    tblvxingyongche = LazyAPI('TbLvXingYongChe')
+    tbmenpiaoshangpinguanli = LazyAPI('TbMenPiaoShangPinGuanLi')
+    tbcainiaowuxian = LazyAPI('TbCaiNiaoWuXian')
+    tbqimencangchu = LazyAPI('TbQiMenCangChu')
+    tbyunostuisongfuwuapi = LazyAPI('TbYunosTuiSongFuWuApi')
+    tbshenghuohui = LazyAPI('TbShengHuoHui')
+    tbtvzhifu = LazyAPI('TbTvZhiFu')
+    tbyunosid2 = LazyAPI('TbYunOSID2')
+    tbcainiaojihuo = LazyAPI('TbCaiNiaoJiHuo')
+    tbdidongyi = LazyAPI('TbDiDongYi')
+    tbalijiankangyao = LazyAPI('TbALiJianKangYao')
+    tbshoutaofenxiang = LazyAPI('TbShouTaoFenXiang')
+    tbfawususongduiwai = LazyAPI('TbFaWuSuSongDuiWai')
+    tbdujiashangpinguanli = LazyAPI('TbDuJiaShangPinGuanLi')
+    tbjiudianshangpin = LazyAPI('TbJiuDianShangPin')
+    tbjiudianzaixianyuding = LazyAPI('TbJiuDianZaiXianYuDing')
+    tbjiudianguanwangxinyongzhu = LazyAPI('TbJiuDianGuanWangXinYongZhu')
+    tbjiudianxianxiaxinyongzhu = LazyAPI('TbJiuDianXianXiaXinYongZhu')
+    tbquanqudao = LazyAPI('TbQuanQuDao')
+    tbguojijipiaozhengce = LazyAPI('TbGuoJiJiPiaoZhengCe')
+    tbguojijipiaodingdan = LazyAPI('TbGuoJiJiPiaoDingDan')
+    tbguoneijipiaodingdan = LazyAPI('TbGuoNeiJiPiaoDingDan')
+    tbguoneijipiaojinghang = LazyAPI('TbGuoNeiJiPiaoJingHang')
+    tbdujiamenpiaojiaoyiguanli = LazyAPI('TbDuJiaMenPiaoJiaoYiGuanLi')
+    tbalitiyu = LazyAPI('TbALiTiYu')
+    tbdianzifapiao = LazyAPI('TbDianZiFaPiao')
+    tbguojizhanshujuguanjia = LazyAPI('TbGuoJiZhanShuJuGuanJia')
+    tbtmallcarcenter = LazyAPI('TbTmallcarcenter')
+    tbyunosaccount = LazyAPI('TbYunosAccount')
+    tbcainiaoguoguo = LazyAPI('TbCaiNiaoGuoGuo')
+    tbdujiaqianzhengguanli = LazyAPI('TbDuJiaQianZhengGuanLi')
+    tbaliyinyueyinyuejiaoyi = LazyAPI('TbALiYinYueYinYueJiaoYi')
+    tbaliyinyueyunyinghuodong = LazyAPI('TbALiYinYueYunYingHuoDong')
+    tbcainiaonongcunwuliu = LazyAPI('TbCaiNiaoNongCunWuLiu')
+    tbtijianjigou = LazyAPI('TbTiJianJiGou')
+    tb1688tuike = LazyAPI('Tb1688TuiKe')
+    tbshanghu = LazyAPI('TbShangHu')
+    tbzhuomian = LazyAPI('TbZhuoMian')
+    tbdiandongche = LazyAPI('TbDianDongChe')
+    tbzhengfuxietong = LazyAPI('TbZhengFuXieTong')
+    tbxinlingshou = LazyAPI('TbXinLingShou')
+    tbscm = LazyAPI('TbSCM')
+    tbbaichuanctg = LazyAPI('TbBaiChuanCtg')
+    tbhuijin = LazyAPI('TbHuiJin')
+    tbshuyumeizishuchu = LazyAPI('TbShuYuMeiZiShuChu')
+    tbshanglv = LazyAPI('TbShangLv')
+    tbzhinengpos = LazyAPI('TbZhiNengPOS')
+    tblingshouplus = LazyAPI('TbLingShouPlus')
+    tbtianmaomendian = LazyAPI('TbTianMaoMenDian')
+    tbailabtuxiangsuanfa = LazyAPI('TbAILABTuXiangSuanFa')
+    tbtianmaogongyinglian = LazyAPI('TbTianMaoGongYingLian')
+    tbhuanxingkaifapingtai = LazyAPI('TbHuanXingKaiFaPingTai')
+    tbkuajing = LazyAPI('TbKuaJing')
+    tbyingkesongpaizhaoshenhejiekou = LazyAPI('TbYingKeSongPaiZhaoShenHeJieKou')
+    tbioti = LazyAPI('TbIoTI')
+    tbtaobaokaquanpingtai = LazyAPI('TbTaoBaoKaQuanPingTai')
+    tbzhihuimendian = LazyAPI('TbZhiHuiMenDian')
+    tbxianyu = LazyAPI('TbXianYu')
+    tbkucun = LazyAPI('TbKuCun')
+    tbyunosguanggao = LazyAPI('TbYunOSGuangGao')
+    tbqimenposjiekou = LazyAPI('TbQiMenPOSJieKou')
+    tbalijiankangzhuisuma = LazyAPI('TbALiJianKangZhuiSuMa')
+    tbhuiyuanzhongxin = LazyAPI('TbHuiYuanZhongXin')
+    tbalijiankanghuiyuanguanli = LazyAPI('TbALiJianKangHuiYuanGuanLi')
+    tbpinxiao = LazyAPI('TbPinXiao')
+    tbxiaomi = LazyAPI('TbXiaoMi')
+    tbdamaipiaowuyunfenxiao = LazyAPI('TbDaMaiPiaoWuYunFenXiao')
+    tbtianmaojinglingkaifang = LazyAPI('TbTianMaoJingLingKaiFang')
+    tbzhihuiyuanqu = LazyAPI('TbZhiHuiYuanQu')
+    tbjiudianhuiyuan = LazyAPI('TbJiuDianHuiYuan')
+    tbdamai = LazyAPI('TbDaMai')
+    tbpinpaihaoapi = LazyAPI('TbPinPaiHaoApi')
+    tbhuanhuo = LazyAPI('TbHuanHuo')
+    tbshangjiayingxiaozhongxin = LazyAPI('TbShangJiaYingXiaoZhongXin')
+    tbicburfq = LazyAPI('TbICBURFQ')
+    tbicbuxinbao = LazyAPI('TbICBUXinBao')
+    tbfeizhupoishuju = LazyAPI('TbFeiZhuPOIShuJu')
+    tbfeizhuxingzhengquhua = LazyAPI('TbFeiZhuXingZhengQuHua')
+    tbfensipa = LazyAPI('TbFenSiPa')
+    tblingshouzhongduan = LazyAPI('TbLingShouZhongDuan')
+    tbaliosyingyongzhongxin = LazyAPI('TbALiOSYingYongZhongXin')
+    tbb2brenzhengpingtaiapi = LazyAPI('TbB2bRenZhengPingTaiApi')
+    tbqiyeyunyingpingtaijituancaiwu = LazyAPI('TbQiYeYunYingPingTaiJiTuanCaiWu')
+    tbrarhuiliu = LazyAPI('TbRARHuiLiu')
+    tblingshoutongzhinengposkaifang = LazyAPI('TbLingShouTongZhiNengPOSKaiFang')
+    tbalibabagongyinglianpingtai = LazyAPI('TbALiBaBaGongYingLianPingTai')
+    tbtianmaoxinlingshou = LazyAPI('TbTianMaoXinLingShou')
+    tbdpaas = LazyAPI('TbDPAAS')
+    tbaliyingyeyunzhi = LazyAPI('TbALiYingYeYunZhi')
+    tbqudaozhongxin = LazyAPI('TbQuDaoZhongXin')
+    tbalijiankangyimiao = LazyAPI('TbALiJianKangYiMiao')
+    tbjiaoyuzhanghao = LazyAPI('TbJiaoYuZhangHao')
+    tbyonghuzengzhang = LazyAPI('TbYongHuZengZhang')
+    tbaegongyinglian = LazyAPI('TbAEGongYingLian')
+    tbhudongba = LazyAPI('TbHuDongBa')
+    tbfeizhujipiaoqiantaileimu = LazyAPI('TbFeiZhuJiPiaoQianTaiLeiMu')
+    tbpingtaizhili = LazyAPI('TbPingTaiZhiLi')
+    tbxiamikaifangpingtai = LazyAPI('TbXiaMiKaiFangPingTai')
+    tbalijiankangyisheng = LazyAPI('TbALiJianKangYiSheng')
+    tbfeizhujiudianbiaozhunku = LazyAPI('TbFeiZhuJiuDianBiaoZhunKu')
+    tbaedropshipper = LazyAPI('TbAEDropshipper')
+    tbxinxipingtaicaigou = LazyAPI('TbXinXiPingTaiCaiGou')
+    tblingshoutongzidongshouhuoji = LazyAPI('TbLingShouTongZiDongShouHuoJi')
+    tbottzhifu = LazyAPI('TbOttZhiFu')
+    tbtianmaoqiche = LazyAPI('TbTianMaoQiChe')
+    tbaliosguanggaopingtai = LazyAPI('TbALIOSGuangGaoPingTai')
+    tbtaobaosousuo = LazyAPI('TbTaoBaoSouSuo')
+    tbyewupingtaixinlingshou = LazyAPI('TbYeWuPingTaiXinLingShou')
+    tbshenjingyingyong = LazyAPI('TbShenJingYingYong')
+    tbaliyingyedengta = LazyAPI('TbALiYingYeDengTa')
+    tbjili = LazyAPI('TbJiLi')
+    tbyoukumeizi = LazyAPI('TbYouKuMeiZi')
+    tbyoukuwangmeng = LazyAPI('TbYouKuWangMeng')
+    tbalijiankang = LazyAPI('TbALiJianKang')
+    tbxinzhizao = LazyAPI('TbXinZhiZao')
+    tblingshoutongxiaodianzhinengshebei = LazyAPI('TbLingShouTongXiaoDianZhiNengSheBei')
+    tbyizhilushipin = LazyAPI('TbYiZhiLuShiPin')
+    tbwudaokoushangpin = LazyAPI('TbWuDaoKouShangPin')
+    tblingshoutongdingdanlvxing = LazyAPI('TbLingShouTongDingDanLvXing')
+    tbtianmaoxianxiadaping = LazyAPI('TbTianMaoXianXiaDaPing')
+    tbalijiankanghiot = LazyAPI('TbALiJianKangHIOT')
+    tbtvosyingyongshenhepingtai = LazyAPI('TbTVOSYingYongShenHePingTai')
+    tbaeoverseasolution = LazyAPI('TbAEOverseaSolution')
+    tbalijinglingjichunenglijiekou = LazyAPI('TbALiJingLingJiChuNengLiJieKou')
+    tbalijiankangxinlingshou = LazyAPI('TbALiJianKangXinLingShou')
+    tbxianyufabu = LazyAPI('TbXianYuFaBu')
+    tbrengongzhinengshiyanshikaifangpingtai = LazyAPI('TbRenGongZhiNengShiYanShiKaiFangPingTai')
+    tbchengshihehuoren = LazyAPI('TbChengShiHeHuoRen')
+    tbalijiankangzhihuiyiliao = LazyAPI('TbALiJianKangZhiHuiYiLiao')
+    tbtianmaoxinpinchuangxinzhongxin = LazyAPI('TbTianMaoXinPinChuangXinZhongXin')
+    tbmozizhanghao = LazyAPI('TbMOZIZhangHao')
+    tbqinchengliwestcrm = LazyAPI('TbQinChengLiWestcrm')
+    tbicbuchuchuang = LazyAPI('TbICBUChuChuang')
+    tbhomeai = LazyAPI('TbHOMEAI')
+    tbzizhigongxiang = LazyAPI('TbZiZhiGongXiang')
+    tbyewupingtaishiyebushuiwupingtai = LazyAPI('TbYeWuPingTaiShiYeBuShuiWuPingTai')
+    tblingshoutonggonggong = LazyAPI('TbLingShouTongGongGong')
+    tbhudongxiaoyouxi = LazyAPI('TbHuDongXiaoYouXi')
+    tbalijiankangyi = LazyAPI('TbALiJianKangYi')
+    tbsifakaifangpingtai = LazyAPI('TbSiFaKaiFangPingTai')
+    tbicbushangpin = LazyAPI('TbICBUShangPin')
+    tbshoutaoyonghuzengzhang = LazyAPI('TbShouTaoYongHuZengZhang')
+    tbyunma = LazyAPI('TbYunMa')
+    tbxinlingshoupos = LazyAPI('TbXinLingShouPOS')
+    tbtianmaouxian = LazyAPI('TbTianMaoUXian')
+    tbyoukubokonghuanying = LazyAPI('TbYouKuBoKongHuanYing')
+    tbihome = LazyAPI('TbiHome')
+    tbxinxiliu = LazyAPI('TbXinXiLiu')
+    tbxinlingshougongyinglian = LazyAPI('TbXinLingShouGongYingLian')
+    tbalioszhifu = LazyAPI('TbAliOSZhiFu')
+    tbcainiaokongzhita = LazyAPI('TbCaiNiaoKongZhiTa')
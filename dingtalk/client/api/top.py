@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+按接口名称调用 top 接口，无需导入 dingtalk.client.api.taobao::
+
+    client.top.call('dingtalk.oapi.processinstance.get', process_instance_id='xxx')
+
+接口名称、参数及结果所在 key 保存在随包发布的 top_index.json 中，格式为::
+
+    {"接口名称": [["*必填参数", "可选参数", ...], "结果所在 key（可省略）"], ...}
+
+该文件由 dingtalk/client/api/taobao.py 生成，修改 taobao.py 后需重新生成::
+
+    python -m dingtalk.client.api.top
+"""
+from __future__ import absolute_import, unicode_literals
+
+import ast
+import io
+import json
+import os
+import pkgutil
+import threading
+
+from dingtalk.client.api.base import DingTalkBaseAPI
+
+INDEX_FILE = 'top_index.json'
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def load_index():
+    """
+    加载接口索引，返回接口名称到 [参数列表, 结果所在 key] 的字典
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                data = pkgutil.get_data(__name__.rpartition('.')[0], INDEX_FILE)
+                _index = json.loads(data.decode('utf-8'))
+    return _index
+
+
+def _const(node):
+    # Python 3.8 起字符串常量为 ast.Constant，之前为 ast.Str
+    name = type(node).__name__
+    if name == 'Constant':
+        return node.value
+    if name == 'Str':
+        return node.s
+    return None
+
+
+def _names(node):
+    return set(n.id for n in ast.walk(node) if isinstance(n, ast.Name))
+
+
+def _parse_method(func):
+    calls = [
+        node for node in ast.walk(func)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == '_top_request'
+    ]
+    if len(calls) != 1 or not calls[0].args:
+        return None, None
+    call = calls[0]
+    method = _const(call.args[0])
+    args = [getattr(arg, 'arg', getattr(arg, 'id', None)) for arg in func.args.args[1:]]
+    required = set(args[:len(args) - len(func.args.defaults)])
+    params = []
+    if len(call.args) > 1 and isinstance(call.args[1], ast.Dict):
+        for key, value in zip(call.args[1].keys, call.args[1].values):
+            name = _const(key)
+            params.append('*' + name if _names(value) & required else name)
+    entry = [params]
+    for keyword in call.keywords:
+        if keyword.arg == 'result_processor' and isinstance(keyword.value, ast.Lambda):
+            body = keyword.value.body
+            if isinstance(body, ast.Subscript):
+                key = body.slice
+                if type(key).__name__ == 'Index':
+                    key = key.value
+                entry.append(_const(key))
+    return method, entry
+
+
+def build_index(path=None):
+    """
+    解析 taobao.py 源码生成接口索引
+
+    :param path: taobao.py 路径，默认为 dingtalk/client/api/taobao.py
+    """
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'taobao.py')
+    with io.open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    index = {}
+    for cls in tree.body:
+        if not isinstance(cls, ast.ClassDef):
+            continue
+        for func in cls.body:
+            if isinstance(func, ast.FunctionDef):
+                method, entry = _parse_method(func)
+                if method:
+                    index[method] = entry
+    return index
+
+
+def dump_index(index):
+    return json.dumps(index, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+
+
+class TopAPI(DingTalkBaseAPI):
+    """
+    按接口名称调用 top 接口
+    """
+
+    def describe(self, method):
+        """
+        获取接口参数信息
+
+        :param method: 接口名称，如 dingtalk.oapi.processinstance.get
+        :return: {"params": 参数列表, "required": 必填参数列表, "result": 结果所在 key}
+        """
+        try:
+            entry = load_index()[method]
+        except KeyError:
+            raise ValueError('unknown top method: %s' % method)
+        return {
+            'params': [name.lstrip('*') for name in entry[0]],
+            'required': [name[1:] for name in entry[0] if name.startswith('*')],
+            'result': entry[1] if len(entry) > 1 else None,
+        }
+
+    def methods(self, prefix=''):
+        """
+        接口名称列表
+
+        :param prefix: 名称前缀，如 dingtalk.oapi.
+        """
+        return sorted(method for method in load_index() if method.startswith(prefix))
+
+    def call(self, method, **params):
+        """
+        调用 top 接口，参数名称与接口文档一致，返回结果与 dingtalk.client.api.taobao 中对应方法一致
+
+        :param method: 接口名称，如 dingtalk.oapi.processinstance.get
+        :param params: 接口参数
+        """
+        entry = self.describe(method)
+        unknown = set(params) - set(entry['params'])
+        if unknown:
+            raise TypeError('%s got unexpected params: %s' % (method, ', '.join(sorted(unknown))))
+        missing = [name for name in entry['required'] if name not in params]
+        if missing:
+            raise TypeError('%s missing required params: %s' % (method, ', '.join(missing)))
+        result_key = entry['result']
+        return self._top_request(
+            method,
+            params,
+            result_processor=(lambda x: x[result_key]) if result_key else None
+        )
+
+
+def main():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), INDEX_FILE)
+    with io.open(path, 'w', encoding='utf-8') as f:
+        f.write(dump_index(build_index()))
+        f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
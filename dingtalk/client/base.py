@@ -1,186 +1,397 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 
-import inspect
-import json
 import logging
-import requests
-import six
-from six.moves.urllib.parse import urljoin
-
-from dingtalk.client.api.base import DingTalkBaseAPI
-from dingtalk.core.exceptions import DingTalkClientException
-from dingtalk.core.utils import json_loads
+import time
+
+from dingtalk.client.batch import TopBatch
+from dingtalk.client.refresher import TokenRefresher
+from dingtalk.client.transport import RequestsTransport
+from dingtalk.core import protocol
+from dingtalk.core.codec import default_codec
+from dingtalk.core.constants import ResponseMode
+from dingtalk.core.exceptions import CircuitOpenException, DingTalkClientException
+from dingtalk.core.singleflight import SingleFlight
 from dingtalk.storage.memorystorage import MemoryStorage
 
 
 logger = logging.getLogger(__name__)
 
-
-def _is_api_endpoint(obj):
-    return isinstance(obj, DingTalkBaseAPI)
+_token_flight = SingleFlight()
 
 
 class BaseClient(object):
 
-    _http = requests.Session()
+    _default_transport = None
+    _default_codec = default_codec
+
+    # 默认结果格式，参见 ResponseMode，可在单次请求中通过 response_mode 参数指定
+    response_mode = ResponseMode.OBJECT
+
+    # top 接口默认是否使用精简 json 返回格式（simplify=true）
+    top_simplify = False
+
+    # 限流器，参见 RateLimiter，可在多个客户端之间共用
+    rate_limiter = None
+
+    # 并发控制器，参见 AIMDController，每次请求后反馈耗时及限流错误
+    concurrency_controller = None
+
+    # 重试策略，参见 RetryPolicy，可在单次请求中通过 retry 参数指定
+    retry_policy = None
+
+    # 熔断器，参见 CircuitBreaker，可在多个客户端之间共用
+    circuit_breaker = None
 
     API_BASE_URL = 'https://oapi.dingtalk.com/'
 
-    def __new__(cls, *args, **kwargs):
-        self = super(BaseClient, cls).__new__(cls)
-        api_endpoints = inspect.getmembers(self, _is_api_endpoint)
-        for name, api in api_endpoints:
-            api_cls = type(api)
-            api = api_cls(self)
-            setattr(self, name, api)
-        return self
+    # 令牌刷新锁的过期时间、等待其他进程刷新的最长时间及轮询间隔（秒）
+    TOKEN_LOCK_TTL = 10
+    TOKEN_LOCK_TIMEOUT = 10
+    TOKEN_LOCK_INTERVAL = 0.05
+
+    # 可主动续期的令牌，令牌名称: (缓存项名称, 获取令牌方法名称, 返回结果中令牌所在 key)
+    TOKENS = {}
 
-    def __init__(self, storage=None, timeout=None, auto_retry=True):
+    def __init__(self, storage=None, timeout=None, auto_retry=True, transport=None):
         self.storage = storage or MemoryStorage()
         self.timeout = timeout
         self.auto_retry = auto_retry
+        self._transport = transport
+        self._codec = None
 
-    def _request(self, method, url_or_endpoint, **kwargs):
-        if not url_or_endpoint.startswith(('http://', 'https://')):
-            api_base_url = kwargs.pop('api_base_url', self.API_BASE_URL)
-            url = urljoin(api_base_url, url_or_endpoint)
-        else:
-            url = url_or_endpoint
-
-        if 'params' not in kwargs:
-            kwargs['params'] = {}
-        if isinstance(kwargs.get('data', ''), dict):
-            body = json.dumps(kwargs['data'], ensure_ascii=False)
-            body = body.encode('utf-8')
-            kwargs['data'] = body
-            if 'headers' not in kwargs:
-                kwargs['headers'] = {}
-            kwargs['headers']['Content-Type'] = 'application/json'
+    @staticmethod
+    def get_default_transport():
+        """
+        未指定 transport 的客户端共用的默认 transport
+        """
+        if BaseClient._default_transport is None:
+            BaseClient._default_transport = RequestsTransport()
+        return BaseClient._default_transport
 
+    @staticmethod
+    def set_default_transport(transport):
+        """
+        设置未指定 transport 的客户端共用的默认 transport，如 RequestsTransport(pool_maxsize=100)
+        """
+        BaseClient._default_transport = transport
+
+    @property
+    def transport(self):
+        if self._transport is None:
+            return self.get_default_transport()
+        return self._transport
+
+    @transport.setter
+    def transport(self, transport):
+        self._transport = transport
+        self._codec = None
+
+    @staticmethod
+    def get_default_codec():
+        """
+        未指定 codec 的客户端共用的 json 编解码器
+        """
+        return BaseClient._default_codec
+
+    @staticmethod
+    def set_default_codec(codec):
+        """
+        设置未指定 codec 的客户端共用的 json 编解码器，如 OrjsonCodec()
+        """
+        BaseClient._default_codec = codec
+
+    @property
+    def codec(self):
+        """
+        请求体编码及响应解析使用的 json 编解码器，参见 dingtalk.core.codec
+        """
+        if self._codec is None:
+            return self.get_default_codec()
+        return self._codec
+
+    @codec.setter
+    def codec(self, codec):
+        self._codec = codec
+
+    def _prepare_request(self, method, url_or_endpoint, **kwargs):
+        api_base_url = kwargs.pop('api_base_url', self.API_BASE_URL)
         kwargs['timeout'] = kwargs.get('timeout', self.timeout)
-        result_processor = kwargs.pop('result_processor', None)
-        top_response_key = kwargs.pop('top_response_key', None)
-        res = self._http.request(
-            method=method,
-            url=url,
-            **kwargs
-        )
+        kwargs.setdefault('codec', self.codec)
+        kwargs.setdefault('response_mode', self.response_mode)
+        return protocol.prepare_request(method, url_or_endpoint, api_base_url, **kwargs)
+
+    def _rate_limit_scope(self):
+        """
+        限流维度中的 (应用, 企业)
+        """
+        return None, getattr(self, 'corp_id', None)
+
+    def _wait_rate_limit(self, endpoint):
+        if self.rate_limiter is not None:
+            app, corp = self._rate_limit_scope()
+            self.rate_limiter.wait(app, corp, endpoint)
+
+    def _enter_circuits(self, endpoints):
+        """
+        接口已熔断时抛出 CircuitOpenException，不发送请求
+        """
+        breaker = self.circuit_breaker
+        if breaker is None:
+            return
+        entered = []
         try:
-            res.raise_for_status()
-        except requests.RequestException as reqe:
-            logger.error("\n【请求地址】: %s\n【请求参数】：%s \n%s\n【异常信息】：%s",
-                         url, kwargs.get('params', ''), kwargs.get('data', ''), reqe)
-            raise DingTalkClientException(
-                errcode=None,
-                errmsg=None,
-                client=self,
-                request=reqe.request,
-                response=reqe.response
+            for endpoint in sorted(set(endpoints)):
+                breaker.before_call(endpoint)
+                entered.append(endpoint)
+        except CircuitOpenException as e:
+            self._release_circuits(entered)
+            e.client = self
+            raise
+
+    def _release_circuits(self, endpoints):
+        """
+        请求未完成（未发送或被取消、中断）时归还熔断器的试探请求名额
+        """
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            for endpoint in sorted(set(endpoints)):
+                breaker.release(endpoint)
+
+    def _record_result(self, started, endpoints, error=None, results=None):
+        """
+        将请求结果反馈给并发控制器及熔断器
+
+        :param started: 发送请求的时间，为 None 时表示请求未发送
+        :param error: 请求失败时的异常
+        :param results: top 批量请求中各个调用的结果
+        """
+        network_errors = getattr(self.transport, 'network_errors', ())
+        if started is None or (error is not None and not isinstance(error, DingTalkClientException)
+                               and not isinstance(error, network_errors)):
+            # 请求未发送，或被取消、中断（CancelledError、KeyboardInterrupt 等），不计入统计
+            self._release_circuits(endpoints)
+            return
+        errors = [error] * len(endpoints)
+        if results is not None:
+            errors = [result if isinstance(result, DingTalkClientException) else None for result in results]
+        controller = self.concurrency_controller
+        if controller is not None:
+            throttled = [e for e in errors if e is not None and controller.is_throttled(e)]
+            controller.record(time.time() - started, throttled[0] if throttled else error)
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            for endpoint, e in zip(endpoints, errors):
+                breaker.record(endpoint, e, network_errors)
+
+    def _request(self, method, url_or_endpoint, **kwargs):
+        request = self._prepare_request(method, url_or_endpoint, **kwargs)
+        endpoints = [protocol.request_endpoint(request)]
+        self._enter_circuits(endpoints)
+        started = None
+        try:
+            self._wait_rate_limit(endpoints[0])
+            started = time.time()
+            result = self._handle_result(
+                self.transport.send(request), method, request.url, request.result_processor,
+                request.top_response_key, params=request.params, data=request.data,
+                response_mode=request.response_mode, top_simplify=request.top_simplify
             )
+        except BaseException as e:
+            self._record_result(started, endpoints, e)
+            raise
+        self._record_result(started, endpoints)
+        return result
 
-        result = self._handle_result(
-            res, method, url, result_processor, top_response_key, **kwargs
-        )
+    def _handle_result(self, res, method=None, url=None, result_processor=None, top_response_key=None, **kwargs):
+        try:
+            result = protocol.handle_response(
+                res, top_response_key, result_processor, self.codec, kwargs.get('response_mode', self.response_mode),
+                kwargs.get('top_simplify', False)
+            )
+        except DingTalkClientException as e:
+            e.client = self
+            logger.error("\n【请求地址】: %s\n【请求参数】：%s \n%s\n【错误信息】：%r",
+                         url, kwargs.get('params', ''), kwargs.get('data', ''), e)
+            raise
 
         logger.debug("\n【请求地址】: %s\n【请求参数】：%s \n%s\n【响应数据】：%s",
                      url, kwargs.get('params', ''), kwargs.get('data', ''), result)
         return result
 
-    def _decode_result(self, res):
+    def _prepare_top_batch_request(self, calls, format_, v, simplify, params, url):
+        return self._prepare_request(
+            'POST', url, params=params, data=protocol.top_batch_body(calls, self.codec),
+            headers={'Content-Type': 'text/plain;charset=utf-8'},
+            top_simplify=format_ == 'json' and simplify == 'true'
+        )
+
+    def _handle_top_batch_result(self, response, request, calls):
         try:
-            result = json_loads(res.content.decode('utf-8', 'ignore'), strict=False)
-        except (TypeError, ValueError):
-            # Return origin response object if we can not decode it as JSON
-            logger.debug('Can not decode response as JSON', exc_info=True)
-            return res
-        return result
+            results = protocol.handle_top_batch_response(response, calls, self.codec, request.top_simplify)
+        except DingTalkClientException as e:
+            e.client = self
+            logger.error("\n【请求地址】: %s\n【请求参数】：%s \n%s\n【错误信息】：%r",
+                         request.url, request.params, request.data, e)
+            raise
+        for result in results:
+            if isinstance(result, DingTalkClientException):
+                result.client = self
+        logger.debug("\n【请求地址】: %s\n【请求参数】：%s \n%s\n【响应数据】：%s",
+                     request.url, request.params, request.data, results)
+        return results
 
-    def _handle_result(self, res, method=None, url=None, result_processor=None, top_response_key=None, **kwargs):
-        if not isinstance(res, dict):
-            # Dirty hack around asyncio based AsyncWeChatClient
-            result = self._decode_result(res)
-        else:
-            result = res
-
-        if not isinstance(result, dict):
-            return result
-        if top_response_key:
-            if 'error_response' in result:
-                error_response = result['error_response']
-                logger.error("\n【请求地址】: %s\n【请求参数】：%s \n%s\n【错误信息】：%s",
-                             url, kwargs.get('params', ''), kwargs.get('data', ''), result)
-                raise DingTalkClientException(
-                    error_response.get('code', -1),
-                    error_response.get('sub_msg', error_response.get('msg', '')),
-                    client=self,
-                    request=res.request,
-                    response=res
-                )
-            top_result = result
-            if top_response_key in top_result:
-                top_result = result[top_response_key]
-                if 'result' in top_result:
-                    top_result = top_result['result']
-                    if isinstance(top_result, six.string_types):
-                        try:
-                            top_result = json_loads(top_result)
-                        except Exception:
-                            pass
-            if isinstance(top_result, dict):
-                if ('success' in top_result and not top_result['success']) or (
-                        'is_success' in top_result and not top_result['is_success']):
-                    logger.error("\n【请求地址】: %s\n【请求参数】：%s \n%s\n【错误信息】：%s",
-                                 url, kwargs.get('params', ''), kwargs.get('data', ''), result)
-                    raise DingTalkClientException(
-                        top_result.get('ding_open_errcode', -1),
-                        top_result.get('error_msg', ''),
-                        client=self,
-                        request=res.request,
-                        response=res
-                    )
-            result = top_result
-        if not isinstance(result, dict):
-            return result
-        if 'errcode' in result:
-            result['errcode'] = int(result['errcode'])
-
-        if 'errcode' in result and result['errcode'] != 0:
-            errcode = result['errcode']
-            errmsg = result.get('errmsg', errcode)
-
-            logger.error("\n【请求地址】: %s\n【请求参数】：%s \n%s\n【错误信息】：%s",
-                         url, kwargs.get('params', ''), kwargs.get('data', ''), result)
-            raise DingTalkClientException(
-                errcode,
-                errmsg,
-                client=self,
-                request=res.request,
-                response=res
-            )
+    def _fetch_token(self, cache_item, fetch, value_key):
+        """
+        从缓存获取令牌，缓存失效时同一进程内只有一个线程调用 fetch 刷新，其余线程等待复用结果
+
+        :param cache_item: 令牌缓存项，如 self.cache.access_token
+        :param fetch: 获取令牌的接口方法
+        :param value_key: 接口返回结果中令牌所在 key
+        """
+        token = cache_item.get()
+        if token is None:
+            flight_key = (id(cache_item.cache.storage), cache_item.key_name(None))
+            token = _token_flight.do(flight_key, self._refresh_token, cache_item, fetch, value_key)
+        return token
+
+    def _refresh_token(self, cache_item, fetch, value_key):
+        """
+        通过存储后端的锁保证共享同一存储的多个进程只有一个调用 fetch，其余进程轮询缓存等待结果，
+        超过 TOKEN_LOCK_TIMEOUT 仍未获取到时自行刷新
+        """
+        lock = cache_item.lock(ttl=self.TOKEN_LOCK_TTL)
+        deadline = time.time() + self.TOKEN_LOCK_TIMEOUT
+        while True:
+            token = cache_item.get()
+            if token is not None:
+                return token
+            if lock.acquire(blocking=False):
+                try:
+                    token = cache_item.get()
+                    if token is not None:
+                        return token
+                    return self._store_token(cache_item, fetch(), value_key)
+                finally:
+                    lock.release()
+            if time.time() >= deadline:
+                logger.warning('wait for token refresh lock timeout: %s', lock.key)
+                return self._store_token(cache_item, fetch(), value_key)
+            time.sleep(self.TOKEN_LOCK_INTERVAL)
+
+    @staticmethod
+    def _store_token(cache_item, ret, value_key):
+        token = ret[value_key]
+        expires_in = ret.get('expires_in', 7200)
+        cache_item.set(value=token, ttl=expires_in)
+        return token
+
+    def _renew_lease_key(self, name):
+        cache_name, fetch_name, value_key = self.TOKENS[name]
+        cache_item = getattr(self.cache, cache_name)
+        return cache_item, getattr(self, fetch_name), value_key, cache_item.key_name(None) + ':renew'
+
+    def renew_token(self, name, fraction=0.8):
+        """
+        主动续期令牌，共享存储的多个进程在同一续期周期内只有一个进程调用令牌接口
+
+        :param name: 令牌名称，参见 TOKENS
+        :param fraction: 在 expires_in 的该比例时再次续期
+        :return: 距下次续期的秒数，其他进程已续期时返回 None
+        """
+        cache_item, fetch, value_key, lease_key = self._renew_lease_key(name)
+        if not self.storage.add(lease_key, 1, self.TOKEN_LOCK_TTL):
+            return None
+        try:
+            ret = fetch()
+        except Exception:
+            self.storage.delete(lease_key)
+            raise
+        self._store_token(cache_item, ret, value_key)
+        interval = max(1, int(ret.get('expires_in', 7200) * fraction))
+        self.storage.set(lease_key, 1, interval)
+        return interval
+
+    def start_token_refresher(self, names=None, fraction=0.8):
+        """
+        启动后台线程，在 expires_in 的 fraction 比例时主动续期令牌
 
-        return result if not result_processor else result_processor(result)
+        :param names: 令牌名称列表，默认为 TOKENS 中全部令牌
+        :param fraction: 续期时间比例
+        :return: TokenRefresher，可调用 stop 停止
+        """
+        refresher = TokenRefresher(fraction)
+        refresher.add(self, names)
+        refresher.start()
+        return refresher
 
     def _handle_pre_request(self, method, uri, kwargs):
         return method, uri, kwargs
 
     def _handle_pre_top_request(self, params, uri):
-        if not uri.startswith(('http://', 'https://')):
-            uri = urljoin('https://eco.taobao.com', uri)
-        return params, uri
+        return params, protocol.join_url(protocol.TOP_API_BASE_URL, uri)
 
     def _handle_request_except(self, e, func, *args, **kwargs):
         raise e
 
-    def request(self, method, uri, **kwargs):
+    def _get_retry_policy(self, retry):
+        if retry is None:
+            return self.retry_policy
+        return retry or None
+
+    def _call_with_retry(self, attempt, retry, method, endpoints):
+        """
+        按重试策略调用 attempt，令牌失效的重试由 _handle_request_except 处理且只重试一次
+        """
+        policy = self._get_retry_policy(retry)
+        if policy is None:
+            return attempt()
+        state = policy.begin()
+        while True:
+            try:
+                return attempt()
+            except Exception as e:
+                delay = state.next_delay(e, method, endpoints, getattr(self.transport, 'network_errors', ()))
+                if delay is None:
+                    raise
+                logger.warning('%s %s failed (attempt %d), retry in %.2fs: %r',
+                               method, ','.join(endpoints), state.attempts - 1, delay, e)
+            time.sleep(delay)
+
+    def _request_attempt(self, method, uri, **kwargs):
         method, uri_with_access_token, kwargs = self._handle_pre_request(method, uri, kwargs)
-        try:
-            return self._request(method, uri_with_access_token, **kwargs)
-        except DingTalkClientException as e:
-            return self._handle_request_except(e, self.request, method, uri, **kwargs)
+        return self._request(method, uri_with_access_token, **kwargs)
+
+    def request(self, method, uri, **kwargs):
+        """
+        :param retry: 本次请求的重试策略（RetryPolicy），为 False 时不重试，默认为客户端的 retry_policy
+        """
+        retry = kwargs.pop('retry', None)
+
+        def attempt():
+            try:
+                return self._request_attempt(method, uri, **kwargs)
+            except DingTalkClientException as e:
+                return self._handle_request_except(e, self._request_attempt, method, uri, **kwargs)
+
+        return self._call_with_retry(attempt, retry, method, [uri])
+
+    def _top_request_attempt(self, method, params=None, format_='json', v='2.0',
+                             simplify=None, partner_id=None, url=None, **kwargs):
+        simplify = protocol.top_simplify(simplify, self.top_simplify)
+        template = protocol.top_template(method, format_, v, simplify, partner_id)
+        reqparams = protocol.top_params(method, params, codec=self.codec, template=template)
+        base_url = url or '/router/rest'
+
+        reqparams, base_url = self._handle_pre_top_request(reqparams, base_url)
+
+        return self._request(
+            'POST', base_url, params=reqparams, top_response_key=template.response_key,
+            top_simplify=format_ == 'json' and simplify == 'true', **kwargs
+        )
 
     def top_request(self, method, params=None, format_='json', v='2.0',
-                    simplify='false', partner_id=None, url=None, **kwargs):
+                    simplify=None, partner_id=None, url=None, **kwargs):
         """
         top 接口请求
 
@@ -188,37 +399,59 @@ class BaseClient(object):
         :param params: 请求参数 （dict 格式）
         :param format_: 响应格式（默认json，如果使用xml，需要自己对返回结果解析）
         :param v: API协议版本，可选值：2.0。
-        :param simplify: 是否采用精简JSON返回格式
+        :param simplify: 是否采用精简JSON返回格式，默认为客户端的 top_simplify
         :param partner_id: 合作伙伴身份标识。
         :param url: 请求url，默认为 https://eco.taobao.com/router/rest
+        :param retry: 本次请求的重试策略（RetryPolicy），为 False 时不重试，默认为客户端的 retry_policy
         """
-        from datetime import datetime
+        retry = kwargs.pop('retry', None)
+        args = (method, params, format_, v, simplify, partner_id, url)
 
-        reqparams = {}
-        if params is not None:
-            for key, value in params.items():
-                reqparams[key] = value if not isinstance(value, (dict, list, tuple)) else json.dumps(value)
-        reqparams['method'] = method
-        reqparams['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        reqparams['format'] = format_
-        reqparams['v'] = v
-
-        if format_ == 'json':
-            reqparams['simplify'] = simplify
-        if partner_id:
-            reqparams['partner_id'] = partner_id
-        base_url = url or '/router/rest'
+        def attempt():
+            try:
+                return self._top_request_attempt(*args, **kwargs)
+            except DingTalkClientException as e:
+                return self._handle_request_except(e, self._top_request_attempt, *args, **kwargs)
 
-        reqparams, base_url = self._handle_pre_top_request(reqparams, base_url)
+        return self._call_with_retry(attempt, retry, 'POST', [method])
+
+    def top_batch(self, format_='json', v='2.0', simplify=None, partner_id=None, url=None, max_size=20):
+        """
+        top 批量请求，参见 TopBatch
 
-        if not base_url.startswith(('http://', 'https://')):
-            base_url = urljoin(self.API_BASE_URL, base_url)
-        response_key = method.replace('.', '_') + "_response"
+        :param max_size: 单次批量请求包含的最多调用数量
+        """
+        return TopBatch(self, format_, v, simplify, partner_id, url, max_size)
+
+    def _top_batch_attempt(self, calls, format_='json', v='2.0', simplify=None, partner_id=None, url=None):
+        simplify = protocol.top_simplify(simplify, self.top_simplify)
+        reqparams = protocol.top_batch_params(format_, v, simplify, partner_id)
+        reqparams, base_url = self._handle_pre_top_request(reqparams, url or '/router/batch')
+        request = self._prepare_top_batch_request(calls, format_, v, simplify, reqparams, base_url)
+        endpoints = [call.method for call in calls]
+        self._enter_circuits(endpoints)
+        started = None
         try:
-            return self._request('POST', base_url, params=reqparams, top_response_key=response_key, **kwargs)
-        except DingTalkClientException as e:
-            return self._handle_request_except(e, self.request,
-                                               method, format_, v, simplify, partner_id, url, params, **kwargs)
+            for endpoint in endpoints:
+                self._wait_rate_limit(endpoint)
+            started = time.time()
+            results = self._handle_top_batch_result(self.transport.send(request), request, calls)
+        except BaseException as e:
+            self._record_result(started, endpoints, e)
+            raise
+        self._record_result(started, endpoints, results=results)
+        return results
+
+    def _top_batch_request(self, calls, format_='json', v='2.0', simplify=None, partner_id=None, url=None):
+        args = (calls, format_, v, simplify, partner_id, url)
+
+        def attempt():
+            try:
+                return self._top_batch_attempt(*args)
+            except DingTalkClientException as e:
+                return self._handle_request_except(e, self._top_batch_attempt, *args)
+
+        return self._call_with_retry(attempt, None, 'POST', [call.method for call in calls])
 
     def get(self, uri, params=None, **kwargs):
         """
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+from dingtalk.core import protocol
+
+
+class TopBatch(object):
+    """
+    top 批量请求，多个 top 接口调用合并为一次 http 请求（/router/batch）::
+
+        batch = client.top_batch()
+        for process_instance_id in process_instance_ids:
+            batch.top_request('dingtalk.oapi.processinstance.get', {'process_instance_id': process_instance_id})
+        results = batch.execute()
+
+    结果与调用顺序一致，调用失败时对应位置为 DingTalkClientException；
+    调用数量超过 max_size 时拆分为多次批量请求
+    """
+
+    def __init__(self, client, format_='json', v='2.0', simplify=None, partner_id=None, url=None, max_size=20):
+        """
+        :param client: 客户端
+        :param format_: 响应格式
+        :param v: API协议版本
+        :param simplify: 是否采用精简JSON返回格式，默认为客户端的 top_simplify
+        :param partner_id: 合作伙伴身份标识
+        :param url: 请求url，默认为 https://eco.taobao.com/router/batch
+        :param max_size: 单次批量请求包含的最多调用数量
+        """
+        self.client = client
+        self.format_ = format_
+        self.v = v
+        self.simplify = simplify
+        self.partner_id = partner_id
+        self.url = url
+        self.max_size = max_size
+        self.calls = []
+
+    def top_request(self, method, params=None, result_processor=None, response_mode=None):
+        """
+        添加 top 接口调用，参数与 client.top_request 相同
+
+        :param method: API接口名称
+        :param params: 请求参数（dict 格式）
+        :param result_processor: 结果处理函数
+        :param response_mode: 结果格式，默认为客户端的 response_mode
+        :return: 调用在结果中的位置
+        """
+        self.calls.append(protocol.TopBatchCall(
+            method, params, result_processor, response_mode or self.client.response_mode
+        ))
+        return len(self.calls) - 1
+
+    def _pop_chunks(self):
+        calls, self.calls = self.calls, []
+        return [calls[i:i + self.max_size] for i in range(0, len(calls), self.max_size)]
+
+    def _send(self, calls):
+        return self.client._top_batch_request(calls, self.format_, self.v, self.simplify, self.partner_id, self.url)
+
+    def execute(self):
+        """
+        发送已添加的调用并清空
+
+        :return: 结果列表，调用失败时对应位置为 DingTalkClientException
+        """
+        results = []
+        for calls in self._pop_chunks():
+            results.extend(self._send(calls))
+        return results
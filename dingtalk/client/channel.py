@@ -6,6 +6,7 @@ import logging
 import time
 
 from dingtalk.client.base import BaseClient
+from dingtalk.core.constants import ResponseMode
 from dingtalk.core.utils import random_string, DingTalkSigner
 from dingtalk.storage.cache import ChannelCache
 
@@ -14,15 +15,20 @@ logger = logging.getLogger(__name__)
 
 class ChannelClient(BaseClient):
 
-    def __init__(self, corp_id, prefix='channel', storage=None, timeout=None, auto_retry=True):
-        super(ChannelClient, self).__init__(storage, timeout, auto_retry)
+    TOKENS = {
+        'channel_token': ('channel_token', 'get_channel_token', 'access_token'),
+        'channel_jsapi_ticket': ('jsapi_ticket', 'get_channel_jsapi_ticket', 'ticket'),
+    }
+
+    def __init__(self, corp_id, prefix='channel', storage=None, timeout=None, auto_retry=True, transport=None):
+        super(ChannelClient, self).__init__(storage, timeout, auto_retry, transport)
         self.corp_id = corp_id
         self.cache = ChannelCache(self.storage, prefix)
 
     def _handle_pre_request(self, method, uri, kwargs):
         if 'access_token=' in uri or 'access_token' in kwargs.get('params', {}):
             raise ValueError("access_token: " + uri)
-        uri = '%s%access_token=%s' % (uri, '&' if '?' in uri else '?', self.channel_token)
+        uri = '%s%saccess_token=%s' % (uri, '&' if '?' in uri else '?', self.channel_token)
         return method, uri, kwargs
 
     def _handle_request_except(self, e, func, *args, **kwargs):
@@ -34,24 +40,11 @@ class ChannelClient(BaseClient):
 
     @property
     def channel_token(self):
-        self.cache.channel_token.get()
-        token = self.cache.channel_token.get()
-        if token is None:
-            ret = self.get_channel_token()
-            token = ret['access_token']
-            expires_in = ret.get('expires_in', 7200)
-            self.cache.channel_token.set(value=token, ttl=expires_in)
-        return token
+        return self._fetch_token(self.cache.channel_token, self.get_channel_token, 'access_token')
 
     @property
     def channel_jsapi_ticket(self):
-        ticket = self.cache.jsapi_ticket.get()
-        if ticket is None:
-            ret = self.get_channel_jsapi_ticket()
-            ticket = ret['ticket']
-            expires_in = ret.get('expires_in', 7200)
-            self.cache.jsapi_ticket.set(value=ticket, ttl=expires_in)
-        return ticket
+        return self._fetch_token(self.cache.jsapi_ticket, self.get_channel_jsapi_ticket, 'ticket')
 
     def get_jsapi_params(self, url, noncestr=None, timestamp=None):
         if not noncestr:
@@ -84,7 +77,7 @@ class ChannelClient(BaseClient):
 
         :return:
         """
-        return self.get('/channel/get_channel_jsapi_ticket')
+        return self.get('/channel/get_channel_jsapi_ticket', response_mode=ResponseMode.OBJECT)
 
     def get_user_list(self, offset=0, size=100):
         """
@@ -125,10 +118,10 @@ class ChannelClient(BaseClient):
 
 
 class SecretChannelClient(ChannelClient):
-    def __init__(self, corp_id, channel_secret, storage=None, timeout=None, auto_retry=True):
-        super(SecretChannelClient, self).__init__(corp_id, storage, timeout, auto_retry)
+    def __init__(self, corp_id, channel_secret, storage=None, timeout=None, auto_retry=True, transport=None):
+        super(SecretChannelClient, self).__init__(corp_id, 'channelsecret:' + corp_id, storage, timeout, auto_retry,
+                                                  transport)
         self.channel_secret = channel_secret
-        self.cache = ChannelCache(self.storage, 'channelsecret:' + self.corp_id)
 
     def get_channel_token(self):
         """
@@ -138,5 +131,6 @@ class SecretChannelClient(ChannelClient):
         """
         return self.get(
             '/channel/get_channel_token',
-            {"corpid": self.corp_id, "channel_secret": self.channel_secret}
+            {"corpid": self.corp_id, "channel_secret": self.channel_secret},
+            response_mode=ResponseMode.OBJECT
         )
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import time
+from collections import OrderedDict
+
+from dingtalk.client.retry import response_status
+from dingtalk.core.exceptions import CircuitOpenException, DingTalkClientException
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class Circuit(object):
+    """
+    单个接口的熔断状态，按时间分桶统计最近 window 秒内的请求数及失败数
+    """
+
+    BUCKETS = 10
+
+    def __init__(self, breaker):
+        self.breaker = breaker
+        self.state = CLOSED
+        self.opened_at = None
+        self.probes = 0
+        self._buckets = OrderedDict()
+
+    def _bucket_size(self):
+        return float(self.breaker.window) / self.BUCKETS
+
+    def _prune(self, now):
+        oldest = int(now // self._bucket_size()) - self.BUCKETS + 1
+        while self._buckets and next(iter(self._buckets)) < oldest:
+            self._buckets.popitem(last=False)
+
+    def counts(self, now=None):
+        """
+        最近 window 秒内的 (请求数, 失败数)
+        """
+        self._prune(time.time() if now is None else now)
+        total = sum(bucket[0] for bucket in self._buckets.values())
+        failures = sum(bucket[1] for bucket in self._buckets.values())
+        return total, failures
+
+    def _reset(self):
+        self.state = CLOSED
+        self.opened_at = None
+        self.probes = 0
+        self._buckets.clear()
+
+    def _open(self, now):
+        self.state = OPEN
+        self.opened_at = now
+        self.probes = 0
+
+    def allow(self, now):
+        """
+        是否允许请求，熔断时返回剩余的熔断时间（秒）
+        """
+        breaker = self.breaker
+        if self.state == OPEN:
+            remaining = self.opened_at + breaker.open_timeout - now
+            if remaining > 0:
+                return remaining
+            self.state = HALF_OPEN
+            self.probes = 0
+        if self.state == HALF_OPEN:
+            if self.probes >= breaker.half_open_calls:
+                return breaker.open_timeout
+            self.probes += 1
+        return 0
+
+    def release(self):
+        if self.state == HALF_OPEN and self.probes > 0:
+            self.probes -= 1
+
+    def record(self, failed, now):
+        breaker = self.breaker
+        if self.state == HALF_OPEN:
+            if failed:
+                self._open(now)
+            else:
+                self.probes -= 1
+                if self.probes <= 0:
+                    self._reset()
+            return
+        if self.state == OPEN:
+            return
+        key = int(now // self._bucket_size())
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [0, 0]
+        bucket[0] += 1
+        if failed:
+            bucket[1] += 1
+            total, failures = self.counts(now)
+            if total >= breaker.min_calls and failures >= total * breaker.failure_rate:
+                self._open(now)
+
+
+class CircuitBreaker(object):
+    """
+    按接口（url 路径或 top 接口名称）熔断，某个接口持续失败时快速失败，避免占满线程等待超时::
+
+        client.circuit_breaker = CircuitBreaker(failure_rate=0.5, min_calls=20, window=60, open_timeout=30)
+
+    最近 window 秒内请求数不少于 min_calls 且失败比例达到 failure_rate 时熔断，
+    熔断期间请求直接抛出 CircuitOpenException；open_timeout 秒后放行 half_open_calls 个试探请求，
+    试探成功则恢复，失败则继续熔断。网络错误、http 5xx 及 FAILURE_ERRCODES 视为失败，其他业务错误不计入
+    """
+
+    # 系统繁忙
+    FAILURE_ERRCODES = frozenset([-1])
+
+    def __init__(self, failure_rate=0.5, min_calls=20, window=60, open_timeout=30, half_open_calls=1,
+                 failure_errcodes=None):
+        """
+        :param failure_rate: 触发熔断的失败比例
+        :param min_calls: 统计窗口内触发熔断的最少请求数
+        :param window: 统计窗口（秒）
+        :param open_timeout: 熔断持续时间（秒）
+        :param half_open_calls: 熔断结束后允许同时进行的试探请求数
+        :param failure_errcodes: 视为失败的错误码，默认为 FAILURE_ERRCODES
+        """
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.open_timeout = open_timeout
+        self.half_open_calls = half_open_calls
+        self.failure_errcodes = frozenset(failure_errcodes) if failure_errcodes is not None \
+            else self.FAILURE_ERRCODES
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def _circuit(self, endpoint):
+        circuit = self._circuits.get(endpoint)
+        if circuit is None:
+            circuit = self._circuits.setdefault(endpoint, Circuit(self))
+        return circuit
+
+    def state(self, endpoint, now=None):
+        """
+        接口当前的熔断状态：closed、open 或 half_open
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            if circuit is None:
+                return CLOSED
+            if circuit.state == OPEN and now >= circuit.opened_at + self.open_timeout:
+                return HALF_OPEN
+            return circuit.state
+
+    def before_call(self, endpoint, now=None):
+        """
+        请求前调用，接口已熔断时抛出 CircuitOpenException
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            retry_after = self._circuit(endpoint).allow(now)
+        if retry_after:
+            raise CircuitOpenException(endpoint, retry_after)
+
+    def release(self, endpoint):
+        """
+        before_call 通过后未发送请求时调用，归还试探请求名额
+        """
+        with self._lock:
+            self._circuit(endpoint).release()
+
+    def is_failure(self, error, network_errors=()):
+        if error is None or isinstance(error, CircuitOpenException):
+            return False
+        if isinstance(error, DingTalkClientException):
+            if error.errcode in self.failure_errcodes:
+                return True
+            status = response_status(error.response) if error.errcode is None else None
+            return status is not None and status >= 500
+        return bool(network_errors) and isinstance(error, network_errors)
+
+    def record(self, endpoint, error=None, network_errors=(), now=None):
+        """
+        请求后调用，反馈请求结果
+
+        :param endpoint: 接口路径或 top 接口名称
+        :param error: 请求失败时的异常
+        :param network_errors: transport 的网络错误类型
+        """
+        if now is None:
+            now = time.time()
+        failed = self.is_failure(error, network_errors)
+        with self._lock:
+            self._circuit(endpoint).record(failed, now)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import time
+
+from six.moves import queue
+
+
+class AIMDController(object):
+    """
+    根据限流错误码及响应耗时自适应调整并发数：请求成功时加性增加，被限流或响应过慢时乘性减少::
+
+        controller = AIMDController(max_limit=32)
+        client.concurrency_controller = controller
+        users = controller.map(client.user.get, userids)
+
+    客户端在每次请求后调用 record 反馈结果，map 等并发执行函数按当前 limit 控制同时执行的任务数
+    """
+
+    # 系统繁忙、top 调用超频、企业每分钟调用超限、企业每秒调用超限
+    THROTTLE_ERRCODES = frozenset([-1, 7, 90002, 90018])
+
+    def __init__(self, initial=4, min_limit=1, max_limit=64, increase=1.0, decrease=0.5,
+                 latency_threshold=None, cooldown=1.0, throttle_errcodes=None):
+        """
+        :param initial: 初始并发数
+        :param min_limit: 最小并发数
+        :param max_limit: 最大并发数
+        :param increase: 每完成约 limit 个成功请求后增加的并发数
+        :param decrease: 被限流时并发数乘以该系数
+        :param latency_threshold: 响应耗时超过该秒数时视为过载，默认不根据耗时调整
+        :param cooldown: 两次减少并发数的最小间隔（秒），避免同一批被限流的请求连续减少
+        :param throttle_errcodes: 视为限流的错误码，默认为 THROTTLE_ERRCODES
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_threshold = latency_threshold
+        self.cooldown = cooldown
+        self.throttle_errcodes = frozenset(throttle_errcodes) if throttle_errcodes is not None \
+            else self.THROTTLE_ERRCODES
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._last_decrease = 0
+        self._inflight = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self):
+        """
+        当前允许的并发数
+        """
+        return int(self._limit)
+
+    @property
+    def inflight(self):
+        return self._inflight
+
+    def on_success(self, latency=None):
+        if self.latency_threshold is not None and latency is not None and latency > self.latency_threshold:
+            self.on_throttle()
+            return
+        with self._cond:
+            self._limit = min(self.max_limit, self._limit + self.increase / self._limit)
+            self._cond.notify_all()
+
+    def on_throttle(self, now=None):
+        if now is None:
+            now = time.time()
+        with self._cond:
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self._limit = max(self.min_limit, self._limit * self.decrease)
+
+    def is_throttled(self, error):
+        return getattr(error, 'errcode', None) in self.throttle_errcodes
+
+    def record(self, latency=None, error=None):
+        """
+        反馈一次请求的结果
+
+        :param latency: 请求耗时（秒）
+        :param error: 请求失败时的异常，限流以外的错误不影响并发数
+        """
+        if error is None:
+            self.on_success(latency)
+        elif self.is_throttled(error):
+            self.on_throttle()
+
+    def acquire(self):
+        """
+        阻塞直到正在执行的任务数小于 limit
+        """
+        with self._cond:
+            while self._inflight >= self.limit:
+                self._cond.wait()
+            self._inflight += 1
+
+    def release(self):
+        with self._cond:
+            self._inflight -= 1
+            self._cond.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def map(self, func, iterable, return_exceptions=False):
+        """
+        使用线程并发执行 func，同时执行的任务数不超过当前 limit
+
+        :param func: 接收单个参数的函数
+        :param iterable: 参数列表
+        :param return_exceptions: 为 True 时失败的任务在结果中返回异常，否则抛出第一个异常
+        :return: 与参数顺序一致的结果列表
+        """
+        items = list(iterable)
+        results = [None] * len(items)
+        failed = []
+        tasks = queue.Queue()
+        for index, item in enumerate(items):
+            tasks.put((index, item))
+
+        def worker():
+            while True:
+                try:
+                    index, item = tasks.get_nowait()
+                except queue.Empty:
+                    return
+                with self:
+                    try:
+                        results[index] = func(item)
+                    except Exception as e:
+                        results[index] = e
+                        failed.append(index)
+
+        threads = [threading.Thread(target=worker) for _ in range(min(self.max_limit, len(items)))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if failed and not return_exceptions:
+            raise results[min(failed)]
+        return results
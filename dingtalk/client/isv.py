@@ -7,27 +7,75 @@ from dingtalk.core.utils import to_text, json_loads
 from dingtalk.client import DingTalkClient
 from dingtalk.client.base import BaseClient
 from dingtalk.client.channel import ChannelClient
-from dingtalk.core.constants import SuitePushType
+from dingtalk.client.pool import ClientPool
+from dingtalk.core.constants import ResponseMode, SuitePushType
 from dingtalk.crypto import DingTalkCrypto
 from dingtalk.storage.cache import ISVCache
 
 logger = logging.getLogger(__name__)
 
 
-class ISVDingTalkClient(DingTalkClient):
+def _isv_setting(name):
+    attr = '_' + name
+
+    def getter(self):
+        if attr in self.__dict__:
+            return self.__dict__[attr]
+        return getattr(self.isv_client, name)
+
+    def setter(self, value):
+        self.__dict__[attr] = value
+
+    def deleter(self):
+        self.__dict__.pop(attr, None)
+
+    return property(getter, setter, deleter, doc='未单独设置时与 ISVClient 的 %s 相同' % name)
+
+
+class ISVCorpClientMixin(object):
+    """
+    ISV 企业客户端的 codec、结果格式、限流、重试等设置未单独设置时实时读取所属的 ISVClient，
+    修改 ISVClient 的设置对已创建（包括连接池中缓存）的企业客户端同样生效；
+    在企业客户端上设置时仅对该客户端生效，``del client.response_mode`` 恢复使用 ISVClient 的设置
+    """
+
+    @property
+    def codec(self):
+        if self._codec is None:
+            return self.isv_client.codec
+        return self._codec
+
+    @codec.setter
+    def codec(self, codec):
+        self._codec = codec
+
+    response_mode = _isv_setting('response_mode')
+    top_simplify = _isv_setting('top_simplify')
+    rate_limiter = _isv_setting('rate_limiter')
+    concurrency_controller = _isv_setting('concurrency_controller')
+    retry_policy = _isv_setting('retry_policy')
+    circuit_breaker = _isv_setting('circuit_breaker')
+
+    def _rate_limit_scope(self):
+        return self.isv_client.suite_key, self.corp_id
+
+
+class ISVDingTalkClient(ISVCorpClientMixin, DingTalkClient):
     def __init__(self, corp_id, isv_client):
         super(ISVDingTalkClient, self).__init__(corp_id, 'isv_auth:' + isv_client.suite_key,
-                                                isv_client.storage, isv_client.timeout, isv_client.auto_retry)
+                                                isv_client.storage, isv_client.timeout, isv_client.auto_retry,
+                                                isv_client.transport)
         self.isv_client = isv_client
 
     def get_access_token(self):
         return self.isv_client.get_access_token_by_corpid(self.corp_id)
 
 
-class ISVChannelClient(ChannelClient):
+class ISVChannelClient(ISVCorpClientMixin, ChannelClient):
     def __init__(self, corp_id, isv_client):
         super(ISVChannelClient, self).__init__(corp_id, 'isv_channel:' + isv_client.suite_key,
-                                               isv_client.storage, isv_client.timeout, isv_client.auto_retry)
+                                               isv_client.storage, isv_client.timeout, isv_client.auto_retry,
+                                               isv_client.transport)
         self.isv_client = isv_client
 
     def get_channel_token(self):
@@ -36,12 +84,23 @@ class ISVChannelClient(ChannelClient):
 
 class ISVClient(BaseClient):
 
-    def __init__(self, suite_key, suite_secret, token=None, aes_key=None, storage=None, timeout=None, auto_retry=True):
-        super(ISVClient, self).__init__(storage, timeout, auto_retry)
+    TOKENS = {
+        'suite_access_token': ('suite_access_token', 'get_suite_access_token', 'suite_access_token'),
+    }
+
+    def __init__(self, suite_key, suite_secret, token=None, aes_key=None, storage=None, timeout=None, auto_retry=True,
+                 transport=None, client_pool_size=1000, client_idle_timeout=None):
+        """
+        :param client_pool_size: 复用的企业客户端最大数量，超出时淘汰最久未使用的，为 0 时每次创建新客户端
+        :param client_idle_timeout: 企业客户端空闲超过该秒数后淘汰
+        """
+        super(ISVClient, self).__init__(storage, timeout, auto_retry, transport)
         self.suite_key = suite_key
         self.suite_secret = suite_secret
         self.cache = ISVCache(self.storage, 'isv:' + self.suite_key)
         self.crypto = DingTalkCrypto(token, aes_key, suite_key)
+        self.dingtalk_clients = ClientPool(self._create_dingtalk_client, client_pool_size, client_idle_timeout)
+        self.channel_clients = ClientPool(self._create_channel_client, client_pool_size, client_idle_timeout)
 
     def _handle_pre_request(self, method, uri, kwargs):
         if 'suite_access_token=' in uri or 'suite_access_token' in kwargs.get('params', {}):
@@ -61,14 +120,7 @@ class ISVClient(BaseClient):
 
     @property
     def suite_access_token(self):
-        self.cache.suite_access_token.get()
-        token = self.cache.suite_access_token.get()
-        if token is None:
-            ret = self.get_suite_access_token()
-            token = ret['suite_access_token']
-            expires_in = ret.get('expires_in', 7200)
-            self.cache.suite_access_token.set(value=token, ttl=expires_in)
-        return token
+        return self._fetch_token(self.cache.suite_access_token, self.get_suite_access_token, 'suite_access_token')
 
     def _handle_permanent_code(self, permanent_code_data):
         permanent_code = permanent_code_data.get('permanent_code', None)
@@ -76,16 +128,28 @@ class ISVClient(BaseClient):
         corp_id = permanent_code_data.get('auth_corp_info', {}).get('corpid', None)
         if corp_id is None:
             return
-        if permanent_code is not None:
-            self.cache.permanent_code.set(corp_id, permanent_code)
-        if ch_permanent_code is not None:
-            self.cache.ch_permanent_code.set(corp_id, ch_permanent_code)
+        codes = {
+            self.cache.permanent_code.key_name(corp_id): permanent_code,
+            self.cache.ch_permanent_code.key_name(corp_id): ch_permanent_code
+        }
+        codes = {key: value for key, value in codes.items() if value is not None}
+        if codes:
+            self.cache.storage.set_many(codes)
+
+    def _rate_limit_scope(self):
+        return self.suite_key, None
+
+    def _create_dingtalk_client(self, corp_id):
+        return ISVDingTalkClient(corp_id, self)
+
+    def _create_channel_client(self, corp_id):
+        return ISVChannelClient(corp_id, self)
 
     def get_dingtalk_client(self, corp_id):
-        return ISVDingTalkClient(corp_id, self)
+        return self.dingtalk_clients.get(corp_id)
 
     def get_channel_client(self, corp_id):
-        return ISVChannelClient(corp_id, self)
+        return self.channel_clients.get(corp_id)
 
     def proc_message(self, message):
         if not isinstance(message, dict):
@@ -104,8 +168,11 @@ class ISVClient(BaseClient):
             return
         elif event_type == SuitePushType.SUITE_RELIEVE.value:
             corp_id = message.get('AuthCorpId')
-            self.cache.permanent_code.delete(corp_id)
-            self.cache.ch_permanent_code.delete(corp_id)
+            self.cache.storage.delete_many([
+                self.cache.permanent_code.key_name(corp_id), self.cache.ch_permanent_code.key_name(corp_id)
+            ])
+            self.dingtalk_clients.discard(corp_id)
+            self.channel_clients.discard(corp_id)
             return
         else:
             return
@@ -125,6 +192,24 @@ class ISVClient(BaseClient):
     def get_permanent_code_from_cache(self, corp_id):
         return self.cache.permanent_code.get(corp_id)
 
+    def get_permanent_codes_from_cache(self, corp_ids):
+        """
+        批量获取缓存的永久授权码
+
+        :param corp_ids: 企业corp_id列表
+        :return: corp_id 到永久授权码的字典
+        """
+        return self.cache.permanent_code.get_many(corp_ids)
+
+    def get_ch_permanent_codes_from_cache(self, corp_ids):
+        """
+        批量获取缓存的服务窗永久授权码
+
+        :param corp_ids: 企业corp_id列表
+        :return: corp_id 到服务窗永久授权码的字典
+        """
+        return self.cache.ch_permanent_code.get_many(corp_ids)
+
     def get_suite_access_token(self):
         """
         获取应用套件令牌Token
@@ -138,7 +223,8 @@ class ISVClient(BaseClient):
                 "suite_key": self.suite_key,
                 "suite_secret": self.suite_secret,
                 "suite_ticket": self.cache.suite_ticket.get()
-            }
+            },
+            response_mode=ResponseMode.OBJECT
         )
 
     def get_permanent_code(self, tmp_auth_code):
@@ -150,7 +236,8 @@ class ISVClient(BaseClient):
         """
         permanent_code_data = self.post(
             '/service/get_permanent_code',
-            {'tmp_auth_code': tmp_auth_code}
+            {'tmp_auth_code': tmp_auth_code},
+            response_mode=ResponseMode.OBJECT
         )
         self._handle_permanent_code(permanent_code_data)
         return permanent_code_data
@@ -179,7 +266,8 @@ class ISVClient(BaseClient):
         """
         return self.post(
             '/service/get_corp_token',
-            {'auth_corpid': corp_id, 'permanent_code': self.cache.permanent_code.get(corp_id)}
+            {'auth_corpid': corp_id, 'permanent_code': self.cache.permanent_code.get(corp_id)},
+            response_mode=ResponseMode.OBJECT
         )
 
     def get_auth_info(self, corp_id):
@@ -259,5 +347,6 @@ class ISVClient(BaseClient):
         """
         return self.post(
             '/service/get_channel_corp_token',
-            {'auth_corpid': corp_id, 'ch_permanent_code': self.get_ch_permanent_code_from_cache(corp_id)}
+            {'auth_corpid': corp_id, 'ch_permanent_code': self.get_ch_permanent_code_from_cache(corp_id)},
+            response_mode=ResponseMode.OBJECT
         )
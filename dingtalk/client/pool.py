@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ClientPool(object):
+    """
+    按 key 复用客户端的 LRU 池
+
+    超过 max_size 时淘汰最久未使用的客户端，设置 idle_timeout 时淘汰空闲超时的客户端
+    """
+
+    def __init__(self, factory, max_size=1000, idle_timeout=None):
+        """
+        :param factory: 根据 key 创建客户端的函数
+        :param max_size: 最多保留的客户端数量，为 0 时不复用
+        :param idle_timeout: 客户端空闲超过该秒数后淘汰
+        """
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        if not self.max_size:
+            return self.factory(key)
+        now = time.time()
+        with self._lock:
+            item = self._clients.pop(key, None)
+            if item is not None and not self._is_idle(item, now):
+                self._clients[key] = (item[0], now)
+                return item[0]
+        client = self.factory(key)
+        with self._lock:
+            item = self._clients.pop(key, None)
+            if item is not None and not self._is_idle(item, now):
+                client = item[0]
+            self._clients[key] = (client, now)
+            self._evict(now)
+        return client
+
+    def _is_idle(self, item, now):
+        return self.idle_timeout is not None and now - item[1] > self.idle_timeout
+
+    def _evict(self, now):
+        while len(self._clients) > self.max_size:
+            self._clients.popitem(last=False)
+        while self._clients and self._is_idle(next(iter(self._clients.values())), now):
+            self._clients.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._clients.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+    def __contains__(self, key):
+        return key in self._clients
+
+    def __len__(self):
+        return len(self._clients)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class Limit(object):
+    """
+    限流规则：每 per 秒最多 rate 次请求
+    """
+
+    SCOPES = ('app', 'corp', 'endpoint')
+
+    def __init__(self, rate, per=1, burst=None, scope=('app', 'corp', 'endpoint'), endpoints=None):
+        """
+        :param rate: 每 per 秒允许的请求数
+        :param per: 时间窗口（秒）
+        :param burst: 允许的突发请求数（令牌桶容量），默认为 rate
+        :param scope: 限流维度，app（应用）、corp（企业）、endpoint（接口路径或 top 接口名称）的组合
+        :param endpoints: 仅对这些接口路径或 top 接口名称生效，默认对所有接口生效
+        """
+        for name in scope:
+            if name not in self.SCOPES:
+                raise ValueError('unknown rate limit scope: %s' % name)
+        self.rate = rate
+        self.per = per
+        self.burst = burst if burst is not None else rate
+        self.scope = tuple(scope)
+        self.endpoints = frozenset(endpoints) if endpoints is not None else None
+
+    def key(self, app, corp, endpoint):
+        """
+        规则对应的令牌桶名称，规则不适用于该接口时返回 None
+        """
+        if self.endpoints is not None and endpoint not in self.endpoints:
+            return None
+        values = {'app': app, 'corp': corp, 'endpoint': endpoint}
+        return '%s/%s:%s' % (self.rate, self.per, ':'.join('%s' % values[name] for name in self.scope))
+
+    def __repr__(self):
+        return '<Limit %s/%ss %s>' % (self.rate, self.per, ','.join(self.scope))
+
+
+class TokenBucket(object):
+    """
+    令牌桶，以 rate 的速度补充令牌，最多保留 capacity 个
+    """
+
+    def __init__(self, rate, capacity, now=None):
+        self.rate = float(rate)
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.time() if now is None else now
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, now):
+        """
+        获取一个令牌需要等待的秒数
+        """
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now):
+        self._refill(now)
+        self.tokens -= 1
+
+
+class RateLimiter(object):
+    """
+    按应用、企业及接口限流，线程安全，可在多个客户端之间共用::
+
+        limiter = RateLimiter()
+        client1.rate_limiter = limiter
+        client2.rate_limiter = limiter
+
+    默认使用进程内令牌桶；指定 storage（如 RedisStorage）时使用基于 storage.incr 的固定窗口计数，
+    多个进程共享同一限额，此时不支持突发（burst）
+    """
+
+    # 单个企业单个接口每秒 20 次，单个企业所有接口每分钟 1500 次（超出时分别返回 90018 及 90002）
+    DEFAULT_LIMITS = (
+        Limit(20),
+        Limit(1500, per=60, scope=('app', 'corp')),
+    )
+
+    def __init__(self, limits=None, storage=None, prefix='ratelimit', max_buckets=10000):
+        """
+        :param limits: Limit 列表，默认为 DEFAULT_LIMITS
+        :param storage: 用于多进程共享计数的存储，需支持 incr
+        :param prefix: 存储中的 key 前缀
+        :param max_buckets: 进程内最多保留的令牌桶数量，超过时淘汰最久未使用的
+        """
+        self.limits = tuple(limits) if limits is not None else self.DEFAULT_LIMITS
+        self.storage = storage
+        self.prefix = prefix
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, key, limit, now):
+        bucket = self._buckets.pop(key, None)
+        if bucket is None:
+            bucket = TokenBucket(limit.rate / float(limit.per), limit.burst, now)
+        self._buckets[key] = bucket
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return bucket
+
+    def acquire(self, app=None, corp=None, endpoint=None, now=None):
+        """
+        尝试获取一次请求配额
+
+        :param app: 应用标识
+        :param corp: 企业 corp_id
+        :param endpoint: 接口路径或 top 接口名称
+        :return: 0 表示已获取；否则为需要等待的秒数，等待后需重新调用
+        """
+        if now is None:
+            now = time.time()
+        if self.storage is not None:
+            return self._acquire_shared(app, corp, endpoint, now)
+        with self._lock:
+            buckets = [
+                self._bucket(key, limit, now)
+                for key, limit in ((limit.key(app, corp, endpoint), limit) for limit in self.limits)
+                if key is not None
+            ]
+            wait = max([bucket.wait_time(now) for bucket in buckets] or [0])
+            if wait > 0:
+                return wait
+            for bucket in buckets:
+                bucket.consume(now)
+            return 0
+
+    def _acquire_shared(self, app, corp, endpoint, now):
+        wait = 0
+        counters = []
+        for limit in self.limits:
+            key = limit.key(app, corp, endpoint)
+            if key is None:
+                continue
+            window = int(now // limit.per)
+            counter = '%s:%s:%d' % (self.prefix, key, window)
+            count = self.storage.incr(counter, ttl=limit.per + 1)
+            counters.append(counter)
+            if count > limit.rate:
+                wait = max(wait, (window + 1) * limit.per - now)
+        if wait > 0:
+            # 未获取到配额时归还已增加的计数，被拒绝的请求不占用任何窗口的限额
+            for counter in counters:
+                self.storage.incr(counter, -1)
+        return wait
+
+    def wait(self, app=None, corp=None, endpoint=None):
+        """
+        阻塞直到获取请求配额
+        """
+        while True:
+            delay = self.acquire(app, corp, endpoint)
+            if not delay:
+                return
+            time.sleep(delay)
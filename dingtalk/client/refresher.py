@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BaseTokenRefresher(object):
+    """
+    令牌续期调度，按 expires_in 的一定比例提前刷新
+    """
+
+    def __init__(self, fraction=0.8, check_interval=60, retry_interval=30):
+        """
+        :param fraction: 在 expires_in 的该比例时刷新令牌
+        :param check_interval: 其他进程已续期时，再次检查的间隔（秒）
+        :param retry_interval: 刷新失败后重试的间隔（秒）
+        """
+        assert 0 < fraction < 1
+        self.fraction = fraction
+        self.check_interval = check_interval
+        self.retry_interval = retry_interval
+        self._entries = []
+        self._counter = itertools.count()
+
+    def add(self, client, names=None):
+        """
+        添加需要续期的客户端令牌
+
+        :param client: 客户端
+        :param names: 令牌名称列表，默认为 client.TOKENS 中全部令牌
+        """
+        for name in names or sorted(client.TOKENS):
+            if name not in client.TOKENS:
+                raise ValueError('unknown token: %s' % name)
+            self._push(time.time(), client, name)
+
+    def _push(self, run_at, client, name):
+        heapq.heappush(self._entries, (run_at, next(self._counter), client, name))
+
+    def _pop_due(self, now):
+        due = []
+        while self._entries and self._entries[0][0] <= now:
+            _, _, client, name = heapq.heappop(self._entries)
+            due.append((client, name))
+        return due
+
+    def _next_delay(self, interval):
+        if interval is None:
+            return self.check_interval
+        return max(1, interval)
+
+    def _log_error(self, client, name):
+        logger.exception('renew token %s of %r failed', name, client)
+
+    @property
+    def next_run(self):
+        return self._entries[0][0] if self._entries else None
+
+
+class TokenRefresher(BaseTokenRefresher):
+    """
+    后台线程定期续期令牌，请求时无需等待令牌刷新::
+
+        refresher = TokenRefresher(fraction=0.8)
+        refresher.add(client1)
+        refresher.add(client2, ['access_token'])
+        refresher.start()
+
+    共享存储的多个进程同时运行时，每个续期周期只有一个进程调用令牌接口
+    """
+
+    def __init__(self, fraction=0.8, check_interval=60, retry_interval=30):
+        super(TokenRefresher, self).__init__(fraction, check_interval, retry_interval)
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def add(self, client, names=None):
+        with self._cond:
+            super(TokenRefresher, self).add(client, names)
+            self._cond.notify()
+
+    def run_pending(self):
+        """
+        执行到期的续期任务
+        """
+        now = time.time()
+        with self._cond:
+            due = self._pop_due(now)
+        for client, name in due:
+            try:
+                delay = self._next_delay(client.renew_token(name, self.fraction))
+            except Exception:
+                self._log_error(client, name)
+                delay = self.retry_interval
+            with self._cond:
+                self._push(time.time() + delay, client, name)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                next_run = self.next_run
+                timeout = None if next_run is None else max(0, next_run - time.time())
+                if timeout is None or timeout > 0:
+                    self._cond.wait(timeout)
+                if self._stopped:
+                    return
+            self.run_pending()
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name='dingtalk-token-refresher')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import random
+import time
+
+from dingtalk.core.exceptions import DingTalkClientException
+
+
+def response_status(response):
+    """
+    transport 原始响应对象的 http 状态码（requests 为 status_code，aiohttp 为 status）
+    """
+    status = getattr(response, 'status_code', None)
+    if status is None:
+        status = getattr(response, 'status', None)
+    return status
+
+
+class RetryPolicy(object):
+    """
+    请求失败时的重试策略，指数退避并加入随机抖动::
+
+        client.retry_policy = RetryPolicy(max_attempts=3, deadline=10)
+        client.get('/user/get', {'userid': 'userid'}, retry=RetryPolicy(max_attempts=5))  # 单次请求
+
+    接口返回系统繁忙等错误码或 http 429 时服务端未处理请求，总是可以重试；
+    网络错误及 http 5xx 时请求可能已被处理，仅重试 GET 请求及 idempotent_endpoints 中明确指定的接口。
+    POST 接口即使名称看起来是读接口也可能有副作用（如 /service/get_permanent_code 的临时授权码只能使用一次），
+    确认可重复调用后再加入 idempotent_endpoints::
+
+        RetryPolicy(idempotent_endpoints=['/attendance/list', 'dingtalk.oapi.processinstance.get'])
+    """
+
+    # 系统繁忙、企业每秒调用超限
+    RETRY_ERRCODES = frozenset([-1, 90018])
+    RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+    def __init__(self, max_attempts=3, backoff=0.5, multiplier=2, max_backoff=10, jitter=True, deadline=None,
+                 retry_errcodes=None, retry_statuses=None, retry_network_errors=True,
+                 idempotent_methods=('GET',), idempotent_endpoints=()):
+        """
+        :param max_attempts: 最多请求次数（含第一次）
+        :param backoff: 第一次重试前的等待时间（秒）
+        :param multiplier: 每次重试等待时间的倍数
+        :param max_backoff: 最长等待时间（秒）
+        :param jitter: 是否在 0 到等待时间之间随机等待，避免大量请求同时重试
+        :param deadline: 从第一次请求开始的总时长上限（秒），超过后不再重试
+        :param retry_errcodes: 可重试的错误码，默认为 RETRY_ERRCODES
+        :param retry_statuses: 可重试的 http 状态码，默认为 RETRY_STATUSES
+        :param retry_network_errors: 是否重试连接失败、超时等网络错误
+        :param idempotent_methods: 视为幂等的请求方法
+        :param idempotent_endpoints: 其他视为幂等、可在网络错误及 http 5xx 时重试的接口路径或 top 接口名称
+        """
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_errcodes = frozenset(retry_errcodes) if retry_errcodes is not None else self.RETRY_ERRCODES
+        self.retry_statuses = frozenset(retry_statuses) if retry_statuses is not None else self.RETRY_STATUSES
+        self.retry_network_errors = retry_network_errors
+        self.idempotent_methods = frozenset(idempotent_methods)
+        self.idempotent_endpoints = frozenset(idempotent_endpoints)
+
+    def backoff_time(self, attempt):
+        """
+        第 attempt 次请求失败后的等待时间
+        """
+        delay = min(self.max_backoff, self.backoff * self.multiplier ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def is_idempotent(self, method, endpoints):
+        if method in self.idempotent_methods:
+            return True
+        return all(endpoint in self.idempotent_endpoints for endpoint in endpoints)
+
+    def is_retryable(self, error, method, endpoints, network_errors=()):
+        """
+        :param error: 请求抛出的异常
+        :param method: 请求方法
+        :param endpoints: 请求包含的接口路径或 top 接口名称列表
+        :param network_errors: transport 的网络错误类型
+        """
+        if isinstance(error, DingTalkClientException):
+            if error.errcode in self.retry_errcodes:
+                return True
+            status = response_status(error.response) if error.errcode is None else None
+            if status == 429:
+                return True
+            return status in self.retry_statuses and self.is_idempotent(method, endpoints)
+        if self.retry_network_errors and network_errors and isinstance(error, network_errors):
+            return self.is_idempotent(method, endpoints)
+        return False
+
+    def begin(self):
+        """
+        开始一次调用，返回记录重试次数及截止时间的 RetryState
+        """
+        return RetryState(self)
+
+
+class RetryState(object):
+    """
+    单次调用的重试状态
+    """
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.attempts = 1
+        self.deadline = time.time() + policy.deadline if policy.deadline is not None else None
+
+    def next_delay(self, error, method, endpoints, network_errors=()):
+        """
+        返回重试前需要等待的秒数，不再重试时返回 None
+        """
+        policy = self.policy
+        if self.attempts >= policy.max_attempts or not policy.is_retryable(error, method, endpoints, network_errors):
+            return None
+        delay = policy.backoff_time(self.attempts)
+        if self.deadline is not None and time.time() + delay >= self.deadline:
+            return None
+        self.attempts += 1
+        return delay
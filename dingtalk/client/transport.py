@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import json
+import logging
+import threading
+import time
+
+import requests
+import six
+from requests.adapters import HTTPAdapter
+
+from dingtalk.core.protocol import DingTalkResponse
+
+logger = logging.getLogger(__name__)
+
+
+class BaseTransport(object):
+    """
+    transport 基类，负责将 DingTalkRequest 发送出去并返回 DingTalkResponse
+    """
+
+    # 连接失败、超时等可按 RetryPolicy 重试的网络错误
+    network_errors = (IOError,)
+
+    def send(self, request):
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(BaseTransport):
+    """
+    基于 requests.Session 的同步 transport
+
+    多个客户端可共用同一个 transport 以共享连接池::
+
+        transport = RequestsTransport(pool_maxsize=100, prewarm=True)
+        client1 = SecretClient('corp_id1', 'secret1', transport=transport)
+        client2 = SecretClient('corp_id2', 'secret2', transport=transport)
+    """
+
+    DEFAULT_PREWARM_URLS = ('https://oapi.dingtalk.com/', 'https://eco.taobao.com/')
+
+    network_errors = (requests.ConnectionError, requests.Timeout)
+
+    def __init__(self, session=None, pool_connections=10, pool_maxsize=10, pool_block=False, max_retries=0,
+                 keep_alive=True, idle_timeout=None, prewarm=False):
+        """
+        :param session: 自定义 requests.Session，提供时不再挂载连接池配置
+        :param pool_connections: 缓存的连接池（host）数量
+        :param pool_maxsize: 每个 host 保持的最大连接数
+        :param pool_block: 连接数达到 pool_maxsize 时是否阻塞等待空闲连接
+        :param max_retries: 连接失败时 urllib3 重试次数
+        :param keep_alive: 是否复用连接
+        :param idle_timeout: 空闲超过该秒数后关闭池中连接，避免使用已被服务端断开的连接
+        :param prewarm: 是否预先建立到钉钉接口的连接，可传入 url 列表
+        """
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                max_retries=max_retries,
+                pool_block=pool_block
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        if not keep_alive:
+            session.headers['Connection'] = 'close'
+        self.session = session
+        self.pool_maxsize = pool_maxsize
+        self.idle_timeout = idle_timeout
+        self._last_used = time.time()
+        if prewarm:
+            self.prewarm(None if prewarm is True else prewarm)
+
+    def _check_idle(self):
+        now = time.time()
+        if self.idle_timeout is not None and now - self._last_used > self.idle_timeout:
+            for adapter in self.session.adapters.values():
+                adapter.poolmanager.clear()
+        self._last_used = now
+
+    def prewarm(self, urls=None, connections=1, timeout=5):
+        """
+        预先建立连接（TCP 及 TLS 握手），失败时忽略
+
+        :param urls: 需要预热的地址，默认为 oapi.dingtalk.com 及 eco.taobao.com
+        :param connections: 每个地址建立的连接数，不超过 pool_maxsize
+        :param timeout: 超时时间（秒）
+        """
+        urls = urls or self.DEFAULT_PREWARM_URLS
+        connections = max(1, min(connections, self.pool_maxsize))
+
+        def _head(url):
+            try:
+                self.session.head(url, timeout=timeout)
+            except requests.RequestException as e:
+                logger.warning('prewarm %s failed: %s', url, e)
+
+        threads = []
+        for url in urls:
+            for _ in range(connections):
+                thread = threading.Thread(target=_head, args=(url,))
+                thread.daemon = True
+                thread.start()
+                threads.append(thread)
+        for thread in threads:
+            thread.join()
+
+    def send(self, request):
+        self._check_idle()
+        res = self.session.request(
+            method=request.method,
+            url=request.url,
+            params=request.params,
+            data=request.data,
+            headers=request.headers or None,
+            files=request.files,
+            timeout=request.timeout,
+            **request.extra
+        )
+        return DingTalkResponse(res.status_code, res.content, res.headers, request=res.request, raw=res)
+
+    def close(self):
+        self.session.close()
+
+
+def _to_response(request, ret):
+    if isinstance(ret, DingTalkResponse):
+        if ret.request is None:
+            ret.request = request
+        return ret
+    status_code = 200
+    if isinstance(ret, tuple):
+        status_code, ret = ret
+    if isinstance(ret, (dict, list)):
+        ret = json.dumps(ret)
+    if isinstance(ret, six.text_type):
+        ret = ret.encode('utf-8')
+    return DingTalkResponse(status_code, ret, request=request)
+
+
+class MockTransport(BaseTransport):
+    """
+    不发送网络请求的 transport，用于测试及压测解析性能
+
+    handler 接收 DingTalkRequest，可返回 DingTalkResponse、响应体（bytes/str/dict）或 (status_code, 响应体)::
+
+        client.transport = MockTransport(lambda request: {'errcode': 0, 'userid': 'test'})
+    """
+
+    def __init__(self, handler, record=True):
+        self.handler = handler
+        self.record = record
+        self.requests = []
+
+    def send(self, request):
+        if self.record:
+            self.requests.append(request)
+        return _to_response(request, self.handler(request))
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+请求体编码与响应体解析使用的 json 编解码器
+
+客户端通过 ``codec`` 属性或 ``BaseClient.set_default_codec`` 指定，
+安装 orjson 后可使用 :class:`OrjsonCodec` 直接在 bytes 上编解码。
+"""
+from __future__ import absolute_import, unicode_literals
+
+import json
+
+import six
+
+
+class JSONCodec(object):
+    """基于标准库 json 的编解码器"""
+
+    name = 'json'
+
+    def dumps(self, obj):
+        """
+        编码为 utf-8 bytes，非 ascii 字符不转义
+        """
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+    def dumps_text(self, obj):
+        """
+        编码为 str，用于 url 或表单参数
+        """
+        return json.dumps(obj)
+
+    def loads(self, data, object_hook=None):
+        """
+        解析 bytes 或 str，无法解析时抛出 ValueError
+
+        :param data: json 数据
+        :param object_hook: 用于转换每个 json object 的函数，如 ObjectDict
+        """
+        if isinstance(data, six.binary_type):
+            data = data.decode('utf-8', 'ignore')
+        return json.loads(data, object_hook=object_hook, strict=False)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    基于 orjson 的编解码器，orjson 无法解析的数据（如字符串中含控制字符）回退到标准库 json
+
+    指定 object_hook（如默认的 ObjectDict 结果格式）时 orjson 需在解析后再逐个转换 object，
+    比标准库 json 在解析过程中转换更慢，因此同样使用标准库 json 解析
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+        self._dumps_option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj):
+        return self._orjson.dumps(obj, option=self._dumps_option)
+
+    def dumps_text(self, obj):
+        return self.dumps(obj).decode('utf-8')
+
+    def loads(self, data, object_hook=None):
+        if object_hook is not None:
+            return super(OrjsonCodec, self).loads(data, object_hook)
+        try:
+            return self._orjson.loads(data)
+        except ValueError:
+            return super(OrjsonCodec, self).loads(data)
+
+
+default_codec = JSONCodec()
+
+
+def get_codec(name):
+    """
+    按名称获取编解码器
+
+    :param name: json 或 orjson
+    """
+    if name == JSONCodec.name:
+        return default_codec
+    if name == OrjsonCodec.name:
+        return OrjsonCodec()
+    raise ValueError('unknown codec: %s' % name)
@@ -4,6 +4,14 @@ from __future__ import absolute_import, unicode_literals
 from enum import Enum
 
 
+class ResponseMode(Enum):
+    """接口返回结果格式"""
+    OBJECT = "object"  # 每个 json object 解析为 ObjectDict
+    DICT = "dict"  # 普通 dict
+    LAZY = "lazy"  # 普通 dict，访问时才转换为支持属性访问的对象
+    RAW = "raw"  # 检查错误后返回响应体 bytes，检查错误仍需按 DICT 完整解析一次响应
+
+
 class SuitePushType(Enum):
     """套件相关回调枚举"""
     CHECK_URL = "check_url"  # 校验url
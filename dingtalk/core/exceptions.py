@@ -49,6 +49,21 @@ class DingTalkClientException(DingTalkException):
         self.response = response
 
 
+class CircuitOpenException(DingTalkClientException):
+    """Circuit breaker is open for the endpoint, request is not sent"""
+
+    def __init__(self, endpoint, retry_after=None, client=None):
+        """
+        :param endpoint: url path or top method
+        :param retry_after: seconds until the circuit allows a probe request
+        """
+        super(CircuitOpenException, self).__init__(
+            None, 'circuit open: {0}'.format(endpoint), client=client
+        )
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
 class InvalidSignatureException(DingTalkException):
     """Invalid signature exception class"""
 
@@ -0,0 +1,462 @@
+# -*- coding: utf-8 -*-
+"""
+不涉及网络 IO 的请求构造与响应解析
+
+同步客户端、asyncio 客户端以及测试/压测用的 transport 共用本模块，
+transport 只负责把 :class:`DingTalkRequest` 发送出去并返回 :class:`DingTalkResponse` 。
+"""
+from __future__ import absolute_import, unicode_literals
+
+import logging
+import time
+
+import six
+from six.moves.urllib.parse import urlencode, urljoin, urlsplit
+
+from dingtalk.core.codec import default_codec
+from dingtalk.core.constants import ResponseMode
+from dingtalk.core.exceptions import DingTalkClientException
+from dingtalk.core.utils import ObjectDict, lazy_object
+
+logger = logging.getLogger(__name__)
+
+TOP_API_BASE_URL = 'https://eco.taobao.com'
+
+# top 批量接口中各个调用的请求及响应之间的默认分隔符
+TOP_BATCH_SEPARATOR = '\r\n-S-\r\n'
+
+# 缓存数量超过该值时清空，避免 url 中包含变化的参数时无限增长
+_CACHE_SIZE = 1024
+
+_url_cache = {}
+_top_templates = {}
+
+
+class DingTalkRequest(object):
+    """请求描述"""
+
+    def __init__(self, method, url, params=None, data=None, headers=None, files=None, timeout=None,
+                 top_response_key=None, result_processor=None, response_mode=None, top_simplify=False, extra=None):
+        """
+        :param method: 请求方法
+        :param url: 完整请求地址
+        :param params: url问号后参数（dict 格式）
+        :param data: 请求体，dict 格式已编码为 json bytes
+        :param headers: 请求头
+        :param files: 上传文件（dict 格式）
+        :param timeout: 超时时间（秒）
+        :param top_response_key: top 接口响应数据所在 key
+        :param result_processor: 结果处理函数
+        :param response_mode: 结果格式，参见 ResponseMode
+        :param top_simplify: top 接口是否使用精简 json 返回格式
+        :param extra: 其他 transport 相关参数
+        """
+        self.method = method
+        self.url = url
+        self.params = params if params is not None else {}
+        self.data = data
+        self.headers = headers if headers is not None else {}
+        self.files = files
+        self.timeout = timeout
+        self.top_response_key = top_response_key
+        self.result_processor = result_processor
+        self.response_mode = response_mode
+        self.top_simplify = top_simplify
+        self.extra = extra if extra is not None else {}
+
+    def __repr__(self):
+        return '<DingTalkRequest [%s %s]>' % (self.method, self.url)
+
+
+class DingTalkResponse(object):
+    """响应描述"""
+
+    def __init__(self, status_code, content, headers=None, request=None, raw=None):
+        """
+        :param status_code: http 状态码
+        :param content: 响应体 bytes
+        :param headers: 响应头
+        :param request: transport 原始请求对象，用于异常信息
+        :param raw: transport 原始响应对象，无法解析为 json 时作为结果返回
+        """
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers if headers is not None else {}
+        self.request = request
+        self.raw = raw if raw is not None else self
+
+    def __repr__(self):
+        return '<DingTalkResponse [%s]>' % self.status_code
+
+
+def prepare_request(method, url_or_endpoint, api_base_url, params=None, data=None, headers=None,
+                    files=None, timeout=None, top_response_key=None, result_processor=None, codec=None,
+                    response_mode=None, top_simplify=False, **kwargs):
+    """
+    构造请求描述
+
+    :param method: 请求方法
+    :param url_or_endpoint: 完整地址或相对 api_base_url 的路径
+    :param api_base_url: 接口根地址
+    :param data: 请求体，dict 格式会自动转换为 json
+    :param codec: json 编解码器，默认为标准库 json
+    :param response_mode: 结果格式，参见 ResponseMode
+    :param top_simplify: top 接口是否使用精简 json 返回格式
+    :return: DingTalkRequest
+    """
+    url = join_url(api_base_url, url_or_endpoint)
+    if isinstance(data, dict):
+        data = (codec or default_codec).dumps(data)
+        headers = dict(headers or {})
+        headers['Content-Type'] = 'application/json'
+    return DingTalkRequest(
+        method, url, params=params, data=data, headers=headers, files=files, timeout=timeout,
+        top_response_key=top_response_key, result_processor=result_processor, response_mode=response_mode,
+        top_simplify=top_simplify, extra=kwargs
+    )
+
+
+def request_endpoint(request):
+    """
+    请求对应的接口：top 接口为接口名称，其他为 url 路径，用于按接口限流等
+    """
+    if request.top_response_key and 'method' in request.params:
+        return request.params['method']
+    return urlsplit(request.url).path
+
+
+def join_url(api_base_url, url_or_endpoint):
+    """
+    拼接接口地址，url_or_endpoint 为完整地址时直接返回，结果会被缓存
+    """
+    if url_or_endpoint.startswith(('http://', 'https://')):
+        return url_or_endpoint
+    key = (api_base_url, url_or_endpoint)
+    url = _url_cache.get(key)
+    if url is None:
+        url = urljoin(api_base_url, url_or_endpoint)
+        if len(_url_cache) >= _CACHE_SIZE:
+            _url_cache.clear()
+        _url_cache[key] = url
+    return url
+
+
+class TimestampFormatter(object):
+    """
+    按秒缓存的时间格式化，同一秒内的调用返回同一个字符串
+    """
+
+    def __init__(self, fmt='%Y-%m-%d %H:%M:%S'):
+        self.fmt = fmt
+        self._cache = (None, None)
+
+    def __call__(self, now=None):
+        second = int(time.time() if now is None else now)
+        cached_second, value = self._cache
+        if cached_second != second:
+            value = time.strftime(self.fmt, time.localtime(second))
+            self._cache = (second, value)
+        return value
+
+
+top_timestamp = TimestampFormatter()
+
+
+class TopTemplate(object):
+    """
+    同一 top 接口每次请求相同的公共参数及响应数据所在 key
+    """
+
+    def __init__(self, method, format_='json', v='2.0', simplify='false', partner_id=None):
+        params = {'method': method, 'format': format_, 'v': v}
+        if format_ == 'json':
+            params['simplify'] = simplify
+        if partner_id:
+            params['partner_id'] = partner_id
+        self.params = params
+        self.response_key = top_response_key(method)
+
+
+def top_template(method, format_='json', v='2.0', simplify='false', partner_id=None):
+    """
+    获取缓存的 top 接口请求模板
+    """
+    key = (method, format_, v, simplify, partner_id)
+    template = _top_templates.get(key)
+    if template is None:
+        template = TopTemplate(method, format_, v, simplify, partner_id)
+        if len(_top_templates) >= _CACHE_SIZE:
+            _top_templates.clear()
+        _top_templates[key] = template
+    return template
+
+
+def top_params(method, params=None, format_='json', v='2.0', simplify='false', partner_id=None, codec=None,
+               template=None):
+    """
+    构造 top 接口公共参数及业务参数
+
+    :param template: 已获取的 TopTemplate，默认按 method 等参数从缓存获取
+    """
+    if template is None:
+        template = top_template(method, format_, v, simplify, partner_id)
+    reqparams = _top_values(params, codec)
+    reqparams.update(template.params)
+    reqparams['timestamp'] = top_timestamp()
+    return reqparams
+
+
+def _top_values(params, codec=None):
+    # dict、list 等业务参数编码为 json 字符串
+    ret = {}
+    if params is not None:
+        codec = codec or default_codec
+        for key, value in params.items():
+            ret[key] = value if not isinstance(value, (dict, list, tuple)) else codec.dumps_text(value)
+    return ret
+
+
+class TopBatchCall(object):
+    """top 批量请求中的单个调用"""
+
+    def __init__(self, method, params=None, result_processor=None, response_mode=None):
+        """
+        :param method: API接口名称
+        :param params: 请求参数（dict 格式）
+        :param result_processor: 结果处理函数
+        :param response_mode: 结果格式，参见 ResponseMode
+        """
+        self.method = method
+        self.params = params
+        self.result_processor = result_processor
+        self.response_mode = response_mode
+        self.response_key = top_response_key(method)
+
+    def __repr__(self):
+        return '<TopBatchCall [%s]>' % self.method
+
+
+def top_batch_params(format_='json', v='2.0', simplify='false', partner_id=None):
+    """
+    构造 top 批量请求的公共参数，各个调用的接口名称及业务参数位于请求体中
+    """
+    reqparams = dict(top_template('', format_, v, simplify, partner_id).params)
+    reqparams.pop('method')
+    reqparams['timestamp'] = top_timestamp()
+    return reqparams
+
+
+def top_batch_body(calls, codec=None, separator=TOP_BATCH_SEPARATOR):
+    """
+    构造 top 批量请求的请求体：每个调用的接口名称及业务参数编码为查询字符串，以 separator 分隔
+
+    :param calls: TopBatchCall 列表
+    :return: utf-8 bytes
+    """
+    parts = []
+    for call in calls:
+        values = _top_values(call.params, codec)
+        values['method'] = call.method
+        parts.append(urlencode(sorted(
+            (key, value if isinstance(value, six.binary_type) else six.text_type(value).encode('utf-8'))
+            for key, value in values.items()
+        )))
+    return separator.join(parts).encode('utf-8')
+
+
+def handle_top_batch_response(response, calls, codec=None, top_simplify=False, separator=TOP_BATCH_SEPARATOR):
+    """
+    按 separator 拆分 top 批量请求的响应，逐个解析
+
+    公共参数错误（如 session 无效）等导致整个批量请求失败时抛出 DingTalkClientException
+
+    :param response: DingTalkResponse
+    :param calls: TopBatchCall 列表
+    :return: 与 calls 顺序一致的列表，元素为调用结果或 DingTalkClientException
+    """
+    if response.status_code >= 400:
+        raise DingTalkClientException(errcode=None, errmsg=None, request=response.request, response=response.raw)
+    content = response.content
+    if isinstance(content, six.binary_type):
+        content = content.decode('utf-8', 'ignore')
+    parts = content.split(separator)
+    if len(parts) != len(calls):
+        result = decode_content(content, codec)
+        if isinstance(result, dict):
+            error_response = result.get('error_response', result)
+            if 'code' in error_response:
+                raise DingTalkClientException(
+                    error_response['code'],
+                    error_response.get('sub_msg', error_response.get('msg', '')),
+                    request=response.request,
+                    response=response.raw
+                )
+        raise DingTalkClientException(
+            -1, 'top batch response count mismatch: %d != %d' % (len(parts), len(calls)),
+            request=response.request, response=response.raw
+        )
+    results = []
+    for call, part in zip(calls, parts):
+        part_response = DingTalkResponse(
+            response.status_code, part.encode('utf-8'), response.headers, response.request, response.raw
+        )
+        try:
+            results.append(handle_response(
+                part_response, call.response_key, call.result_processor, codec, call.response_mode, top_simplify
+            ))
+        except DingTalkClientException as e:
+            results.append(e)
+    return results
+
+
+def top_simplify(simplify, default=False):
+    """
+    将 simplify 参数转换为 'true' / 'false'，为 None 时使用 default
+    """
+    if simplify is None:
+        simplify = default
+    if isinstance(simplify, six.string_types):
+        return 'true' if simplify.lower() == 'true' else 'false'
+    return 'true' if simplify else 'false'
+
+
+def top_response_key(method):
+    return method.replace('.', '_') + "_response"
+
+
+def _object_hook(response_mode):
+    return ObjectDict if response_mode is ResponseMode.OBJECT else None
+
+
+def decode_content(content, codec=None, object_hook=ObjectDict):
+    """
+    将响应体解析为 json，无法解析时返回 None
+    """
+    try:
+        return (codec or default_codec).loads(content, object_hook=object_hook)
+    except (TypeError, ValueError, AttributeError):
+        logger.debug('Can not decode response as JSON', exc_info=True)
+        return None
+
+
+def handle_response(response, top_response_key=None, result_processor=None, codec=None, response_mode=None,
+                    top_simplify=False):
+    """
+    解析响应，接口返回错误时抛出 DingTalkClientException
+
+    :param response: DingTalkResponse 或已解析的 dict
+    :param top_response_key: top 接口响应数据所在 key
+    :param result_processor: 结果处理函数
+    :param codec: json 编解码器，默认为标准库 json
+    :param response_mode: 结果格式，参见 ResponseMode，默认为 ObjectDict
+    :param top_simplify: top 接口是否使用精简 json 返回格式
+    """
+    if isinstance(response, dict):
+        return handle_result(
+            response, top_response_key, result_processor, codec=codec, response_mode=response_mode,
+            top_simplify=top_simplify
+        )
+    response_mode = ResponseMode(response_mode or ResponseMode.OBJECT)
+    if response.status_code >= 400:
+        raise DingTalkClientException(
+            errcode=None,
+            errmsg=None,
+            request=response.request,
+            response=response.raw
+        )
+    result = decode_content(response.content, codec, _object_hook(response_mode))
+    if result is None:
+        # Return origin response object if we can not decode it as JSON
+        return response.raw
+    return handle_result(
+        result, top_response_key, result_processor, response, codec, response_mode, top_simplify=top_simplify
+    )
+
+
+def handle_result(result, top_response_key=None, result_processor=None, response=None, codec=None,
+                  response_mode=None, top_simplify=False):
+    """
+    处理已解析的 json 结果，检查 errcode、error_response 及 success 标识
+
+    :param result: 已解析的 json 结果
+    :param top_response_key: top 接口响应数据所在 key
+    :param result_processor: 结果处理函数
+    :param response: DingTalkResponse，用于异常信息
+    :param codec: json 编解码器，用于解析 top 接口中字符串格式的 result
+    :param response_mode: 结果格式，参见 ResponseMode，默认为 ObjectDict
+    :param top_simplify: top 接口是否使用精简 json 返回格式，此时响应数据不在 top_response_key 中
+    """
+    response_mode = ResponseMode(response_mode or ResponseMode.OBJECT)
+    content = getattr(response, 'content', None)
+    request = None
+    if response is not None:
+        request = response.request
+        response = response.raw
+    result = _check_result(
+        result, top_response_key, request, response, codec, response_mode, top_simplify
+    )
+    if response_mode is ResponseMode.RAW and content is not None:
+        return content
+    if response_mode is ResponseMode.LAZY:
+        result = lazy_object(result)
+    if not isinstance(result, dict) or not result_processor:
+        return result
+    return result_processor(result)
+
+
+def _check_result(result, top_response_key, request, response, codec, response_mode, top_simplify):
+    if not isinstance(result, dict):
+        return result
+    if top_response_key:
+        if 'error_response' in result:
+            error_response = result['error_response']
+            raise DingTalkClientException(
+                error_response.get('code', -1),
+                error_response.get('sub_msg', error_response.get('msg', '')),
+                request=request,
+                response=response
+            )
+        if top_simplify and 'code' in result and 'msg' in result and 'result' not in result:
+            # 精简格式的错误响应
+            raise DingTalkClientException(
+                result['code'],
+                result.get('sub_msg', result['msg']),
+                request=request,
+                response=response
+            )
+        top_result = result
+        if top_simplify or top_response_key in top_result:
+            if not top_simplify:
+                top_result = result[top_response_key]
+            if 'result' in top_result:
+                top_result = top_result['result']
+                if isinstance(top_result, six.string_types):
+                    try:
+                        top_result = (codec or default_codec).loads(top_result, _object_hook(response_mode))
+                    except Exception:
+                        pass
+        if isinstance(top_result, dict):
+            if ('success' in top_result and not top_result['success']) or (
+                    'is_success' in top_result and not top_result['is_success']):
+                raise DingTalkClientException(
+                    top_result.get('ding_open_errcode', -1),
+                    top_result.get('error_msg', ''),
+                    request=request,
+                    response=response
+                )
+        result = top_result
+    if not isinstance(result, dict):
+        return result
+    if 'errcode' in result:
+        result['errcode'] = int(result['errcode'])
+
+    if 'errcode' in result and result['errcode'] != 0:
+        errcode = result['errcode']
+        errmsg = result.get('errmsg', errcode)
+        raise DingTalkClientException(
+            errcode,
+            errmsg,
+            request=request,
+            response=response
+        )
+    return result
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import threading
+
+
+class _Call(object):
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.done = False
+
+
+class SingleFlight(object):
+    """
+    同一 key 的并发调用只执行一次，其余调用等待并复用其结果（或异常）
+
+    用于 access_token 等令牌过期时避免多个线程同时请求刷新接口
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = _Call()
+                    self._calls[key] = call
+            if leader:
+                break
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            if call.done:
+                return call.result
+            # 执行者被 KeyboardInterrupt、gevent Timeout 等中断，没有结果，重新执行
+        try:
+            call.result = func(*args, **kwargs)
+            call.done = True
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
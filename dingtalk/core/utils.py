@@ -8,6 +8,11 @@ import string
 
 import six
 
+try:
+    from collections.abc import ItemsView, ValuesView
+except ImportError:  # python 2
+    from collections import ItemsView, ValuesView
+
 
 class ObjectDict(dict):
     """Makes a dictionary behave like an object, with attribute-style access.
@@ -22,6 +27,69 @@ class ObjectDict(dict):
         self[key] = value
 
 
+class LazyObjectDict(dict):
+    """与 ObjectDict 相同支持属性访问，嵌套的 dict / list 在访问时才转换
+    """
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        wrapped = lazy_object(value)
+        if wrapped is not value:
+            dict.__setitem__(self, key, wrapped)
+        return wrapped
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def values(self):
+        return ValuesView(self)
+
+    def items(self):
+        return ItemsView(self)
+
+    def copy(self):
+        return LazyObjectDict(dict.copy(self))
+
+    def __getattr__(self, key):
+        if key in self:
+            return self[key]
+        return None
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+
+class LazyObjectList(list):
+    """元素在访问时才转换的 list
+    """
+
+    def __getitem__(self, index):
+        value = list.__getitem__(self, index)
+        if isinstance(index, slice):
+            return LazyObjectList(value)
+        wrapped = lazy_object(value)
+        if wrapped is not value:
+            list.__setitem__(self, index, wrapped)
+        return wrapped
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+def lazy_object(value):
+    """
+    将 json 解析出的普通 dict / list 包装为访问时才转换的对象
+    """
+    if type(value) is dict:
+        return LazyObjectDict(value)
+    if type(value) is list:
+        return LazyObjectList(value)
+    return value
+
+
 class DingTalkSigner(object):
     """DingTalk data signer"""
 
@@ -84,5 +152,16 @@ def byte2int(c):
     return c
 
 
+def descriptor_name(descriptor, owner):
+    """
+    查找描述符在类中的属性名，用于不支持 __set_name__ 的 Python 版本
+    """
+    for klass in owner.__mro__:
+        for name, value in vars(klass).items():
+            if value is descriptor:
+                return name
+    raise AttributeError(descriptor)
+
+
 def json_loads(s, object_hook=ObjectDict, **kwargs):
     return json.loads(s, object_hook=object_hook, **kwargs)
@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 
+import threading
+import time
+
+from dingtalk.core.utils import random_string
+
+_add_lock = threading.Lock()
+
 
 class BaseStorage(object):
 
@@ -13,6 +20,88 @@ class BaseStorage(object):
     def delete(self, key):
         raise NotImplementedError()
 
+    def ttl(self, key):
+        """
+        返回 key 剩余的过期时间（秒），无过期时间或 key 不存在时返回 None
+
+        不支持查询的存储抛出 NotImplementedError
+        """
+        raise NotImplementedError()
+
+    def add(self, key, value, ttl=None):
+        """
+        key 不存在时写入，返回是否写入成功
+
+        默认实现仅在进程内互斥，跨进程共享的存储应使用后端提供的原子操作覆盖
+        """
+        with _add_lock:
+            if self.get(key) is not None:
+                return False
+            self.set(key, value, ttl)
+            return True
+
+    def incr(self, key, delta=1, ttl=None):
+        """
+        将 key 的整数值增加 delta 并返回增加后的值，key 不存在时从 0 开始并设置过期时间 ttl，
+        已存在的 key 不改变过期时间
+
+        默认实现仅在进程内互斥，跨进程共享的存储应使用后端提供的原子操作覆盖
+        """
+        with _add_lock:
+            value = self.get(key)
+            if value is not None:
+                try:
+                    ttl = self.ttl(key)
+                except NotImplementedError:
+                    pass
+            value = (value or 0) + delta
+            self.set(key, value, ttl)
+            return value
+
+    def delete_if_equals(self, key, value):
+        """
+        key 的值等于 value 时删除，返回是否删除，用于只释放自己持有的锁
+
+        默认实现仅在进程内互斥，跨进程共享的存储应使用后端提供的原子操作覆盖
+        """
+        with _add_lock:
+            if self.get(key) != value:
+                return False
+            self.delete(key)
+            return True
+
+    def get_many(self, keys, default=None):
+        """
+        批量读取，返回 key 到值的字典，不存在的 key 值为 default
+
+        默认逐个调用 get，支持批量操作的存储应覆盖为一次往返
+        """
+        return {key: self.get(key, default) for key in keys}
+
+    def set_many(self, mapping, ttl=None):
+        """
+        批量写入，值为 None 的 key 忽略
+        """
+        for key, value in mapping.items():
+            if value is not None:
+                self.set(key, value, ttl)
+
+    def delete_many(self, keys):
+        """
+        批量删除
+        """
+        for key in keys:
+            self.delete(key)
+
+    def lock(self, key, ttl=10):
+        """
+        基于 add 的互斥锁，用于多进程/多机之间只允许一个调用方执行
+
+        :param key: 锁名称
+        :param ttl: 锁自动过期时间（秒），避免持有者异常退出后死锁
+        """
+        return StorageLock(self, key, ttl)
+
     def __getitem__(self, key):
         self.get(key)
 
@@ -21,3 +110,41 @@ class BaseStorage(object):
 
     def __delitem__(self, key):
         self.delete(key)
+
+
+class StorageLock(object):
+
+    def __init__(self, storage, key, ttl=10, interval=0.05):
+        self.storage = storage
+        self.key = key
+        self.ttl = ttl
+        self.interval = interval
+        self._token = None
+
+    def acquire(self, blocking=True, timeout=None):
+        token = random_string()
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            if self.storage.add(self.key, token, self.ttl):
+                self._token = token
+                return True
+            if not blocking or (deadline is not None and time.time() >= deadline):
+                return False
+            time.sleep(self.interval)
+
+    def release(self):
+        if self._token is None:
+            return
+        self.storage.delete_if_equals(self.key, self._token)
+        self._token = None
+
+    @property
+    def locked(self):
+        return self._token is not None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
@@ -1,21 +1,33 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 
-import inspect
-
+from dingtalk.core.utils import descriptor_name
 from dingtalk.storage import BaseStorage
 
 
-def _is_cache_item(obj):
-    return isinstance(obj, DingTalkCacheItem)
-
-
 class DingTalkCacheItem(object):
+    """
+    缓存项
+
+    作为缓存类属性声明时为描述符，缓存实例首次访问时才创建绑定该实例的缓存项
+    """
 
     def __init__(self, cache=None, name=None):
         self.cache = cache
         self.name = name
 
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None or self.cache is not None:
+            return self
+        if self.name is None:
+            self.name = descriptor_name(self, owner)
+        item = type(self)(instance, self.name)
+        instance.__dict__[self.name] = item
+        return item
+
     def key_name(self, key):
         if isinstance(key, (tuple, list)):
             key = ':'.join(key)
@@ -34,17 +46,31 @@ class DingTalkCacheItem(object):
     def delete(self, key=None):
         return self.cache.storage.delete(self.key_name(key))
 
+    def get_many(self, keys, default=None):
+        """
+        批量读取，返回 key 到值的字典
+        """
+        keys = list(keys)
+        values = self.cache.storage.get_many([self.key_name(key) for key in keys], default)
+        return {key: values[self.key_name(key)] for key in keys}
 
-class BaseCache(object):
+    def set_many(self, mapping, ttl=None):
+        """
+        批量写入，mapping 为 key 到值的字典
+        """
+        return self.cache.storage.set_many({self.key_name(key): value for key, value in mapping.items()}, ttl)
+
+    def delete_many(self, keys):
+        """
+        批量删除
+        """
+        return self.cache.storage.delete_many([self.key_name(key) for key in keys])
 
-    def __new__(cls, *args, **kwargs):
-        self = super(BaseCache, cls).__new__(cls)
-        api_endpoints = inspect.getmembers(self, _is_cache_item)
-        for name, api in api_endpoints:
-            api_cls = type(api)
-            api = api_cls(self, name)
-            setattr(self, name, api)
-        return self
+    def lock(self, key=None, ttl=10):
+        return self.cache.storage.lock(self.key_name(key) + ':lock', ttl)
+
+
+class BaseCache(object):
 
     def __init__(self, storage, prefix='client'):
         assert isinstance(storage, BaseStorage)
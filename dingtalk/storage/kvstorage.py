@@ -2,6 +2,7 @@
 from __future__ import absolute_import, unicode_literals
 
 import json
+import math
 
 from dingtalk.core.utils import to_text
 from dingtalk.storage import BaseStorage
@@ -35,3 +36,92 @@ class KvStorage(BaseStorage):
     def delete(self, key):
         key = self.key_name(key)
         self.kvdb.delete(key)
+
+    def ttl(self, key):
+        if not hasattr(self.kvdb, 'pttl'):
+            return super(KvStorage, self).ttl(key)
+        # redis
+        ret = self.kvdb.pttl(self.key_name(key))
+        if ret is None or ret < 0:
+            return None
+        return ret / 1000.0
+
+    def add(self, key, value, ttl=None):
+        if hasattr(self.kvdb, 'setnx'):
+            # redis
+            return bool(self.kvdb.set(self.key_name(key), json.dumps(value), ex=ttl, nx=True))
+        if hasattr(self.kvdb, 'add'):
+            # memcache
+            return bool(self.kvdb.add(self.key_name(key), json.dumps(value), ttl or 0, noreply=False))
+        return super(KvStorage, self).add(key, value, ttl)
+
+    def incr(self, key, delta=1, ttl=None):
+        name = self.key_name(key)
+        if hasattr(self.kvdb, 'pipeline'):
+            # redis
+            pipe = self.kvdb.pipeline()
+            if ttl:
+                pipe.set(name, 0, ex=int(math.ceil(ttl)), nx=True)
+            pipe.incrby(name, delta)
+            return pipe.execute()[-1]
+        if hasattr(self.kvdb, 'incr') and hasattr(self.kvdb, 'add'):
+            # memcache
+            self.kvdb.add(name, '0', int(math.ceil(ttl or 0)), noreply=False)
+            return self.kvdb.incr(name, delta, noreply=False)
+        return super(KvStorage, self).incr(key, delta, ttl)
+
+    def delete_if_equals(self, key, value):
+        if hasattr(self.kvdb, 'eval'):
+            # redis
+            from dingtalk.storage.redisstorage import DELETE_IF_EQUALS_SCRIPT
+
+            return bool(self.kvdb.eval(DELETE_IF_EQUALS_SCRIPT, 1, self.key_name(key), json.dumps(value)))
+        return super(KvStorage, self).delete_if_equals(key, value)
+
+    def get_many(self, keys, default=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        names = [self.key_name(key) for key in keys]
+        if hasattr(self.kvdb, 'mget'):
+            # redis
+            values = self.kvdb.mget(names)
+        elif hasattr(self.kvdb, 'get_many'):
+            # memcache
+            found = self.kvdb.get_many(names)
+            values = [found.get(name) for name in names]
+        else:
+            return super(KvStorage, self).get_many(keys, default)
+        return {
+            key: default if value is None else json.loads(to_text(value))
+            for key, value in zip(keys, values)
+        }
+
+    def set_many(self, mapping, ttl=None):
+        values = {self.key_name(key): json.dumps(value) for key, value in mapping.items() if value is not None}
+        if not values:
+            return
+        if hasattr(self.kvdb, 'pipeline'):
+            # redis
+            pipe = self.kvdb.pipeline(transaction=False)
+            for name, value in values.items():
+                pipe.set(name, value, ttl)
+            pipe.execute()
+        elif hasattr(self.kvdb, 'set_many'):
+            # memcache
+            self.kvdb.set_many(values, ttl or 0)
+        else:
+            super(KvStorage, self).set_many(mapping, ttl)
+
+    def delete_many(self, keys):
+        names = [self.key_name(key) for key in keys]
+        if not names:
+            return
+        if hasattr(self.kvdb, 'pipeline'):
+            # redis
+            self.kvdb.delete(*names)
+        elif hasattr(self.kvdb, 'delete_many'):
+            # memcache
+            self.kvdb.delete_many(names)
+        else:
+            super(KvStorage, self).delete_many(keys)
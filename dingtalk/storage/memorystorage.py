@@ -1,32 +1,117 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 
+import heapq
+import threading
 import time
+from collections import OrderedDict
 
 from dingtalk.storage import BaseStorage
 
 
 class MemoryStorage(BaseStorage):
+    """
+    进程内存储，线程安全
 
-    def __init__(self):
-        self._data = {}
+    过期的 key 通过按过期时间排序的堆在读写时清理，超过 max_entries 时淘汰最久未使用的 key
+    """
+
+    def __init__(self, max_entries=None):
+        """
+        :param max_entries: 最多保存的 key 数量，默认不限制
+        """
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._expiry = []
+        self._lock = threading.RLock()
+
+    def _purge(self, now):
+        expiry = self._expiry
+        while expiry and expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(expiry)
+            item = self._data.get(key)
+            if item is not None and item[1] == expires_at:
+                del self._data[key]
+
+    def _compact(self):
+        # 同一 key 多次设置会在堆中留下失效的记录，数量过多时重建
+        if len(self._expiry) > 2 * len(self._data) + 64:
+            self._expiry = [(item[1], key) for key, item in self._data.items() if item[1] is not None]
+            heapq.heapify(self._expiry)
 
     def get(self, key, default=None):
-        ret = self._data.get(key, None)
-        if ret is None or len(ret) != 2:
-            return default
-        else:
-            value = ret[0]
-            expires_at = ret[1]
-            if expires_at is None or expires_at > time.time():
-                return value
-            else:
+        with self._lock:
+            self._purge(time.time())
+            item = self._data.pop(key, None)
+            if item is None:
                 return default
+            self._data[key] = item
+            return item[0]
 
     def set(self, key, value, ttl=None):
         if value is None:
             return
-        self._data[key] = (value, int(time.time()) + ttl)
+        with self._lock:
+            now = time.time()
+            self._purge(now)
+            expires_at = None if ttl is None else now + ttl
+            self._data.pop(key, None)
+            self._data[key] = (value, expires_at)
+            if expires_at is not None:
+                heapq.heappush(self._expiry, (expires_at, key))
+                self._compact()
+            if self.max_entries is not None:
+                while len(self._data) > self.max_entries:
+                    self._data.popitem(last=False)
 
     def delete(self, key):
-        self._data.pop(key, None)
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_if_equals(self, key, value):
+        with self._lock:
+            if self.get(key) != value:
+                return False
+            self._data.pop(key, None)
+            return True
+
+    def get_many(self, keys, default=None):
+        with self._lock:
+            return {key: self.get(key, default) for key in keys}
+
+    def set_many(self, mapping, ttl=None):
+        with self._lock:
+            for key, value in mapping.items():
+                self.set(key, value, ttl)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def ttl(self, key):
+        with self._lock:
+            now = time.time()
+            self._purge(now)
+            item = self._data.get(key)
+            if item is None or item[1] is None:
+                return None
+            return item[1] - now
+
+    def incr(self, key, delta=1, ttl=None):
+        with self._lock:
+            self._purge(time.time())
+            item = self._data.get(key)
+            if item is None:
+                self.set(key, delta, ttl)
+                return delta
+            value = item[0] + delta
+            self._data[key] = (value, item[1])
+            return value
+
+    def add(self, key, value, ttl=None):
+        with self._lock:
+            if self.get(key) is not None:
+                return False
+            self.set(key, value, ttl)
+            return True
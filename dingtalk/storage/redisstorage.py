@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import json
+import math
+import threading
+
+from dingtalk.core.utils import to_text
+from dingtalk.storage import BaseStorage
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+# 值等于 ARGV[1] 时删除 KEYS[1]，读取与删除在服务端原子执行
+DELETE_IF_EQUALS_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+
+def get_connection_pool(url, **kwargs):
+    """
+    获取进程内共享的 redis 连接池，相同 url 及参数返回同一个连接池
+
+    :param url: redis 地址，如 redis://localhost:6379/0
+    :param kwargs: 传给 redis.ConnectionPool.from_url 的参数
+    """
+    import redis
+
+    key = (url, tuple(sorted(kwargs.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = redis.ConnectionPool.from_url(url, **kwargs)
+            _pools[key] = pool
+        return pool
+
+
+def default_hash_tag(key):
+    """
+    默认使用 key 中的 corp_id 作为 hash tag：
+
+    * ``<prefix>:<id>:corp_id:<corp_id>:...`` （ISV 企业客户端及 SecretClient 的令牌）使用 corp_id 段
+    * ``isv:<suite_key>:permanent_code:<corp_id>`` （ISV 永久授权码）使用最后一段
+    * 其他 key 使用第二段（企业客户端为 corp_id，ISV 客户端为 suite_key）
+    """
+    parts = key.split(':')
+    if len(parts) > 3:
+        if parts[2] == 'corp_id':
+            return parts[3]
+        if parts[0] == 'isv' and parts[2] in ('permanent_code', 'ch_permanent_code'):
+            return parts[3]
+    return parts[1] if len(parts) > 2 else None
+
+
+class RedisStorage(BaseStorage):
+    """
+    基于 redis 的存储，使用 SET EX 原生过期，多 key 操作通过 pipeline 一次往返完成::
+
+        storage = RedisStorage.from_url('redis://localhost:6379/0')
+        client = SecretClient('corp_id', 'secret', storage=storage)
+    """
+
+    def __init__(self, redis, prefix='dingtalk', hash_tag=None):
+        """
+        :param redis: redis.Redis 或 redis.RedisCluster 对象
+        :param prefix: key 前缀
+        :param hash_tag: 为 True 或函数时，在 key 中加入 {hash tag}，使同一企业的 key 位于同一 cluster slot，
+                         为 True 时使用 default_hash_tag
+        """
+        self.redis = redis
+        self.prefix = prefix
+        self.hash_tag = default_hash_tag if hash_tag is True else hash_tag
+
+    @classmethod
+    def from_url(cls, url, prefix='dingtalk', hash_tag=None, **kwargs):
+        """
+        使用共享连接池创建存储，多个存储对象及客户端共用连接
+
+        :param url: redis 地址，如 redis://localhost:6379/0
+        :param kwargs: 连接池参数，如 max_connections
+        """
+        import redis
+
+        return cls(redis.Redis(connection_pool=get_connection_pool(url, **kwargs)), prefix, hash_tag)
+
+    def key_name(self, key):
+        tag = self.hash_tag(key) if self.hash_tag else None
+        if tag:
+            return '{0}:{{{1}}}:{2}'.format(self.prefix, tag, key)
+        return '{0}:{1}'.format(self.prefix, key)
+
+    @staticmethod
+    def _dumps(value):
+        return json.dumps(value)
+
+    @staticmethod
+    def _loads(value, default=None):
+        if value is None:
+            return default
+        return json.loads(to_text(value))
+
+    @staticmethod
+    def _expire(ttl):
+        if ttl is None:
+            return None
+        return int(math.ceil(ttl))
+
+    def get(self, key, default=None):
+        return self._loads(self.redis.get(self.key_name(key)), default)
+
+    def set(self, key, value, ttl=None):
+        if value is None:
+            return
+        ex = self._expire(ttl)
+        if ex is not None and ex <= 0:
+            self.delete(key)
+            return
+        self.redis.set(self.key_name(key), self._dumps(value), ex=ex)
+
+    def delete(self, key):
+        self.redis.delete(self.key_name(key))
+
+    def ttl(self, key):
+        ret = self.redis.pttl(self.key_name(key))
+        if ret is None or ret < 0:
+            return None
+        return ret / 1000.0
+
+    def add(self, key, value, ttl=None):
+        ex = self._expire(ttl)
+        return bool(self.redis.set(self.key_name(key), self._dumps(value), ex=ex if ex and ex > 0 else None, nx=True))
+
+    def incr(self, key, delta=1, ttl=None):
+        name = self.key_name(key)
+        ex = self._expire(ttl)
+        pipe = self.redis.pipeline()
+        if ex is not None and ex > 0:
+            # 仅在 key 不存在时设置过期时间
+            pipe.set(name, 0, ex=ex, nx=True)
+        pipe.incrby(name, delta)
+        return pipe.execute()[-1]
+
+    def delete_if_equals(self, key, value):
+        return bool(self.redis.eval(DELETE_IF_EQUALS_SCRIPT, 1, self.key_name(key), self._dumps(value)))
+
+    def get_many(self, keys, default=None):
+        """
+        批量读取，返回 key 到值的字典，不存在的 key 值为 default
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.get(self.key_name(key))
+        return {key: self._loads(value, default) for key, value in zip(keys, pipe.execute())}
+
+    def set_many(self, mapping, ttl=None):
+        """
+        批量写入，值为 None 的 key 忽略
+        """
+        ex = self._expire(ttl)
+        pipe = self.redis.pipeline(transaction=False)
+        for key, value in mapping.items():
+            if value is None:
+                continue
+            if ex is not None and ex <= 0:
+                pipe.delete(self.key_name(key))
+            else:
+                pipe.set(self.key_name(key), self._dumps(value), ex=ex)
+        pipe.execute()
+
+    def delete_many(self, keys):
+        """
+        批量删除
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.delete(self.key_name(key))
+        pipe.execute()
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from dingtalk.storage import BaseStorage
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    基于 SQLite 的持久化存储，同一主机的多个进程（如 gunicorn 多个 worker）可共享令牌及永久授权码::
+
+        storage = SQLiteStorage('/var/run/dingtalk/storage.db')
+
+    使用 WAL 模式，读写互不阻塞；过期数据通过 expires_at 索引定期清理
+    """
+
+    BATCH_SIZE = 500
+
+    def __init__(self, path, table='dingtalk_storage', timeout=10, cleanup_interval=60):
+        """
+        :param path: 数据库文件路径
+        :param table: 表名
+        :param timeout: 等待其他进程写锁的超时时间（秒）
+        :param cleanup_interval: 清理过期数据的间隔（秒）
+        """
+        self.path = path
+        self.table = table
+        self.timeout = timeout
+        self.cleanup_interval = cleanup_interval
+        self._local = threading.local()
+        self._next_cleanup = 0
+        with self._transaction() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS {0} (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)'.format(
+                    self.table
+                )
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS {0}_expires_at ON {0} (expires_at)'.format(self.table))
+
+    @property
+    def connection(self):
+        # sqlite 连接不能跨线程及 fork 后的进程使用
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self.connection
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        else:
+            conn.execute('COMMIT')
+
+    @staticmethod
+    def _expires_at(ttl, now):
+        return None if ttl is None else now + ttl
+
+    def _chunks(self, keys):
+        for i in range(0, len(keys), self.BATCH_SIZE):
+            yield keys[i:i + self.BATCH_SIZE]
+
+    def cleanup(self):
+        """
+        删除已过期的数据
+        """
+        now = time.time()
+        self._next_cleanup = now + self.cleanup_interval
+        self.connection.execute('DELETE FROM {0} WHERE expires_at <= ?'.format(self.table), (now,))
+
+    def _maybe_cleanup(self, now):
+        if now >= self._next_cleanup:
+            self.cleanup()
+
+    def get(self, key, default=None):
+        row = self.connection.execute(
+            'SELECT value FROM {0} WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)'.format(self.table),
+            (key, time.time())
+        ).fetchone()
+        if row is None:
+            return default
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        if value is None:
+            return
+        now = time.time()
+        self.connection.execute(
+            'INSERT OR REPLACE INTO {0} (key, value, expires_at) VALUES (?, ?, ?)'.format(self.table),
+            (key, json.dumps(value), self._expires_at(ttl, now))
+        )
+        self._maybe_cleanup(now)
+
+    def delete(self, key):
+        self.connection.execute('DELETE FROM {0} WHERE key = ?'.format(self.table), (key,))
+
+    def delete_if_equals(self, key, value):
+        cursor = self.connection.execute(
+            'DELETE FROM {0} WHERE key = ? AND value = ? AND (expires_at IS NULL OR expires_at > ?)'.format(
+                self.table
+            ),
+            (key, json.dumps(value), time.time())
+        )
+        return cursor.rowcount == 1
+
+    def ttl(self, key):
+        now = time.time()
+        row = self.connection.execute(
+            'SELECT expires_at FROM {0} WHERE key = ? AND expires_at > ?'.format(self.table), (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0] - now
+
+    def add(self, key, value, ttl=None):
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM {0} WHERE key = ? AND expires_at <= ?'.format(self.table), (key, now))
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO {0} (key, value, expires_at) VALUES (?, ?, ?)'.format(self.table),
+                (key, json.dumps(value), self._expires_at(ttl, now))
+            )
+            return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, ttl=None):
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM {0} WHERE key = ? AND expires_at <= ?'.format(self.table), (key, now))
+            conn.execute(
+                'INSERT OR IGNORE INTO {0} (key, value, expires_at) VALUES (?, ?, ?)'.format(self.table),
+                (key, '0', self._expires_at(ttl, now))
+            )
+            conn.execute(
+                'UPDATE {0} SET value = CAST(value AS INTEGER) + ? WHERE key = ?'.format(self.table), (delta, key)
+            )
+            row = conn.execute('SELECT value FROM {0} WHERE key = ?'.format(self.table), (key,)).fetchone()
+        return json.loads(row[0])
+
+    def get_many(self, keys, default=None):
+        keys = list(keys)
+        ret = dict.fromkeys(keys, default)
+        now = time.time()
+        for chunk in self._chunks(keys):
+            rows = self.connection.execute(
+                'SELECT key, value FROM {0} WHERE key IN ({1}) AND (expires_at IS NULL OR expires_at > ?)'.format(
+                    self.table, ', '.join('?' * len(chunk))
+                ),
+                chunk + [now]
+            )
+            for key, value in rows:
+                ret[key] = json.loads(value)
+        return ret
+
+    def set_many(self, mapping, ttl=None):
+        now = time.time()
+        rows = [
+            (key, json.dumps(value), self._expires_at(ttl, now))
+            for key, value in mapping.items() if value is not None
+        ]
+        if not rows:
+            return
+        with self._transaction() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO {0} (key, value, expires_at) VALUES (?, ?, ?)'.format(self.table), rows
+            )
+        self._maybe_cleanup(now)
+
+    def delete_many(self, keys):
+        keys = list(keys)
+        if not keys:
+            return
+        with self._transaction() as conn:
+            for chunk in self._chunks(keys):
+                conn.execute(
+                    'DELETE FROM {0} WHERE key IN ({1})'.format(self.table, ', '.join('?' * len(chunk))), chunk
+                )
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+from dingtalk.storage import BaseStorage
+from dingtalk.storage.memorystorage import MemoryStorage
+
+
+class TieredStorage(BaseStorage):
+    """
+    在共享存储前增加进程内缓存，读取令牌等值时不必每次访问共享存储::
+
+        storage = TieredStorage(RedisStorage.from_url('redis://localhost:6379/0'), max_ttl=60)
+
+    进程内缓存的过期时间取共享存储中剩余过期时间与 max_ttl 的较小值，无法得知剩余过期时间时使用 unknown_ttl，
+    本进程删除的 key 同时从进程内缓存删除，其他进程的修改最多在 max_ttl 秒后可见
+    """
+
+    def __init__(self, storage, max_ttl=60, max_entries=10000, unknown_ttl=5):
+        """
+        :param storage: 共享存储
+        :param max_ttl: 进程内缓存最长保存时间（秒）
+        :param max_entries: 进程内缓存最多保存的 key 数量
+        :param unknown_ttl: 从共享存储读取的 key 无法查询剩余过期时间（共享存储不支持、key 无过期时间）时
+                            进程内缓存的保存时间（秒）
+        """
+        assert isinstance(storage, BaseStorage)
+        self.storage = storage
+        self.max_ttl = max_ttl
+        self.unknown_ttl = unknown_ttl
+        self.local = MemoryStorage(max_entries)
+
+    def _local_ttl(self, ttl):
+        if ttl is None:
+            return self.max_ttl
+        return min(ttl, self.max_ttl)
+
+    def _remaining_ttl(self, key):
+        try:
+            return self.storage.ttl(key)
+        except NotImplementedError:
+            return None
+
+    def get(self, key, default=None):
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        # 先查询剩余过期时间再读取，读取到的值不会早于查询到的过期时间过期；
+        # 查询后 key 才过期或被删除时读取不到值，不写入进程内缓存
+        ttl = self._remaining_ttl(key)
+        value = self.storage.get(key)
+        if value is None:
+            return default
+        self.local.set(key, value, min(ttl, self.max_ttl) if ttl is not None else self.unknown_ttl)
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.storage.set(key, value, ttl)
+        self.local.delete(key)
+        self.local.set(key, value, self._local_ttl(ttl))
+
+    def delete(self, key):
+        self.local.delete(key)
+        self.storage.delete(key)
+
+    def ttl(self, key):
+        return self.storage.ttl(key)
+
+    def add(self, key, value, ttl=None):
+        self.local.delete(key)
+        return self.storage.add(key, value, ttl)
+
+    def incr(self, key, delta=1, ttl=None):
+        self.local.delete(key)
+        return self.storage.incr(key, delta, ttl)
+
+    def delete_if_equals(self, key, value):
+        self.local.delete(key)
+        return self.storage.delete_if_equals(key, value)
+
+    def lock(self, key, ttl=10):
+        # 锁状态只在共享存储中判断
+        return self.storage.lock(key, ttl)
+
+    def get_many(self, keys, default=None):
+        # 批量读取不查询剩余过期时间，共享存储中读到的值不写入进程内缓存
+        keys = list(keys)
+        ret = self.local.get_many(keys)
+        missing = [key for key, value in ret.items() if value is None]
+        if missing:
+            ret.update(self.storage.get_many(missing))
+        return {key: default if value is None else value for key, value in ret.items()}
+
+    def set_many(self, mapping, ttl=None):
+        self.storage.set_many(mapping, ttl)
+        self.local.delete_many(list(mapping))
+        self.local.set_many(mapping, self._local_ttl(ttl))
+
+    def delete_many(self, keys):
+        keys = list(keys)
+        self.local.delete_many(keys)
+        self.storage.delete_many(keys)
@@ -85,9 +85,10 @@ setup(
         'dingtalk.storage',
         'dingtalk.model',
         'dingtalk.client',
-        'dingtalk.client.api'
-    ],
+        'dingtalk.client.api',
+    ] + (['dingtalk.client.aio'] if sys.version_info >= (3, 5) else []),
     install_requires=requirements,
+    package_data={'dingtalk.client.api': ['top_index.json']},
     zip_safe=False,
     include_package_data=True,
     tests_require=[
@@ -99,5 +100,7 @@ setup(
     extras_require={
         'cryptography': ['cryptography'],
         'pycrypto': ['pycrypto'],
+        'aiohttp': ['aiohttp>=3.3'],
+        'orjson': ['orjson'],
     },
 )
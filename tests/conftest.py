@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import sys
+
+collect_ignore = []
+if sys.version_info < (3, 5):
+    # asyncio 客户端使用 async/await 语法，需要 python 3.5+
+    collect_ignore.append('test_aio.py')
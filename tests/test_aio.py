@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import json
+import sys
+import threading
+import unittest
+
+from six.moves import BaseHTTPServer
+from six.moves.urllib.parse import urlparse, parse_qs
+
+
+class StubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = dict((k, v[0]) for k, v in parse_qs(url.query).items())
+        self.server.requests.append((url.path, query))
+        if url.path == '/gettoken':
+            self._reply({'errcode': 0, 'access_token': 'token%d' % len(self.server.requests), 'expires_in': 7200})
+        elif url.path == '/user/get':
+            if query.get('access_token') == self.server.expired_token:
+                self._reply({'errcode': 40001, 'errmsg': 'invalid token'})
+            else:
+                self._reply({'errcode': 0, 'userid': query['userid']})
+        else:
+            self._reply({'errcode': 60011, 'errmsg': 'no permission'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = dict((k, v[0]) for k, v in parse_qs(url.query).items())
+        self.server.requests.append((url.path, query))
+        if url.path == '/router/batch':
+            body = self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8')
+            parts = []
+            for part in body.split('\r\n-S-\r\n'):
+                params = dict((k, v[0]) for k, v in parse_qs(part).items())
+                parts.append(json.dumps({params['method'].replace('.', '_') + '_response': {
+                    'result': {'success': True, 'value': params['value']}
+                }}))
+            body = '\r\n-S-\r\n'.join(parts).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self._reply({'dingtalk_oapi_test_response': {'result': {'success': True, 'value': query['session']}}})
+
+
+@unittest.skipIf(sys.version_info < (3, 5), 'asyncio client requires python 3.5+')
+class AsyncClientTestCase(unittest.TestCase):
+
+    def setUp(self):
+        import asyncio
+        self.server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.requests = []
+        self.server.expired_token = None
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.base_url = 'http://127.0.0.1:%d/' % self.server.server_port
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.loop.close()
+
+    def get_client(self):
+        from dingtalk.client.aio import AsyncAppKeyClient
+        client = AsyncAppKeyClient('corp_id', 'app_key', 'app_secret')
+        client.API_BASE_URL = self.base_url
+        return client
+
+    def test_api_namespace(self):
+        client = self.get_client()
+        ret = self.loop.run_until_complete(client.user.get('userid1'))
+        self.loop.run_until_complete(client.close())
+
+        self.assertEqual('userid1', ret.userid)
+        self.assertEqual(['/gettoken', '/user/get'], [path for path, _ in self.server.requests])
+        self.assertEqual('token1', self.server.requests[1][1]['access_token'])
+
+    def test_token_retry(self):
+        from dingtalk.core.exceptions import DingTalkClientException
+        client = self.get_client()
+        client.cache.access_token.set(value='expired', ttl=7200)
+        self.server.expired_token = 'expired'
+        ret = self.loop.run_until_complete(client.user.get('userid1'))
+
+        self.assertEqual('userid1', ret.userid)
+        with self.assertRaises(DingTalkClientException) as cm:
+            self.loop.run_until_complete(client.get('/unknown'))
+        self.loop.run_until_complete(client.close())
+        self.assertEqual(60011, cm.exception.errcode)
+
+    def test_top_request(self):
+        client = self.get_client()
+        ret = self.loop.run_until_complete(client.top_request('dingtalk.oapi.test', {'a': 1}, url=self.base_url))
+        self.loop.run_until_complete(client.close())
+
+        self.assertEqual('token1', ret.value)
+        self.assertEqual('dingtalk.oapi.test', self.server.requests[-1][1]['method'])
+
+    def test_top_batch(self):
+        client = self.get_client()
+        batch = client.top_batch(url=self.base_url + 'router/batch', max_size=2)
+        for i in range(3):
+            batch.top_request('dingtalk.oapi.test', {'value': 'value%d' % i})
+        ret = self.loop.run_until_complete(batch.execute())
+        self.loop.run_until_complete(client.close())
+
+        self.assertEqual(['value0', 'value1', 'value2'], [r.value for r in ret])
+        self.assertEqual(['/gettoken', '/router/batch', '/router/batch'], [path for path, _ in self.server.requests])
+        self.assertEqual('token1', self.server.requests[-1][1]['session'])
+
+    def test_gather(self):
+        import asyncio
+        from dingtalk.client.aio.concurrency import gather
+        from dingtalk.client.concurrency import AIMDController
+
+        controller = AIMDController(initial=2)
+        running = [0, 0]
+
+        async def func(item):
+            running[0] += 1
+            running[1] = max(running)
+            await asyncio.sleep(0.01)
+            running[0] -= 1
+            if item == 3:
+                raise ValueError(item)
+            return item * 2
+
+        results = self.loop.run_until_complete(gather(controller, func, range(5), return_exceptions=True))
+        self.assertEqual([0, 2, 4, 8], [results[i] for i in (0, 1, 2, 4)])
+        self.assertIsInstance(results[3], ValueError)
+        self.assertEqual(2, running[1])
+        with self.assertRaises(ValueError):
+            self.loop.run_until_complete(gather(controller, func, range(5)))
+
+    def test_circuit_probe_cancelled(self):
+        import asyncio
+        from dingtalk.client.aio.transport import AsyncMockTransport
+        from dingtalk.client.circuitbreaker import CircuitBreaker
+        from dingtalk.core.exceptions import CircuitOpenException, DingTalkClientException
+
+        state = {'mode': 'fail'}
+
+        async def handler(request):
+            if state['mode'] == 'fail':
+                return 503, 'Service Unavailable'
+            if state['mode'] == 'slow':
+                await asyncio.sleep(10)
+            return {'errcode': 0, 'userid': 'userid1'}
+
+        client = self.get_client()
+        client.transport = AsyncMockTransport(handler)
+        client.cache.access_token.set(value='token', ttl=7200)
+        client.circuit_breaker = CircuitBreaker(min_calls=2, open_timeout=0.05)
+        for _ in range(2):
+            with self.assertRaises(DingTalkClientException):
+                self.loop.run_until_complete(client.get('/user/get', {'userid': 'userid1'}))
+        with self.assertRaises(CircuitOpenException):
+            self.loop.run_until_complete(client.get('/user/get', {'userid': 'userid1'}))
+
+        self.loop.run_until_complete(asyncio.sleep(0.06))
+        state['mode'] = 'slow'
+        with self.assertRaises(asyncio.TimeoutError):
+            self.loop.run_until_complete(asyncio.wait_for(client.get('/user/get', {'userid': 'userid1'}), 0.05))
+        state['mode'] = 'ok'
+        ret = self.loop.run_until_complete(client.get('/user/get', {'userid': 'userid1'}))
+        self.assertEqual('userid1', ret.userid)
+        self.assertEqual('closed', client.circuit_breaker.state('/user/get'))
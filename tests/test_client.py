@@ -0,0 +1,420 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import unittest
+
+
+class ClientTestCase(unittest.TestCase):
+
+    def test_lazy_taobao_api(self):
+        from dingtalk import SecretClient
+        from dingtalk.client.api.base import LazyAPI
+        from dingtalk.client.api.taobao import TaobaoMixin, TbDingDing
+        from dingtalk.client.api.taobao_mixin import LazyTaobaoMixin
+
+        names = dict((name, type(api).__name__) for name, api in vars(TaobaoMixin).items()
+                     if not name.startswith('_'))
+        lazy_names = dict((name, api.class_name) for name, api in vars(LazyTaobaoMixin).items()
+                          if isinstance(api, LazyAPI))
+        self.assertEqual(names, lazy_names)
+
+        client = SecretClient('corp_id', 'corp_secret')
+        api = client.tbdingding
+        self.assertIsInstance(api, TbDingDing)
+        self.assertIs(client, api._client)
+        self.assertIs(api, client.tbdingding)
+        self.assertIsNot(api, SecretClient('corp_id', 'corp_secret').tbdingding)
+
+    def test_lazy_bind_api(self):
+        from dingtalk import SecretClient
+        from dingtalk.client.api import User
+
+        client = SecretClient('corp_id', 'corp_secret')
+        self.assertNotIn('user', vars(client))
+        self.assertIsInstance(SecretClient.user, User)
+        self.assertIsNone(SecretClient.user._client)
+
+        api = client.user
+        self.assertIs(client, api._client)
+        self.assertIs(api, vars(client)['user'])
+        self.assertIs(api, client.user)
+
+    def test_lazy_bind_cache_item(self):
+        from dingtalk.core.utils import descriptor_name
+        from dingtalk.storage.cache import DingTalkCache
+        from dingtalk.storage.memorystorage import MemoryStorage
+
+        cache = DingTalkCache(MemoryStorage(), 'prefix')
+        self.assertNotIn('access_token', vars(cache))
+        self.assertEqual('prefix:access_token', cache.access_token.key_name(None))
+        self.assertIs(cache, cache.access_token.cache)
+        self.assertEqual('jsapi_ticket', descriptor_name(DingTalkCache.jsapi_ticket, DingTalkCache))
+
+    def test_top_index(self):
+        from dingtalk.client.api.top import build_index, load_index
+
+        self.assertEqual(build_index(), load_index())
+
+    def test_top_call(self):
+        import sys
+
+        from dingtalk import SecretClient
+        from dingtalk.client.transport import MockTransport
+
+        def handler(request):
+            if request.url.endswith('/gettoken'):
+                return {'errcode': 0, 'access_token': 'token', 'expires_in': 7200}
+            key = request.params['method'].replace('.', '_') + '_response'
+            return {key: {'device_secret_infos': ['secret'], 'request_id': 'id'}}
+
+        sys.modules.pop('dingtalk.client.api.taobao', None)
+        client = SecretClient('corp_id', 'corp_secret', transport=MockTransport(handler))
+        method = 'alibaba.ailabs.aligenie.device.register'
+        self.assertEqual(
+            {'params': ['device_id', 'mac_sections'], 'required': ['device_id', 'mac_sections'],
+             'result': 'device_secret_infos'},
+            client.top.describe(method)
+        )
+        self.assertEqual(['secret'], client.top.call(method, device_id='1', mac_sections=['mac']))
+        params = client.transport.requests[-1].params
+        self.assertEqual(method, params['method'])
+        self.assertEqual('1', params['device_id'])
+        self.assertNotIn('dingtalk.client.api.taobao', sys.modules)
+
+        self.assertRaises(TypeError, client.top.call, method, device_id='1')
+        self.assertRaises(TypeError, client.top.call, method, device_id='1', mac_sections=[], other=1)
+        self.assertRaises(ValueError, client.top.call, 'unknown.method')
+        self.assertIn('dingtalk.oapi.processinstance.get', client.top.methods('dingtalk.oapi.'))
+
+    def test_rate_limiter(self):
+        from dingtalk.client.ratelimit import Limit, RateLimiter
+        from dingtalk.storage.memorystorage import MemoryStorage
+
+        limiter = RateLimiter([Limit(2), Limit(3, per=60, scope=('corp',), endpoints=['/user/get'])])
+        self.assertEqual(0, limiter.acquire('app', 'corp', '/user/get', now=100))
+        self.assertEqual(0, limiter.acquire('app', 'corp', '/user/get', now=100))
+        self.assertAlmostEqual(0.5, limiter.acquire('app', 'corp', '/user/get', now=100))
+        self.assertEqual(0, limiter.acquire('app', 'corp', '/department/list', now=100))
+        self.assertEqual(0, limiter.acquire('app', 'other', '/user/get', now=100))
+        self.assertEqual(0, limiter.acquire('app', 'corp', '/user/get', now=100.5))
+        self.assertAlmostEqual(19, limiter.acquire('app', 'corp', '/user/get', now=101))
+
+        shared = RateLimiter([Limit(2, per=10)], storage=MemoryStorage())
+        self.assertEqual(0, shared.acquire('app', 'corp', '/user/get', now=100))
+        self.assertEqual(0, RateLimiter([Limit(2, per=10)], storage=shared.storage).acquire(
+            'app', 'corp', '/user/get', now=101))
+        self.assertAlmostEqual(8, shared.acquire('app', 'corp', '/user/get', now=102))
+        self.assertEqual(0, shared.acquire('app', 'corp', '/user/get', now=110))
+
+        shared = RateLimiter([Limit(2), Limit(4, per=60, scope=('app', 'corp'))], storage=MemoryStorage())
+        for _ in range(2):
+            self.assertEqual(0, shared.acquire('app', 'corp', '/user/get', now=120))
+        for _ in range(5):
+            self.assertAlmostEqual(1, shared.acquire('app', 'corp', '/user/get', now=120))
+        for _ in range(2):
+            self.assertEqual(0, shared.acquire('app', 'corp', '/user/get', now=121))
+        self.assertAlmostEqual(59, shared.acquire('app', 'corp', '/user/get', now=121))
+        self.assertEqual(4, shared.storage.get('ratelimit:4/60:app:corp:2'))
+        self.assertEqual(2, shared.storage.get('ratelimit:2/1:app:corp:/user/get:121'))
+
+    def test_client_rate_limiter(self):
+        from dingtalk import AppKeyClient
+        from dingtalk.client.ratelimit import RateLimiter
+        from dingtalk.client.transport import MockTransport
+
+        class RecordingLimiter(RateLimiter):
+            def acquire(self, app=None, corp=None, endpoint=None, now=None):
+                acquired.append((app, corp, endpoint))
+                return super(RecordingLimiter, self).acquire(app, corp, endpoint, now)
+
+        def handler(request):
+            if request.url.endswith('/gettoken'):
+                return {'errcode': 0, 'access_token': 'token', 'expires_in': 7200}
+            if 'method' in request.params:
+                return {'dingtalk_oapi_test_response': {'result': {'success': True}}}
+            return {'errcode': 0, 'userid': 'userid1'}
+
+        acquired = []
+        client = AppKeyClient('corp_id', 'app_key', 'app_secret', transport=MockTransport(handler))
+        client.rate_limiter = RecordingLimiter()
+        client.user.get('userid1')
+        client.top_request('dingtalk.oapi.test')
+        self.assertEqual([
+            ('app_key', 'corp_id', '/gettoken'),
+            ('app_key', 'corp_id', '/user/get'),
+            ('app_key', 'corp_id', 'dingtalk.oapi.test'),
+        ], acquired)
+
+    def test_aimd_controller(self):
+        from dingtalk.client.concurrency import AIMDController
+        from dingtalk.core.exceptions import DingTalkClientException
+
+        controller = AIMDController(initial=4, max_limit=8, cooldown=0)
+        for _ in range(4):
+            controller.record(0.1)
+        self.assertEqual(4, controller.limit)
+        controller.record(0.1)
+        self.assertEqual(5, controller.limit)
+        controller.record(0.1, DingTalkClientException(90018, 'throttled'))
+        self.assertEqual(2, controller.limit)
+        controller.record(0.1, DingTalkClientException(60011, 'no permission'))
+        self.assertEqual(2, controller.limit)
+
+        controller = AIMDController(initial=8, cooldown=60, latency_threshold=1)
+        controller.record(2)
+        controller.record(0.1, DingTalkClientException(90002, 'throttled'))
+        self.assertEqual(4, controller.limit)
+
+    def test_aimd_map(self):
+        import threading
+        import time
+
+        from dingtalk.client.concurrency import AIMDController
+
+        controller = AIMDController(initial=2, max_limit=2)
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def func(item):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            if item == 3:
+                raise ValueError(item)
+            return item * 2
+
+        results = controller.map(func, range(6), return_exceptions=True)
+        self.assertEqual([0, 2, 4, 10], [results[i] for i in (0, 1, 2, 5)])
+        self.assertIsInstance(results[3], ValueError)
+        self.assertEqual(2, running[1])
+        self.assertEqual(0, controller.inflight)
+        self.assertRaises(ValueError, controller.map, func, range(6))
+
+    def test_client_concurrency_controller(self):
+        from dingtalk import SecretClient
+        from dingtalk.client.concurrency import AIMDController
+        from dingtalk.client.transport import MockTransport
+        from dingtalk.core.exceptions import DingTalkClientException
+
+        def handler(request):
+            if request.url.endswith('/gettoken'):
+                return {'errcode': 0, 'access_token': 'token', 'expires_in': 7200}
+            return {'errcode': 90018, 'errmsg': 'throttled'}
+
+        client = SecretClient('corp_id', 'corp_secret', transport=MockTransport(handler))
+        client.concurrency_controller = AIMDController(initial=8)
+        self.assertRaises(DingTalkClientException, client.user.get, 'userid1')
+        self.assertEqual(4, client.concurrency_controller.limit)
+
+    def test_retry_policy(self):
+        from dingtalk.client.retry import RetryPolicy
+        from dingtalk.core.exceptions import DingTalkClientException
+        from dingtalk.core.protocol import DingTalkResponse
+
+        policy = RetryPolicy(max_attempts=3, backoff=1, multiplier=2, max_backoff=3, jitter=False)
+        self.assertEqual([1, 2, 3], [policy.backoff_time(i) for i in (1, 2, 3)])
+
+        busy = DingTalkClientException(-1, 'busy')
+        unavailable = DingTalkClientException(None, None, response=DingTalkResponse(503, b''))
+        self.assertTrue(policy.is_retryable(busy, 'POST', ['/message/send']))
+        self.assertFalse(policy.is_retryable(DingTalkClientException(60011, 'no permission'), 'GET', ['/user/get']))
+        self.assertTrue(policy.is_retryable(unavailable, 'GET', ['/user/get']))
+        self.assertFalse(policy.is_retryable(unavailable, 'POST', ['/attendance/list']))
+        self.assertFalse(policy.is_retryable(unavailable, 'POST', ['dingtalk.oapi.processinstance.get']))
+        self.assertFalse(policy.is_retryable(unavailable, 'POST', ['/message/send']))
+        self.assertFalse(policy.is_retryable(IOError(), 'POST', ['/service/get_permanent_code'], (IOError,)))
+        read_policy = RetryPolicy(idempotent_endpoints=['/attendance/list', 'dingtalk.oapi.processinstance.get'])
+        self.assertTrue(read_policy.is_retryable(unavailable, 'POST', ['/attendance/list']))
+        self.assertTrue(read_policy.is_retryable(unavailable, 'POST', ['dingtalk.oapi.processinstance.get']))
+        self.assertFalse(read_policy.is_retryable(unavailable, 'POST', ['/attendance/list', '/message/send']))
+        self.assertTrue(policy.is_retryable(IOError(), 'GET', ['/user/get'], (IOError,)))
+        self.assertFalse(policy.is_retryable(IOError(), 'GET', ['/user/get']))
+
+        state = policy.begin()
+        self.assertEqual([1, 2, None], [state.next_delay(busy, 'GET', ['/user/get']) for _ in range(3)])
+        state = RetryPolicy(max_attempts=5, deadline=0.5, jitter=False).begin()
+        self.assertIsNone(state.next_delay(busy, 'GET', ['/user/get']))
+
+    def test_client_retry(self):
+        from dingtalk import SecretClient
+        from dingtalk.client.retry import RetryPolicy
+        from dingtalk.client.transport import MockTransport
+        from dingtalk.core.exceptions import DingTalkClientException
+
+        failures = []
+
+        def handler(request):
+            if request.url.endswith('/gettoken'):
+                return {'errcode': 0, 'access_token': 'token', 'expires_in': 7200}
+            if failures:
+                raise failures.pop()
+            return {'errcode': 0, 'userid': 'userid1'}
+
+        client = SecretClient('corp_id', 'corp_secret', transport=MockTransport(handler))
+        client.retry_policy = RetryPolicy(backoff=0)
+        failures[:] = [IOError('reset'), IOError('reset')]
+        self.assertEqual('userid1', client.user.get('userid1').userid)
+
+        failures[:] = [IOError('reset')]
+        self.assertRaises(IOError, client.post, '/message/send', {'msgtype': 'text'})
+        failures[:] = [IOError('reset')]
+        count = len(client.transport.requests)
+        self.assertRaises(IOError, client.post, '/service/get_permanent_code', {'tmp_auth_code': 'code'})
+        self.assertEqual(count + 1, len(client.transport.requests))
+        failures[:] = [IOError('reset')]
+        self.assertRaises(IOError, client.get, '/user/get', {'userid': 'userid1'}, retry=False)
+        failures[:] = [IOError('reset')] * 3
+        self.assertRaises(IOError, client.user.get, 'userid1')
+
+        def expired(request):
+            if request.url.endswith('/gettoken'):
+                return {'errcode': 0, 'access_token': 'token', 'expires_in': 7200}
+            return {'errcode': 40001, 'errmsg': 'invalid token'}
+
+        client = SecretClient('corp_id', 'corp_secret', transport=MockTransport(expired))
+        self.assertRaises(DingTalkClientException, client.user.get, 'userid1')
+        self.assertEqual(
+            ['/gettoken', '/user/get', '/gettoken', '/user/get'],
+            [request.url.split('?')[0][len(client.API_BASE_URL) - 1:] for request in client.transport.requests]
+        )
+
+    def test_circuit_breaker(self):
+        from dingtalk.client.circuitbreaker import CircuitBreaker
+        from dingtalk.core.exceptions import CircuitOpenException, DingTalkClientException
+
+        breaker = CircuitBreaker(failure_rate=0.5, min_calls=4, window=10, open_timeout=5)
+        for failed in (False, DingTalkClientException(60011, 'no permission'), IOError(), IOError()):
+            breaker.before_call('/attendance/list', now=100)
+            breaker.record('/attendance/list', failed or None, (IOError,), now=100)
+        self.assertEqual('open', breaker.state('/attendance/list', now=100))
+        with self.assertRaises(CircuitOpenException) as cm:
+            breaker.before_call('/attendance/list', now=101)
+        self.assertEqual(4, cm.exception.retry_after)
+        breaker.before_call('/user/get', now=101)
+
+        breaker.before_call('/attendance/list', now=105)
+        self.assertRaises(CircuitOpenException, breaker.before_call, '/attendance/list', now=105)
+        breaker.record('/attendance/list', IOError(), (IOError,), now=105)
+        self.assertRaises(CircuitOpenException, breaker.before_call, '/attendance/list', now=109)
+
+        breaker.before_call('/attendance/list', now=110)
+        breaker.record('/attendance/list', now=110)
+        self.assertEqual('closed', breaker.state('/attendance/list', now=110))
+        breaker.before_call('/attendance/list', now=110)
+
+    def test_client_circuit_breaker(self):
+        from dingtalk import SecretClient
+        from dingtalk.client.circuitbreaker import CircuitBreaker
+        from dingtalk.client.transport import MockTransport
+        from dingtalk.core.exceptions import CircuitOpenException, DingTalkClientException
+
+        def handler(request):
+            if request.url.endswith('/gettoken'):
+                return {'errcode': 0, 'access_token': 'token', 'expires_in': 7200}
+            if '/attendance/list' in request.url:
+                return 504, 'Gateway Timeout'
+            return {'errcode': 0, 'userid': 'userid1'}
+
+        client = SecretClient('corp_id', 'corp_secret', transport=MockTransport(handler))
+        client.circuit_breaker = CircuitBreaker(min_calls=2)
+        for _ in range(2):
+            with self.assertRaises(DingTalkClientException) as cm:
+                client.post('/attendance/list', {})
+            self.assertNotIsInstance(cm.exception, CircuitOpenException)
+        count = len(client.transport.requests)
+        self.assertRaises(CircuitOpenException, client.post, '/attendance/list', {})
+        self.assertEqual(count, len(client.transport.requests))
+        self.assertEqual('userid1', client.user.get('userid1').userid)
+
+    def test_client_pool(self):
+        from dingtalk.client.pool import ClientPool
+
+        created = []
+
+        def factory(key):
+            created.append(key)
+            return object()
+
+        pool = ClientPool(factory, max_size=2)
+        client1 = pool.get('corp1')
+        pool.get('corp2')
+        self.assertIs(client1, pool.get('corp1'))
+        pool.get('corp3')
+
+        self.assertEqual(2, len(pool))
+        self.assertNotIn('corp2', pool)
+        self.assertEqual(['corp1', 'corp2', 'corp3'], created)
+
+        pool = ClientPool(factory, max_size=2, idle_timeout=-1)
+        self.assertIsNot(pool.get('corp1'), pool.get('corp1'))
+
+    def test_isv_client_pool(self):
+        from dingtalk import ISVClient
+
+        client = ISVClient('suite_key', 'suite_secret', client_pool_size=10)
+        corp_client = client.get_dingtalk_client('corp_id')
+        self.assertIs(corp_client, client.get_dingtalk_client('corp_id'))
+        self.assertIs(client.get_channel_client('corp_id'), client.get_channel_client('corp_id'))
+
+        client._handle_permanent_code({
+            'permanent_code': 'code', 'ch_permanent_code': 'ch_code', 'auth_corp_info': {'corpid': 'corp_id'}
+        })
+        codes = client.get_permanent_codes_from_cache(['corp_id', 'other'])
+        self.assertEqual({'corp_id': 'code', 'other': None}, codes)
+        self.assertEqual({'corp_id': 'ch_code'}, client.get_ch_permanent_codes_from_cache(['corp_id']))
+
+        client._handle_permanent_code({'permanent_code': 'code2', 'auth_corp_info': {'corpid': 'corp_id'}})
+        self.assertEqual('code2', client.get_permanent_code_from_cache('corp_id'))
+        self.assertEqual('ch_code', client.get_ch_permanent_code_from_cache('corp_id'))
+
+        client.proc_message({'EventType': 'suite_relieve', 'AuthCorpId': 'corp_id'})
+        self.assertIsNot(corp_client, client.get_dingtalk_client('corp_id'))
+        self.assertIsNone(client.get_permanent_code_from_cache('corp_id'))
+        self.assertIsNone(client.get_ch_permanent_code_from_cache('corp_id'))
+
+        client = ISVClient('suite_key', 'suite_secret', client_pool_size=0)
+        self.assertIsNot(client.get_dingtalk_client('corp_id'), client.get_dingtalk_client('corp_id'))
+
+    def test_isv_corp_client_settings(self):
+        from dingtalk import ISVClient
+        from dingtalk.client.circuitbreaker import CircuitBreaker
+        from dingtalk.client.concurrency import AIMDController
+        from dingtalk.client.ratelimit import RateLimiter
+        from dingtalk.client.retry import RetryPolicy
+        from dingtalk.core.codec import JSONCodec
+        from dingtalk.core.constants import ResponseMode
+
+        client = ISVClient('suite_key', 'suite_secret', client_pool_size=10)
+        corp_client = client.get_dingtalk_client('corp_id')
+        channel_client = client.get_channel_client('corp_id')
+        client.codec = JSONCodec()
+        client.response_mode = ResponseMode.DICT
+        client.top_simplify = True
+        client.rate_limiter = RateLimiter()
+        client.retry_policy = RetryPolicy()
+        client.circuit_breaker = CircuitBreaker()
+        for name in ('codec', 'response_mode', 'top_simplify', 'rate_limiter', 'retry_policy', 'circuit_breaker'):
+            self.assertIs(getattr(client, name), getattr(corp_client, name))
+            self.assertIs(getattr(client, name), getattr(channel_client, name))
+        self.assertIs(corp_client, client.get_dingtalk_client('corp_id'))
+        self.assertEqual(('suite_key', 'corp_id'), corp_client._rate_limit_scope())
+
+        other_client = client.get_dingtalk_client('other_corp_id')
+        overrides = {
+            'codec': JSONCodec(), 'response_mode': ResponseMode.RAW, 'top_simplify': False,
+            'rate_limiter': None, 'concurrency_controller': AIMDController(), 'retry_policy': None,
+            'circuit_breaker': CircuitBreaker(),
+        }
+        for name, value in overrides.items():
+            setattr(corp_client, name, value)
+            self.assertIs(value, getattr(corp_client, name))
+            self.assertIs(getattr(client, name), getattr(other_client, name))
+            self.assertIsNot(value, getattr(client, name))
+        self.assertIs(corp_client, client.get_dingtalk_client('corp_id'))
+        self.assertEqual(ResponseMode.RAW, client.get_dingtalk_client('corp_id').response_mode)
+        del corp_client.response_mode
+        self.assertEqual(ResponseMode.DICT, corp_client.response_mode)
+        corp_client.codec = None
+        self.assertIs(client.codec, corp_client.codec)
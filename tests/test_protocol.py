@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import json
+import unittest
+
+from dingtalk.core import protocol
+from dingtalk.core.exceptions import DingTalkClientException
+
+
+class ProtocolTestCase(unittest.TestCase):
+
+    def test_prepare_request(self):
+        request = protocol.prepare_request(
+            'POST', '/user/create', 'https://oapi.dingtalk.com/', params={'a': 1}, data={'name': '测试'}
+        )
+
+        self.assertEqual('https://oapi.dingtalk.com/user/create', request.url)
+        self.assertEqual({'a': 1}, request.params)
+        self.assertEqual('application/json', request.headers['Content-Type'])
+        self.assertEqual({'name': '测试'}, json.loads(request.data.decode('utf-8')))
+
+    def test_top_params(self):
+        import time
+
+        template = protocol.top_template('dingtalk.oapi.test', simplify='true')
+        self.assertIs(template, protocol.top_template('dingtalk.oapi.test', simplify='true'))
+        self.assertEqual('dingtalk_oapi_test_response', template.response_key)
+
+        params = protocol.top_params('dingtalk.oapi.test', {'a': [1], 'method': 'x'}, simplify='true')
+        self.assertEqual('[1]', params['a'])
+        self.assertEqual('dingtalk.oapi.test', params['method'])
+        self.assertEqual('true', params['simplify'])
+        self.assertEqual(time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(int(time.time()))), params['timestamp'])
+        self.assertNotIn('a', template.params)
+
+        formatter = protocol.TimestampFormatter()
+        self.assertIs(formatter(1500000000.1), formatter(1500000000.9))
+        self.assertNotEqual(formatter(1500000000), formatter(1500000001))
+
+        url = protocol.join_url(protocol.TOP_API_BASE_URL, '/router/rest')
+        self.assertEqual('https://eco.taobao.com/router/rest', url)
+        self.assertIs(url, protocol.join_url(protocol.TOP_API_BASE_URL, '/router/rest'))
+
+    def test_handle_response(self):
+        response = protocol.DingTalkResponse(200, b'{"errcode": "0", "userid": "test"}')
+        result = protocol.handle_response(response)
+        self.assertEqual(0, result.errcode)
+        self.assertEqual('test', result.userid)
+
+        response = protocol.DingTalkResponse(200, b'{"errcode": 60011, "errmsg": "no permission"}')
+        with self.assertRaises(DingTalkClientException) as cm:
+            protocol.handle_response(response)
+        self.assertEqual(60011, cm.exception.errcode)
+        self.assertIs(response, cm.exception.response)
+
+        response = protocol.DingTalkResponse(502, b'')
+        with self.assertRaises(DingTalkClientException) as cm:
+            protocol.handle_response(response)
+        self.assertIsNone(cm.exception.errcode)
+
+        response = protocol.DingTalkResponse(200, b'\x89PNG')
+        self.assertIs(response, protocol.handle_response(response))
+
+    def test_handle_top_response(self):
+        key = protocol.top_response_key('dingtalk.oapi.test')
+        content = json.dumps({key: {'result': json.dumps({'success': True, 'value': 1})}}).encode('utf-8')
+        result = protocol.handle_response(protocol.DingTalkResponse(200, content), key)
+        self.assertEqual(1, result.value)
+
+        content = json.dumps({'error_response': {'code': 15, 'msg': 'Remote service error'}}).encode('utf-8')
+        with self.assertRaises(DingTalkClientException) as cm:
+            protocol.handle_response(protocol.DingTalkResponse(200, content), key)
+        self.assertEqual(15, cm.exception.errcode)
+
+        content = json.dumps({key: {'result': {'success': False, 'ding_open_errcode': 400}}}).encode('utf-8')
+        with self.assertRaises(DingTalkClientException) as cm:
+            protocol.handle_response(protocol.DingTalkResponse(200, content), key)
+        self.assertEqual(400, cm.exception.errcode)
+
+    def test_handle_top_simplify_response(self):
+        key = protocol.top_response_key('dingtalk.oapi.test')
+
+        content = json.dumps({'result': json.dumps({'success': True, 'value': 1}), 'request_id': 'id'}).encode('utf-8')
+        result = protocol.handle_response(protocol.DingTalkResponse(200, content), key, top_simplify=True)
+        self.assertEqual(1, result.value)
+
+        content = json.dumps({'result': {'errcode': 0, 'value': 2}, 'request_id': 'id'}).encode('utf-8')
+        result = protocol.handle_response(protocol.DingTalkResponse(200, content), key, top_simplify=True)
+        self.assertEqual(2, result.value)
+
+        for data, errcode in [
+            ({'code': 27, 'msg': 'Invalid session', 'sub_msg': 'session invalid', 'request_id': 'id'}, 27),
+            ({'error_response': {'code': 15, 'msg': 'Remote service error'}}, 15),
+            ({'result': {'success': False, 'ding_open_errcode': 400}}, 400),
+            ({'result': {'errcode': 33012, 'errmsg': 'invalid userid'}}, 33012),
+        ]:
+            content = json.dumps(data).encode('utf-8')
+            with self.assertRaises(DingTalkClientException) as cm:
+                protocol.handle_response(protocol.DingTalkResponse(200, content), key, top_simplify=True)
+            self.assertEqual(errcode, cm.exception.errcode)
+
+    def test_client_top_simplify(self):
+        from dingtalk import SecretClient
+        from dingtalk.client.transport import MockTransport
+
+        def handler(request):
+            if request.url.endswith('/gettoken'):
+                return {'errcode': 0, 'access_token': 'token', 'expires_in': 7200}
+            if request.params['simplify'] == 'true':
+                return {'result': {'errcode': 0, 'task_id': 1}, 'request_id': 'id'}
+            return {'dingtalk_oapi_message_corpconversation_asyncsend_v2_response': {
+                'errcode': 0, 'task_id': 1, 'request_id': 'id'
+            }}
+
+        client = SecretClient('corp_id', 'corp_secret', transport=MockTransport(handler))
+        self.assertEqual(1, client.message.asyncsend_v2({'msgtype': 'text'}, 'agent_id', ['userid']))
+        self.assertEqual('false', client.transport.requests[-1].params['simplify'])
+
+        client.top_simplify = True
+        self.assertEqual(1, client.message.asyncsend_v2({'msgtype': 'text'}, 'agent_id', ['userid']))
+        self.assertEqual('true', client.transport.requests[-1].params['simplify'])
+
+        self.assertEqual(1, client.top_request(
+            'dingtalk.oapi.message.corpconversation.asyncsend_v2', simplify=False
+        ).task_id)
+
+    def test_top_batch(self):
+        from six.moves.urllib.parse import parse_qs
+
+        from dingtalk import SecretClient
+        from dingtalk.client.transport import MockTransport
+
+        def handler(request):
+            if request.url.endswith('/gettoken'):
+                return {'errcode': 0, 'access_token': 'token', 'expires_in': 7200}
+            parts = []
+            for part in request.data.decode('utf-8').split(protocol.TOP_BATCH_SEPARATOR):
+                params = dict((k, v[0]) for k, v in parse_qs(part).items())
+                if params['userid'] == 'missing':
+                    parts.append({'error_response': {'code': 15, 'msg': 'Remote service error', 'sub_msg': 'missing'}})
+                else:
+                    parts.append({'dingtalk_oapi_user_get_response': {
+                        'result': json.dumps({'success': True, 'userid': params['userid'], 'tags': ['中文']})
+                    }})
+            return protocol.TOP_BATCH_SEPARATOR.join(json.dumps(part) for part in parts)
+
+        client = SecretClient('corp_id', 'corp_secret', transport=MockTransport(handler))
+        batch = client.top_batch(max_size=2)
+        for userid in ('user1', 'missing', 'user3'):
+            batch.top_request('dingtalk.oapi.user.get', {'userid': userid, 'tags': ['中文']})
+        results = batch.execute()
+
+        self.assertEqual('user1', results[0].userid)
+        self.assertIsInstance(results[1], DingTalkClientException)
+        self.assertEqual(15, results[1].errcode)
+        self.assertEqual('user3', results[2].userid)
+        self.assertEqual([], batch.calls)
+        request = client.transport.requests[-1]
+        self.assertEqual('https://eco.taobao.com/router/batch', request.url)
+        self.assertEqual('token', request.params['session'])
+        self.assertNotIn('method', request.params)
+        self.assertEqual(3, len(client.transport.requests))
+
+        client.transport = MockTransport(lambda request: {'error_response': {'code': 27, 'msg': 'Invalid session'}})
+        batch.top_request('dingtalk.oapi.user.get', {'userid': 'user1'})
+        batch.top_request('dingtalk.oapi.user.get', {'userid': 'user2'})
+        with self.assertRaises(DingTalkClientException) as cm:
+            batch.execute()
+        self.assertEqual(27, cm.exception.errcode)
+
+    def test_top_nested_result(self):
+        key = protocol.top_response_key('dingtalk.oapi.test')
+        inner = {'success': True, 'value': {'name': '测试\n"a"'}, 'list': [1, {'a': None}]}
+        content = json.dumps({key: {'request_id': 'id', 'result': json.dumps(inner)}}, indent=2).encode('utf-8')
+        result = protocol.handle_response(protocol.DingTalkResponse(200, content), key)
+        self.assertEqual(inner, result)
+        self.assertEqual('测试\n"a"', result.value.name)
+
+        content = json.dumps({key: {'result': 'not json'}}).encode('utf-8')
+        self.assertEqual('not json', protocol.handle_response(protocol.DingTalkResponse(200, content), key))
+
+        response = protocol.DingTalkResponse(200, b'<xml></xml>')
+        self.assertIs(response, protocol.handle_response(response, key))
+
+    def test_codec(self):
+        from dingtalk.core.codec import JSONCodec, OrjsonCodec
+        from dingtalk.core.utils import ObjectDict
+
+        codecs = [JSONCodec()]
+        try:
+            codecs.append(OrjsonCodec())
+        except ImportError:
+            pass
+
+        for codec in codecs:
+            data = {'name': '测试', 'list': [{'id': 1}]}
+            self.assertEqual(data, json.loads(codec.dumps(data).decode('utf-8')))
+            self.assertEqual(data, json.loads(codec.dumps_text(data)))
+
+            result = codec.loads(b'{"a": {"b": [{"c": 1}]}}', object_hook=ObjectDict)
+            self.assertEqual(1, result.a.b[0].c)
+            self.assertIsInstance(result.a.b[0], ObjectDict)
+            self.assertEqual({'a': '\n'}, codec.loads(b'{"a": "\n"}'))
+
+            response = protocol.DingTalkResponse(200, b'{"errcode": 0, "name": "\xe6\xb5\x8b"}')
+            self.assertEqual('测', protocol.handle_response(response, codec=codec).name)
+
+    def test_client_codec(self):
+        from dingtalk import SecretClient
+        from dingtalk.client.base import BaseClient
+        from dingtalk.client.transport import MockTransport
+        from dingtalk.core.codec import JSONCodec
+
+        class CountingCodec(JSONCodec):
+            calls = 0
+
+            def loads(self, data, object_hook=None):
+                CountingCodec.calls += 1
+                return super(CountingCodec, self).loads(data, object_hook)
+
+        client = SecretClient('corp_id', 'corp_secret', transport=MockTransport(
+            lambda request: {'errcode': 0, 'access_token': 'token', 'expires_in': 7200}
+        ))
+        self.assertIs(BaseClient.get_default_codec(), client.codec)
+        client.codec = CountingCodec()
+        client.post('/test', {'a': 1})
+        self.assertEqual(2, CountingCodec.calls)
+
+    def test_response_mode(self):
+        from dingtalk.core.constants import ResponseMode
+        from dingtalk.core.utils import LazyObjectDict, ObjectDict
+
+        content = b'{"errcode": 0, "list": [{"id": 1, "user": {"name": "a"}}], "info": {"count": 1}}'
+        response = protocol.DingTalkResponse(200, content)
+
+        result = protocol.handle_response(response, response_mode='dict')
+        self.assertIs(dict, type(result))
+        self.assertIs(dict, type(result['list'][0]))
+
+        result = protocol.handle_response(response, response_mode=ResponseMode.LAZY)
+        self.assertIs(dict, type(dict.__getitem__(result, 'info')))
+        self.assertEqual(1, result.info.count)
+        self.assertEqual('a', result.list[0].user.name)
+        self.assertEqual([1], [item.id for item in result.list])
+        self.assertIsNone(result.missing)
+        self.assertEqual(json.loads(content.decode('utf-8')), json.loads(json.dumps(result)))
+        copied = result.copy()
+        self.assertIs(LazyObjectDict, type(copied))
+        self.assertEqual(1, copied.info.count)
+        self.assertEqual(1, dict(result.items())['info'].count)
+        self.assertEqual(3, len(result.values()))
+        self.assertEqual([1], [value.count for value in result.values() if isinstance(value, dict)])
+
+        result = protocol.handle_response(response, result_processor=lambda x: x['info'], response_mode='lazy')
+        self.assertEqual(1, result.count)
+
+        self.assertEqual(content, protocol.handle_response(response, response_mode='raw'))
+        response = protocol.DingTalkResponse(200, b'{"errcode": 60011, "errmsg": "no permission"}')
+        with self.assertRaises(DingTalkClientException):
+            protocol.handle_response(response, response_mode='raw')
+
+        key = protocol.top_response_key('dingtalk.oapi.test')
+        content = json.dumps({key: {'result': json.dumps({'success': True, 'value': {'a': 1}})}}).encode('utf-8')
+        result = protocol.handle_response(protocol.DingTalkResponse(200, content), key, response_mode='dict')
+        self.assertIs(dict, type(result['value']))
+        result = protocol.handle_response(protocol.DingTalkResponse(200, content), key)
+        self.assertIsInstance(result.value, ObjectDict)
+
+    def test_client_response_mode(self):
+        from dingtalk import SecretClient
+        from dingtalk.client.transport import MockTransport
+        from dingtalk.core.constants import ResponseMode
+
+        def handler(request):
+            if request.url.endswith('/gettoken'):
+                return {'errcode': 0, 'access_token': 'token', 'expires_in': 7200}
+            return {'errcode': 0, 'userid': 'userid1'}
+
+        client = SecretClient('corp_id', 'corp_secret', transport=MockTransport(handler))
+        client.response_mode = ResponseMode.RAW
+        self.assertEqual(b'{"errcode": 0, "userid": "userid1"}', client.user.get('userid1'))
+        self.assertEqual('token', client.access_token)
+        self.assertEqual('userid1', client.get('/user/get', {'userid': 'userid1'}, response_mode='lazy').userid)
+
+    def test_mock_transport(self):
+        from dingtalk import SecretClient
+        from dingtalk.client.transport import MockTransport
+
+        def handler(request):
+            if request.url.endswith('/gettoken'):
+                return {'errcode': 0, 'access_token': 'token', 'expires_in': 7200}
+            return {'errcode': 0, 'userid': request.params['userid']}
+
+        client = SecretClient('corp_id', 'corp_secret')
+        client.transport = MockTransport(handler)
+        ret = client.user.get('userid1')
+
+        self.assertEqual('userid1', ret.userid)
+        self.assertEqual('https://oapi.dingtalk.com/user/get?access_token=token', client.transport.requests[-1].url)
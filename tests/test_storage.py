@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
+import time
 import unittest
 
 
@@ -55,6 +56,274 @@ class WeChatSessionTestCase(unittest.TestCase):
         storage = MemoryStorage()
         self.test_caches(storage)
 
+    def test_memory_storage_expiry(self):
+        from dingtalk.storage.memorystorage import MemoryStorage
+
+        storage = MemoryStorage()
+        storage.set('forever', 'value')
+        storage.set('expired', 'value', -1)
+        storage.set('alive', 'value', 60)
+
+        self.assertEqual('value', storage.get('forever'))
+        self.assertIsNone(storage.get('expired'))
+        self.assertEqual(['alive', 'forever'], sorted(storage._data))
+
+        for i in range(1000):
+            storage.set('key', i, 60)
+        self.assertLess(len(storage._expiry), 100)
+
+    def test_memory_storage_lru(self):
+        from dingtalk.storage.memorystorage import MemoryStorage
+
+        storage = MemoryStorage(max_entries=2)
+        storage.set('a', 1)
+        storage.set('b', 2)
+        storage.get('a')
+        storage.set('c', 3)
+
+        self.assertEqual(1, storage.get('a'))
+        self.assertIsNone(storage.get('b'))
+        self.assertEqual(3, storage.get('c'))
+        self.assertFalse(storage.add('a', 4))
+        self.assertTrue(storage.add('b', 5, 60))
+
+    def test_batch_operations(self):
+        from dingtalk.storage import BaseStorage
+        from dingtalk.storage.cache import ISVCache
+        from dingtalk.storage.kvstorage import KvStorage
+        from dingtalk.storage.memorystorage import MemoryStorage
+
+        class DictStorage(BaseStorage):
+
+            def __init__(self):
+                self.data = {}
+
+            def get(self, key, default=None):
+                return self.data.get(key, default)
+
+            def set(self, key, value, ttl=None):
+                self.data[key] = value
+
+            def delete(self, key):
+                self.data.pop(key, None)
+
+        storages = [DictStorage(), MemoryStorage()]
+        try:
+            import fakeredis
+            storages.append(KvStorage(fakeredis.FakeStrictRedis()))
+        except ImportError:
+            pass
+
+        for storage in storages:
+            cache = ISVCache(storage, 'isv:suite_key')
+            cache.permanent_code.set_many({'corp1': 'code1', 'corp2': 'code2', 'corp3': None}, 60)
+            self.assertEqual(
+                {'corp1': 'code1', 'corp2': 'code2', 'corp3': None},
+                cache.permanent_code.get_many(['corp1', 'corp2', 'corp3'])
+            )
+            if isinstance(storage, DictStorage):
+                self.assertNotIn(cache.permanent_code.key_name('corp3'), storage.data)
+            cache.permanent_code.delete_many(['corp1', 'corp2'])
+            self.assertEqual({'corp1': '', 'corp2': ''}, cache.permanent_code.get_many(['corp1', 'corp2'], ''))
+
+    def test_incr(self):
+        import os
+        import tempfile
+
+        from dingtalk.storage.memorystorage import MemoryStorage
+        from dingtalk.storage.sqlitestorage import SQLiteStorage
+
+        storages = [MemoryStorage(), SQLiteStorage(os.path.join(tempfile.mkdtemp(), 'storage.db'))]
+        try:
+            import fakeredis
+            from dingtalk.storage.kvstorage import KvStorage
+            from dingtalk.storage.redisstorage import RedisStorage
+            storages.append(RedisStorage(fakeredis.FakeStrictRedis()))
+            storages.append(KvStorage(fakeredis.FakeStrictRedis()))
+        except ImportError:
+            pass
+
+        for storage in storages:
+            self.assertEqual(1, storage.incr('counter', ttl=60))
+            self.assertEqual(3, storage.incr('counter', 2, ttl=1))
+            self.assertEqual(3, storage.get('counter'))
+            self.assertGreater(storage.ttl('counter'), 30)
+            self.assertEqual(-1, storage.incr('persistent', -1))
+            self.assertIsNone(storage.ttl('persistent'))
+
+    def test_delete_if_equals(self):
+        import os
+        import tempfile
+
+        from dingtalk.storage.memorystorage import MemoryStorage
+        from dingtalk.storage.sqlitestorage import SQLiteStorage
+
+        storages = [MemoryStorage(), SQLiteStorage(os.path.join(tempfile.mkdtemp(), 'storage.db'))]
+        try:
+            import fakeredis
+            import lupa  # noqa: F401 fakeredis 需要 lupa 执行 lua 脚本
+            from dingtalk.storage.kvstorage import KvStorage
+            from dingtalk.storage.redisstorage import RedisStorage
+            storages.append(RedisStorage(fakeredis.FakeStrictRedis()))
+            storages.append(KvStorage(fakeredis.FakeStrictRedis()))
+        except ImportError:
+            pass
+
+        for storage in storages:
+            storage.set('key', 'token1', 60)
+            self.assertFalse(storage.delete_if_equals('key', 'token2'))
+            self.assertEqual('token1', storage.get('key'))
+            self.assertTrue(storage.delete_if_equals('key', 'token1'))
+            self.assertIsNone(storage.get('key'))
+            self.assertFalse(storage.delete_if_equals('key', 'token1'))
+
+            lock = storage.lock('lock', 10)
+            self.assertTrue(lock.acquire(blocking=False))
+            # 锁过期后被其他调用方获取，释放时不能删除其他调用方的锁
+            storage.set('lock', 'other', 10)
+            lock.release()
+            self.assertFalse(lock.locked)
+            self.assertEqual('other', storage.get('lock'))
+
+    def test_redis_storage_backend(self):
+        try:
+            import fakeredis
+        except ImportError:
+            raise unittest.SkipTest('fakeredis is not installed')
+        from dingtalk.storage.redisstorage import RedisStorage
+
+        redis = fakeredis.FakeStrictRedis()
+        storage = RedisStorage(redis)
+        self.test_caches(storage)
+
+        storage.set('key', {'a': 1}, 60)
+        self.assertEqual({'a': 1}, storage.get('key'))
+        self.assertEqual(60, redis.ttl('dingtalk:key'))
+        self.assertFalse(storage.add('key', 2, 10))
+        self.assertTrue(storage.add('other', 2, 10))
+
+        storage.set_many({'k1': 1, 'k2': 2, 'k3': None}, 60)
+        self.assertEqual({'k1': 1, 'k2': 2, 'k3': 0}, storage.get_many(['k1', 'k2', 'k3'], 0))
+        storage.delete_many(['k1', 'k2'])
+        self.assertEqual({'k1': None, 'k2': None}, storage.get_many(['k1', 'k2']))
+
+        storage = RedisStorage(redis, hash_tag=True)
+        storage.set('client:corp_id:access_token', 'token')
+        self.assertEqual(b'"token"', redis.get('dingtalk:{corp_id}:client:corp_id:access_token'))
+        self.assertEqual('token', storage.get('client:corp_id:access_token'))
+
+        from dingtalk.storage.redisstorage import default_hash_tag
+        for key, tag in [
+            ('isv_auth:suite_key:corp_id:corp1:access_token', 'corp1'),
+            ('isv_auth:suite_key:corp_id:corp1:access_token:lock', 'corp1'),
+            ('secret:corp1:corp_id:corp1:access_token', 'corp1'),
+            ('isv:suite_key:permanent_code:corp1', 'corp1'),
+            ('isv:suite_key:ch_permanent_code:corp1', 'corp1'),
+            ('isv:suite_key:suite_access_token', 'suite_key'),
+            ('isv_channel:suite_key:channel_token', 'suite_key'),
+            ('token', None),
+        ]:
+            self.assertEqual(tag, default_hash_tag(key))
+
+    def test_tiered_storage(self):
+        try:
+            import fakeredis
+        except ImportError:
+            raise unittest.SkipTest('fakeredis is not installed')
+        from dingtalk.storage.memorystorage import MemoryStorage
+        from dingtalk.storage.redisstorage import RedisStorage
+        from dingtalk.storage.tieredstorage import TieredStorage
+
+        server = fakeredis.FakeServer()
+        shared = RedisStorage(fakeredis.FakeStrictRedis(server=server))
+        storage = TieredStorage(RedisStorage(fakeredis.FakeStrictRedis(server=server)), max_ttl=60)
+        self.test_caches(storage)
+
+        shared.set('token', 'value1', 30)
+        self.assertEqual('value1', storage.get('token'))
+        self.assertLessEqual(storage.local.ttl('token'), 30)
+
+        # 读取进程内缓存，不访问共享存储
+        shared.set('token', 'value2', 30)
+        self.assertEqual('value1', storage.get('token'))
+
+        storage.delete('token')
+        self.assertIsNone(storage.get('token'))
+        self.assertIsNone(shared.get('token'))
+
+        storage.set('forever', 'value')
+        self.assertAlmostEqual(60, storage.local.ttl('forever'), delta=1)
+        shared.set('shared_forever', 'value')
+        self.assertEqual('value', storage.get('shared_forever'))
+        self.assertAlmostEqual(5, storage.local.ttl('shared_forever'), delta=1)
+        self.assertEqual({'forever': 'value', 'none': 0}, storage.get_many(['forever', 'none'], 0))
+
+        with storage.lock('lock', 10) as lock:
+            self.assertTrue(lock.locked)
+            self.assertIsNotNone(shared.get('lock'))
+        self.assertIsNone(storage.get('lock'))
+
+        class ExpiringStorage(MemoryStorage):
+            # 查询剩余过期时间后 key 立即过期
+
+            def ttl(self, key):
+                self.delete(key)
+                return None
+
+        storage = TieredStorage(ExpiringStorage(), max_ttl=60)
+        storage.storage.set('token', 'value', 30)
+        self.assertIsNone(storage.get('token'))
+        self.assertIsNone(storage.local.get('token'))
+
+    def test_sqlite_storage(self):
+        import os
+        import shutil
+        import tempfile
+        import threading
+        from dingtalk.storage.sqlitestorage import SQLiteStorage
+
+        path = tempfile.mkdtemp()
+        try:
+            db = os.path.join(path, 'storage.db')
+            storage = SQLiteStorage(db)
+            self.test_caches(storage)
+
+            storage.set('forever', {'a': 1})
+            storage.set('expired', 'value', -1)
+            storage.set('alive', 'value', 60)
+            self.assertEqual({'a': 1}, storage.get('forever'))
+            self.assertIsNone(storage.get('expired'))
+            self.assertIsNone(storage.ttl('forever'))
+            self.assertAlmostEqual(60, storage.ttl('alive'), delta=1)
+            self.assertTrue(storage.add('expired', 'new', 60))
+
+            storage.cleanup()
+            count = storage.connection.execute('SELECT COUNT(*) FROM dingtalk_storage WHERE expires_at <= ?', (
+                time.time(),
+            )).fetchone()[0]
+            self.assertEqual(0, count)
+
+            storage.set_many({'k1': 1, 'k2': 2, 'k3': None})
+            self.assertEqual({'k1': 1, 'k2': 2, 'k3': 0}, storage.get_many(['k1', 'k2', 'k3'], 0))
+            storage.delete_many(['k1', 'k2'])
+            self.assertEqual({'k1': None, 'k2': None}, storage.get_many(['k1', 'k2']))
+
+            # 多个进程共享同一数据库文件
+            results = []
+
+            def _add():
+                results.append(SQLiteStorage(db).add('lock', 1, 10))
+
+            threads = [threading.Thread(target=_add) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual([True], [ret for ret in results if ret])
+            self.assertEqual({'a': 1}, SQLiteStorage(db).get('forever'))
+        finally:
+            shutil.rmtree(path)
+
     def test_redis_storage(self):
         from redis import Redis
         from dingtalk.storage.kvstorage import KvStorage
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import sys
+import threading
+import time
+import unittest
+
+
+class TokenHandler(object):
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.token_calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, request):
+        if request.url.endswith('/gettoken'):
+            with self.lock:
+                self.token_calls += 1
+                token = 'token%d' % self.token_calls
+            time.sleep(self.delay)
+            return {'errcode': 0, 'access_token': token, 'expires_in': 7200}
+        return {'errcode': 0, 'userid': request.params.get('userid')}
+
+
+class TokenTestCase(unittest.TestCase):
+
+    def test_single_flight(self):
+        from dingtalk import SecretClient
+        from dingtalk.client.transport import MockTransport
+
+        handler = TokenHandler()
+        client = SecretClient('corp_id', 'corp_secret', transport=MockTransport(handler, record=False))
+        tokens = []
+
+        def _get_token():
+            tokens.append(client.access_token)
+
+        threads = [threading.Thread(target=_get_token) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, handler.token_calls)
+        self.assertEqual(['token1'] * 20, tokens)
+
+    def test_single_flight_error(self):
+        from dingtalk.core.singleflight import SingleFlight
+
+        flight = SingleFlight()
+
+        def _raise():
+            raise ValueError('error')
+
+        with self.assertRaises(ValueError):
+            flight.do('key', _raise)
+        self.assertEqual(1, flight.do('key', lambda: 1))
+
+    def test_single_flight_interrupted(self):
+        from dingtalk.core.singleflight import SingleFlight
+
+        flight = SingleFlight()
+        started = threading.Event()
+        proceed = threading.Event()
+        results = []
+
+        class Interrupt(BaseException):
+            pass
+
+        def _interrupted():
+            started.set()
+            proceed.wait()
+            raise Interrupt()
+
+        def _leader():
+            try:
+                flight.do('key', _interrupted)
+            except Interrupt:
+                pass
+
+        leader = threading.Thread(target=_leader)
+        leader.start()
+        started.wait()
+        waiter = threading.Thread(target=lambda: results.append(flight.do('key', lambda: 'token')))
+        waiter.start()
+        # 等待 waiter 进入等待状态
+        time.sleep(0.1)
+        proceed.set()
+        leader.join()
+        waiter.join()
+        self.assertEqual(['token'], results)
+
+    def test_storage_lock(self):
+        from dingtalk.storage.memorystorage import MemoryStorage
+
+        storage = MemoryStorage()
+        lock1 = storage.lock('lock', ttl=10)
+        lock2 = storage.lock('lock', ttl=10)
+
+        self.assertTrue(lock1.acquire(blocking=False))
+        self.assertFalse(lock2.acquire(blocking=False))
+        lock2.release()
+        self.assertTrue(lock1.locked)
+        lock1.release()
+        self.assertTrue(lock2.acquire(blocking=False))
+        lock2.release()
+
+    def test_distributed_refresh(self):
+        try:
+            import fakeredis
+        except ImportError:
+            raise unittest.SkipTest('fakeredis is not installed')
+        from dingtalk import SecretClient
+        from dingtalk.client.transport import MockTransport
+        from dingtalk.storage.kvstorage import KvStorage
+
+        server = fakeredis.FakeServer()
+        handler = TokenHandler()
+        tokens = []
+
+        def _get_token():
+            # 每个线程使用独立的存储对象，模拟共享 redis 的多个进程
+            storage = KvStorage(fakeredis.FakeStrictRedis(server=server))
+            client = SecretClient('corp_id', 'corp_secret', storage=storage, transport=MockTransport(handler))
+            tokens.append(client.access_token)
+
+        threads = [threading.Thread(target=_get_token) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, handler.token_calls)
+        self.assertEqual(['token1'] * 10, tokens)
+
+    def test_renew_token(self):
+        from dingtalk import SecretClient
+        from dingtalk.client.transport import MockTransport
+
+        handler = TokenHandler(delay=0)
+        client = SecretClient('corp_id', 'corp_secret', transport=MockTransport(handler))
+        other = SecretClient('corp_id', 'corp_secret', storage=client.storage, transport=client.transport)
+
+        self.assertEqual(5760, client.renew_token('access_token'))
+        self.assertIsNone(other.renew_token('access_token'))
+        self.assertEqual(1, handler.token_calls)
+        self.assertEqual('token1', other.access_token)
+
+    def test_token_refresher(self):
+        from dingtalk import SecretClient
+        from dingtalk.client.refresher import TokenRefresher
+        from dingtalk.client.transport import MockTransport
+
+        handler = TokenHandler(delay=0)
+        client = SecretClient('corp_id', 'corp_secret', transport=MockTransport(handler))
+        refresher = TokenRefresher(fraction=0.5)
+        refresher.add(client, ['access_token'])
+        refresher.run_pending()
+
+        self.assertEqual('token1', client.cache.access_token.get())
+        self.assertAlmostEqual(time.time() + 3600, refresher.next_run, delta=5)
+
+        client = SecretClient('corp_id', 'corp_secret', transport=MockTransport(handler))
+        refresher = client.start_token_refresher(['access_token'])
+        for _ in range(100):
+            if client.cache.access_token.get() is not None:
+                break
+            time.sleep(0.01)
+        refresher.stop()
+        self.assertEqual('token2', client.cache.access_token.get())
+
+    @unittest.skipIf(sys.version_info < (3, 5), 'asyncio client requires python 3.5+')
+    def test_async_single_flight(self):
+        import asyncio
+        from dingtalk.client.aio import AsyncSecretClient
+        from dingtalk.client.aio.transport import AsyncMockTransport
+
+        handler = TokenHandler(delay=0)
+        client = AsyncSecretClient('corp_id', 'corp_secret', transport=AsyncMockTransport(handler))
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            tokens = loop.run_until_complete(asyncio.gather(*[client.access_token for _ in range(20)]))
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+        self.assertEqual(1, handler.token_calls)
+        self.assertEqual(['token1'] * 20, tokens)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+import threading
+import unittest
+
+from six.moves import BaseHTTPServer, socketserver
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class HeadHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.server.count += 1
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+class TransportTestCase(unittest.TestCase):
+
+    def test_pool_config(self):
+        from dingtalk.client.transport import RequestsTransport
+
+        transport = RequestsTransport(pool_connections=4, pool_maxsize=50, keep_alive=False)
+        adapter = transport.session.get_adapter('https://oapi.dingtalk.com/')
+
+        self.assertEqual(50, adapter._pool_maxsize)
+        self.assertEqual(4, adapter._pool_connections)
+        self.assertEqual('close', transport.session.headers['Connection'])
+
+    def test_client_transport(self):
+        from dingtalk import SecretClient, ISVClient
+        from dingtalk.client.base import BaseClient
+        from dingtalk.client.transport import RequestsTransport
+
+        transport = RequestsTransport(pool_maxsize=20)
+        client = SecretClient('corp_id', 'secret', transport=transport)
+        default_client = SecretClient('corp_id', 'secret')
+        isv_client = ISVClient('suite_key', 'suite_secret', transport=transport)
+
+        self.assertIs(transport, client.transport)
+        self.assertIs(BaseClient.get_default_transport(), default_client.transport)
+        self.assertIs(transport, isv_client.get_dingtalk_client('corp_id').transport)
+        self.assertIs(transport, isv_client.get_channel_client('corp_id').transport)
+
+    def test_prewarm(self):
+        from dingtalk.client.transport import RequestsTransport
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), HeadHandler)
+        server.count = 0
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            url = 'http://127.0.0.1:%d/' % server.server_port
+            transport = RequestsTransport(pool_maxsize=4, prewarm=[url])
+            transport.prewarm([url], connections=2)
+            transport.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(3, server.count)